@@ -1,6 +1,6 @@
 "use client";
 
-import React, { useState, useEffect } from "react";
+import React, { useState, useEffect, useRef } from "react";
 import { FaYoutube } from "react-icons/fa";
 import io from "socket.io-client"; // Import Socket.IO client
 import Cookies from "js-cookie"; // Import js-cookie for cookie handling
@@ -22,6 +22,7 @@ export default function Schedule() {
   const [searchQuery, setSearchQuery] = useState("");
   const [socket, setSocket] = useState(null);
   const [scheduleDate, setScheduleDate] = useState(null); // State for the schedule date
+  const sourceDateRef = useRef(null); // Cairo date the listed schedule was read from
 
   // NEW: Toggle to show local time vs. Cairo time
   // true => show local time
@@ -46,6 +47,35 @@ export default function Schedule() {
       setScheduleDate(data.schedule_date); // Update schedule date on new data
     });
 
+    // An edited schedule only carries the rows that changed; merge them
+    // into the listed day, rendering each start instant in both timezones
+    newSocket.on("schedule_updated", (data) => {
+      if (data.schedule_date !== sourceDateRef.current) return;
+
+      const userTimezone = Cookies.get("user_timezone") || "UTC"; // Fallback to UTC
+      const updated = new Map(
+        [...data.added, ...data.changed].map((entry) => {
+          const start = DateTime.fromISO(entry.start);
+          return [
+            entry.id,
+            {
+              ...entry,
+              time: start.setZone("Africa/Cairo").toFormat("hh:mm a"),
+              localTime: start.setZone(userTimezone).toFormat("hh:mm a"),
+            },
+          ];
+        })
+      );
+      const removed = new Set(data.removed);
+
+      setProgramSchedule((prevSchedule) =>
+        [
+          ...prevSchedule.filter((item) => !removed.has(item.id) && !updated.has(item.id)),
+          ...updated.values(),
+        ].sort((a, b) => a.start_minute - b.start_minute || a.id - b.id)
+      );
+    });
+
     newSocket.on("connect_error", (err) => {
       console.error("Socket.IO connection error:", err);
     });
@@ -112,6 +142,7 @@ export default function Schedule() {
       });
 
       setProgramSchedule(convertedSchedule);
+      sourceDateRef.current = data.source_date || null;
 
       if (convertedSchedule.length > 0) {
         setScheduleDate(data.data[0].schedule_date); // Set schedule date
@@ -3,23 +3,28 @@
 import os
 import logging
 import asyncio
+import click
 from flask import Flask, jsonify
 from dotenv import load_dotenv
 from flask_cors import CORS
 from flask_socketio import SocketIO
 from flask_migrate import Migrate
+from sqlalchemy import inspect
 from threading import Thread
 
 # Import Blueprints
 from routes.schedule import schedule_bp
-from routes.playlists import playlist_bp
+from routes.playlists import playlist_bp, ensure_catalog_current
 from routes.timezone import timezone_bp
 
 # Import Database
 from database import db
 
-# Import Telegram Pipeline
-from telegram_pipeline.script import start_telegram_client
+# Import Background Ingestion
+from services.ingestion_jobs import resume_pending_jobs
+
+# Import CLI Commands
+from cli import schedule_cli
 
 ########################################################
 # 1. Load Environment Variables
@@ -39,6 +44,10 @@ FRONTEND_PROD_URL = os.getenv("FRONTEND_PROD_URL")
 BACKEND_DEV_URL = os.getenv("BACKEND_DEV_URL")
 BACKEND_PROD_URL = os.getenv("BACKEND_PROD_URL")
 ENVIRONMENT = os.getenv("ENVIRONMENT", "development").lower()
+# Off for processes that only serve read endpoints; skips Telethon entirely
+TELEGRAM_LISTENER_ENABLED = os.getenv("TELEGRAM_LISTENER_ENABLED", "True").lower() in ["true", "1"]
+# Forces the background services on or off; by default only serving processes run them
+BACKGROUND_SERVICES_ENABLED = os.getenv("BACKGROUND_SERVICES_ENABLED")
 
 # Determine URLs based on environment
 if ENVIRONMENT == "production":
@@ -106,6 +115,7 @@ def create_app():
     # Initialize extensions
     db.init_app(app)
     migrate = Migrate(app, db)
+    app.cli.add_command(schedule_cli)
 
     # Initialize SocketIO with 'eventlet' async mode for better compatibility
     socketio = SocketIO(app, cors_allowed_origins=FRONTEND_URL, async_mode='eventlet')
@@ -127,22 +137,42 @@ def create_app():
 # 5. Database Initialization
 ########################################################
 def initialize_databases(app):
-    """Initialize all database tables."""
+    """
+    Creates tables missing from either bind. On a normal boot every table
+    exists (migrations own the schema), so this is one table listing per
+    bind and create_all is skipped.
+    """
     with app.app_context():
         try:
-            db.create_all(bind_key="dynamic")
-            db.create_all(bind_key="static")
+            for bind_key in ("dynamic", "static"):
+                existing = set(inspect(db.engines[bind_key]).get_table_names())
+                missing = sorted(set(db.metadatas[bind_key].tables) - existing)
+                if missing:
+                    db.create_all(bind_key=bind_key)
+                    logger.info(f"Created tables {missing} in the '{bind_key}' database")
             logger.info("Successfully initialized all database tables")
         except Exception as e:
             logger.error(f"Database initialization failed: {e}")
             raise
 
+def warm_playlist_catalog(app):
+    """Renders the playlist catalog snapshot and search index before the first request."""
+    with app.app_context():
+        try:
+            ensure_catalog_current()
+        except Exception as e:
+            # Built on first request instead
+            logger.warning(f"Could not pre-render the playlist catalog: {e}")
+
 ########################################################
 # 6. Telegram Listener Thread
 ########################################################
 def run_telegram_listener(socketio, app):
     """Run the Telegram listener in a separate thread."""
     try:
+        # Imported here so workers without the listener never load Telethon
+        from telegram_pipeline.script import start_telegram_client
+
         loop = asyncio.new_event_loop()
         asyncio.set_event_loop(loop)
         # Schedule the coroutine
@@ -151,6 +181,39 @@ def run_telegram_listener(socketio, app):
     except Exception as e:
         logger.error(f"Telegram listener encountered an error: {e}")
 
+def is_serving_process() -> bool:
+    """
+    True under Gunicorn, `python app.py` and `flask run`. Other `flask`
+    commands (db upgrade, schedule ...) import this module too; Flask marks
+    them with FLASK_RUN_FROM_CLI, and they must not resume ingestion jobs
+    or start the listener.
+    """
+    if BACKGROUND_SERVICES_ENABLED is not None:
+        return BACKGROUND_SERVICES_ENABLED.lower() in ["true", "1"]
+    if os.getenv("FLASK_RUN_FROM_CLI", "").lower() != "true":
+        return True
+    context = click.get_current_context(silent=True)
+    return context is not None and context.info_name == "run"
+
+def start_background_services(app, socketio):
+    """
+    Work only a serving process should do: resume interrupted ingestion
+    jobs, pre-render the playlist catalog and start the Telegram listener.
+    """
+    # Re-queue ingestion jobs interrupted by the last shutdown
+    resume_pending_jobs(app)
+
+    # Serve the full playlist catalog from pre-compressed bytes
+    warm_playlist_catalog(app)
+
+    # Start Telegram listener thread
+    if TELEGRAM_LISTENER_ENABLED:
+        telegram_thread = Thread(target=run_telegram_listener, args=(socketio, app), daemon=True)
+        telegram_thread.start()
+        logger.info("Telegram listener thread started.")
+    else:
+        logger.info("Telegram listener disabled (TELEGRAM_LISTENER_ENABLED).")
+
 ########################################################
 # 7. Initialize and Configure the App Globally
 ########################################################
@@ -166,10 +229,10 @@ if not socketio:
     logger.error("SocketIO instance is not available.")
     raise RuntimeError("SocketIO instance is not available.")
 
-# Start Telegram listener thread
-telegram_thread = Thread(target=run_telegram_listener, args=(socketio, app), daemon=True)
-telegram_thread.start()
-logger.info("Telegram listener thread started.")
+if is_serving_process():
+    start_background_services(app, socketio)
+else:
+    logger.info("Not serving; ingestion jobs, catalog warm-up and the Telegram listener skipped.")
 
 ########################################################
 # 8. Entry Point for Development
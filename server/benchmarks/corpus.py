@@ -0,0 +1,110 @@
+# benchmarks/corpus.py
+
+import random
+from datetime import date, timedelta
+
+# -----------------------------------------------------------------------------
+# Synthetic schedule messages
+# -----------------------------------------------------------------------------
+# Messages mimic the channel's posts: a header with Hijri and Gregorian dates,
+# then entries written in the different styles admins use (reversed
+# "40 : 6 (ص)" times, dotted times, multi-line entries, verse ranges,
+# emoji noise, bracketed notes). Same seed -> same corpus.
+
+# Saturday first, as the channel writes the week; date.weekday() counts from Monday
+DAYS = ["السبت", "الأحد", "الاثنين", "الثلاثاء", "الأربعاء", "الخميس", "الجمعة"]
+HIJRI_MONTHS = ["محرم", "صفر", "ربيع الأول", "رجب", "شعبان", "رمضان", "شوال", "ذو القعدة"]
+RECITERS = [
+    "الشيخ محمود خليل الحصري", "الشيخ محمد رفعت", "الشيخ عبد الباسط عبد الصمد",
+    "الشيخ مصطفى إسماعيل", "الشيخ محمد صديق المنشاوي", "الشيخ أحمد نعينع",
+    "الشيخ محمد محمود الطبلاوي", "الشيخ محمود علي البنا", "الشيخ أبو العينين شعيشع",
+    "الشيخ كامل يوسف البهتيمي", "الشيخ طه الفشني", "الشيخ عبد العزيز علي فرج",
+]
+SURAHS = [
+    "البقرة", "آل عمران", "النساء", "المائدة", "الأنعام", "الأعراف", "يونس", "هود",
+    "يوسف", "الرعد", "إبراهيم", "الكهف", "مريم", "طه", "الأنبياء", "الحج", "النور",
+    "الفرقان", "يس", "الصافات", "ص", "الزمر", "الرحمن", "الواقعة", "الملك",
+]
+EMOJIS = ["🌙", "⭐", "📻", "✨", "🕌", "📿"]
+NOTES = ["[إعادة]", "(تسجيل نادر)", "{ملاحظة}", "[من الأرشيف]"]
+
+
+def _time(rng, hour, minute):
+    style = rng.random()
+    marker = rng.choice(["", " (ص)", " (م)"]) if hour <= 12 else ""
+    if style < 0.5:
+        return f"{hour}:{minute:02d}{marker}"
+    if style < 0.75:
+        # Written minute first, as in "40 : 6 (ص)"
+        return f"{minute} : {hour}{marker}" if minute >= 10 else f"{hour}:{minute:02d}{marker}"
+    return f"{hour}.{minute:02d}{marker}"
+
+
+def _surahs(rng):
+    style = rng.random()
+    if style < 0.4:
+        return f"ما تيسر من سورة {rng.choice(SURAHS)}"
+    if style < 0.6:
+        first, second = rng.sample(SURAHS, 2)
+        return f"ما تيسر من سورتى {first} - {second}"
+    if style < 0.8:
+        first, second = rng.sample(SURAHS, 2)
+        start = rng.randint(1, 60)
+        return f"من الآية {start} من سورة {first} حتى الآية {start + rng.randint(5, 40)} من سورة {second}"
+    if style < 0.9:
+        first, second = rng.sample(SURAHS, 2)
+        return f"من أول سورة {first} حتى ختام سورة {second}"
+    return "ما تيسر من قصار السور"
+
+
+def _entry(rng, hour, minute):
+    prefix = rng.choice(["الساعة ", "الساعة ", ""])
+    reciter_word = rng.choice(["تلاوة للقارئ", "للقارئ", "للشيخ"])
+    reciter = rng.choice(RECITERS)
+    if reciter_word == "للشيخ":
+        reciter = reciter.replace("الشيخ ", "", 1)
+    duration = f" {rng.randint(10, 45)} ق" if rng.random() < 0.8 else ""
+    body = f"{prefix}{_time(rng, hour, minute)} {reciter_word} {reciter}"
+    surahs = _surahs(rng)
+
+    if rng.random() < 0.25:
+        # Entry continued on a second line
+        line = f"{body}\n{surahs}{duration}"
+    else:
+        line = f"{body} {surahs}{duration}"
+    if rng.random() < 0.2:
+        line = f"{rng.choice(EMOJIS)} {line}"
+    if rng.random() < 0.1:
+        line = f"{line} {rng.choice(NOTES)}"
+    return line
+
+
+def generate_message(rng, schedule_date=None, entries=None):
+    """Returns one synthetic schedule message."""
+    schedule_date = schedule_date or date(2024, 1, 1) + timedelta(days=rng.randint(0, 730))
+    entries = entries or rng.randint(4, 18)
+    header = (
+        f"{rng.choice(EMOJIS)} برنامج إذاعة القرآن الكريم من القاهرة {rng.choice(EMOJIS)}\n"
+        f"يوم {DAYS[(schedule_date.weekday() + 2) % 7]} : {rng.randint(1, 29):02d} {rng.choice(HIJRI_MONTHS)} 1446هـ "
+        f"{rng.choice(['الموافق', 'الوافق'])} {schedule_date.day:02d}/{schedule_date.month:02d}/{schedule_date.year}م."
+    )
+
+    lines = [header]
+    minute_of_day = rng.randint(5 * 60, 7 * 60)
+    for _ in range(entries):
+        hour, minute = divmod(minute_of_day, 60)
+        lines.append(_entry(rng, hour % 24 or 12, minute))
+        minute_of_day += rng.randint(20, 50)
+    return "\n".join(lines)
+
+
+def generate_corpus(count: int, seed: int = 1) -> list:
+    """Returns `count` synthetic messages for `seed`."""
+    rng = random.Random(seed)
+    return [generate_message(rng) for _ in range(count)]
+
+
+def generate_times(count: int, seed: int = 1) -> list:
+    """Returns raw time strings in the styles found in messages."""
+    rng = random.Random(seed)
+    return [_time(rng, rng.randint(1, 23), rng.randint(0, 59)) for _ in range(count)]
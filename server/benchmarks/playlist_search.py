@@ -0,0 +1,136 @@
+# benchmarks/playlist_search.py
+#
+# Compares the reciter search backends on the playlist catalog scaled up:
+#   * like  - the old SheikhPlaylist.reciter.ilike("%q%") scan;
+#   * fts   - bm25-ranked FTS5 MATCH (services.playlist_fts);
+#   * index - the in-memory trigram index (ReciterSearchIndex).
+#
+#   python -m benchmarks.playlist_search                 # 1x, 10x, 100x
+#   python -m benchmarks.playlist_search --scales 1 1000
+#
+# Each scale gets its own temporary SQLite file, so page cache effects are
+# the same for like and fts. Reported per backend: build time, queries/s and
+# latency percentiles (from benchmarks.run.measure).
+
+import os
+import sys
+import time
+import random
+import argparse
+import tempfile
+
+from sqlalchemy import create_engine, text
+
+from benchmarks.run import measure
+from services.playlist_fts import build_fts_table, search_fts
+from services.reciter_search import ReciterSearchIndex
+
+STATIC_DB_PATH = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "convert_excel_to_db", "sheikh_playlist.db"
+)
+
+
+def load_catalog(path: str = STATIC_DB_PATH) -> list:
+    engine = create_engine(f"sqlite:///{path}")
+    with engine.connect() as connection:
+        rows = connection.execute(text("SELECT id, reciter, link FROM sheikh_playlist ORDER BY id")).all()
+    engine.dispose()
+    return [{"id": row.id, "reciter": row.reciter, "link": row.link} for row in rows]
+
+
+def scale_catalog(catalog: list, scale: int, seed: int = 1) -> list:
+    """
+    Returns `scale` times as many playlists: the real ones plus names
+    recombined from the real names' words, so term frequencies stay close
+    to the real catalog's.
+    """
+    rng = random.Random(seed)
+    words = [word for playlist in catalog for word in playlist["reciter"].split()]
+    scaled = list(catalog)
+    next_id = max(playlist["id"] for playlist in catalog) + 1
+    while len(scaled) < len(catalog) * scale:
+        name = " ".join(rng.choice(words) for _ in range(rng.randint(2, 4)))
+        scaled.append({"id": next_id, "reciter": name, "link": f"https://example.com/playlist/{next_id}"})
+        next_id += 1
+    return scaled
+
+
+def generate_queries(catalog: list, count: int, seed: int = 1) -> list:
+    """Whole names, single words and 3-5 letter prefixes of real names."""
+    rng = random.Random(seed)
+    queries = []
+    for _ in range(count):
+        name = rng.choice(catalog)["reciter"]
+        word = rng.choice(name.split())
+        queries.append(rng.choice([name, word, word[:rng.randint(3, 5)]]))
+    return queries
+
+
+def build_database(path: str, playlists: list):
+    engine = create_engine(f"sqlite:///{path}")
+    with engine.begin() as connection:
+        connection.execute(text("CREATE TABLE sheikh_playlist (id INTEGER PRIMARY KEY, link TEXT, reciter TEXT)"))
+        connection.execute(text("INSERT INTO sheikh_playlist (id, link, reciter) VALUES (:id, :link, :reciter)"), playlists)
+    started = time.perf_counter()
+    with engine.begin() as connection:
+        build_fts_table(connection, playlists)
+    return engine, time.perf_counter() - started
+
+
+def run_scale(catalog: list, scale: int, queries: list, limit: int, repeat: int) -> dict:
+    playlists = scale_catalog(catalog, scale)
+    with tempfile.TemporaryDirectory() as directory:
+        engine, fts_build = build_database(os.path.join(directory, "playlists.db"), playlists)
+
+        started = time.perf_counter()
+        index = ReciterSearchIndex()
+        index.build(playlists)
+        index_build = time.perf_counter() - started
+
+        like_sql = text(
+            "SELECT id, reciter, link FROM sheikh_playlist "
+            "WHERE lower(reciter) LIKE lower(:pattern) LIMIT :limit"
+        )
+        with engine.connect() as connection:
+            def like(query):
+                return connection.execute(like_sql, {"pattern": f"%{query}%", "limit": limit}).all()
+
+            def fts(query):
+                return search_fts(connection, query, limit)
+
+            def trigram_index(query):
+                return index.search(query, limit)
+
+            results = {
+                "like": dict(measure(like, queries, repeat=repeat), build_s=0.0),
+                "fts": dict(measure(fts, queries, repeat=repeat), build_s=round(fts_build, 3)),
+                "index": dict(measure(trigram_index, queries, repeat=repeat), build_s=round(index_build, 3)),
+            }
+        engine.dispose()
+    return {"rows": len(playlists), "results": results}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Compare LIKE, FTS5 and the in-memory reciter index.")
+    parser.add_argument("--scales", type=int, nargs="*", default=[1, 10, 100], help="Catalog multipliers.")
+    parser.add_argument("--queries", type=int, default=300, help="Queries per backend and scale.")
+    parser.add_argument("--limit", type=int, default=20, help="Rows per query.")
+    parser.add_argument("--repeat", type=int, default=3, help="Timed passes per backend.")
+    parser.add_argument("--db", default=STATIC_DB_PATH, help="Static database holding the real catalog.")
+    args = parser.parse_args(argv)
+
+    catalog = load_catalog(args.db)
+    queries = generate_queries(catalog, args.queries)
+    print(f"{'rows':>8} {'backend':<7} {'build s':>8} {'queries/s':>10} {'p50 us':>9} {'p95 us':>9} {'p99 us':>9}")
+    for scale in args.scales:
+        run = run_scale(catalog, scale, queries, args.limit, args.repeat)
+        for backend, result in run["results"].items():
+            print(
+                f"{run['rows']:>8} {backend:<7} {result['build_s']:>8} {result['throughput']:>10} "
+                f"{result['p50_us']:>9} {result['p95_us']:>9} {result['p99_us']:>9}"
+            )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,186 @@
+# benchmarks/run.py
+#
+# Parser benchmarks over a synthetic corpus.
+#
+#   python -m benchmarks.run                   # run and compare with the baseline
+#   python -m benchmarks.run --save-baseline   # run and record a new baseline
+#
+# Exits with status 1 if a function's throughput fell more than --tolerance
+# below the baseline. Baselines are machine specific; record them on the
+# machine that runs the comparison.
+
+import os
+import gc
+import sys
+import json
+import time
+import argparse
+import platform
+import tracemalloc
+
+# Parsing needs no network; never touch the real Gemini model here
+os.environ.setdefault("GEMINI_BACKEND", "fake")
+
+from benchmarks.corpus import generate_corpus, generate_times  # noqa: E402
+from schedule_parsing.parse_logic import (  # noqa: E402
+    fix_time_format,
+    merge_lines,
+    parse_reciter,
+    parse_schedule_final,
+    parse_surahs,
+)
+from schedule_parsing.fast_parser import parse_schedule_fast, _parse_chunk  # noqa: E402
+from schedule_parsing.gemini_backends import FakeModel, RAW_TEXT_MARKER  # noqa: E402
+from schedule_parsing.gemini_handler import process_gemini_output  # noqa: E402
+from routes.schedule import parse_header_dates  # noqa: E402
+
+BASELINE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baseline.json")
+
+
+def percentile(ordered, fraction):
+    return ordered[min(len(ordered) - 1, int(len(ordered) * fraction))]
+
+
+def measure(fn, inputs, before=None, repeat=5):
+    """
+    Calls `fn` once per input, `repeat` times.
+
+    Returns:
+        dict: calls/s of the fastest pass (the least disturbed by other load),
+        latency percentiles in microseconds over all passes, and per call
+        memory figures from tracemalloc (peak bytes, retained blocks).
+    """
+    # Warm-up, so imports and regex compilation are not timed
+    for item in inputs[:10]:
+        fn(item)
+
+    latencies = []
+    fastest = None
+    for _ in range(repeat):
+        if before:
+            before()
+        gc.collect()
+        pass_started = time.perf_counter_ns()
+        for item in inputs:
+            started = time.perf_counter_ns()
+            fn(item)
+            latencies.append(time.perf_counter_ns() - started)
+        elapsed = time.perf_counter_ns() - pass_started
+        fastest = elapsed if fastest is None else min(fastest, elapsed)
+
+    if before:
+        before()
+    gc.collect()
+    tracemalloc.start()
+    snapshot_before = tracemalloc.take_snapshot()
+    for item in inputs:
+        fn(item)
+    _, peak = tracemalloc.get_traced_memory()
+    snapshot_after = tracemalloc.take_snapshot()
+    tracemalloc.stop()
+    allocated_blocks = sum(
+        max(stat.count_diff, 0) for stat in snapshot_after.compare_to(snapshot_before, "filename")
+    )
+
+    latencies.sort()
+    return {
+        "calls": len(inputs),
+        "throughput": round(len(inputs) / (fastest / 1e9), 1) if fastest else None,
+        "p50_us": round(percentile(latencies, 0.50) / 1000, 1),
+        "p95_us": round(percentile(latencies, 0.95) / 1000, 1),
+        "p99_us": round(percentile(latencies, 0.99) / 1000, 1),
+        "peak_bytes_per_call": round(peak / len(inputs)),
+        "retained_blocks_per_call": round(allocated_blocks / len(inputs), 2),
+    }
+
+
+def build_suite(messages, seed):
+    """Returns {name: (function, inputs, before)} for every benchmarked function."""
+    chunks = [chunk for message in messages for chunk in merge_lines(message.splitlines())]
+    fake_model = FakeModel(seed=seed)
+    gemini_outputs = [json.loads(fake_model._respond(RAW_TEXT_MARKER + message)) for message in messages]
+
+    return {
+        "parse_schedule_final": (parse_schedule_final, messages, None),
+        "parse_schedule_fast": (parse_schedule_fast, messages, _parse_chunk.cache_clear),
+        "parse_header_dates": (parse_header_dates, messages, None),
+        "process_gemini_output": (process_gemini_output, gemini_outputs, None),
+        "fix_time_format": (fix_time_format, generate_times(len(chunks), seed), None),
+        "parse_reciter": (parse_reciter, chunks, None),
+        "parse_surahs": (parse_surahs, chunks, None),
+    }
+
+
+def compare(results, baseline, tolerance):
+    """Prints throughput changes; returns the names that regressed."""
+    regressions = []
+    for name, result in results.items():
+        previous = baseline.get("results", {}).get(name)
+        if not previous or not previous.get("throughput") or not result["throughput"]:
+            continue
+        change = result["throughput"] / previous["throughput"] - 1
+        flag = ""
+        if change < -tolerance:
+            regressions.append(name)
+            flag = "  REGRESSION"
+        print(f"  {name:<24} {change:+.1%} vs baseline{flag}")
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the schedule parsers on a synthetic corpus.")
+    parser.add_argument("--messages", type=int, default=500, help="Synthetic messages to generate.")
+    parser.add_argument("--seed", type=int, default=1, help="Corpus seed.")
+    parser.add_argument("--repeat", type=int, default=5, help="Timed passes per function.")
+    parser.add_argument("--only", nargs="*", help="Benchmark only these functions.")
+    parser.add_argument("--baseline", default=BASELINE_PATH, help="Baseline file.")
+    parser.add_argument("--save-baseline", action="store_true", help="Write the results as the new baseline.")
+    parser.add_argument("--tolerance", type=float, default=0.2,
+                        help="Allowed throughput drop before failing (0.2 = 20%%).")
+    args = parser.parse_args(argv)
+
+    messages = generate_corpus(args.messages, args.seed)
+    suite = build_suite(messages, args.seed)
+    if args.only:
+        suite = {name: suite[name] for name in args.only}
+
+    results = {}
+    print(f"{'function':<24} {'calls/s':>10} {'p50 us':>9} {'p95 us':>9} {'p99 us':>9} {'peak B':>9} {'blocks':>7}")
+    for name, (fn, inputs, before) in suite.items():
+        result = measure(fn, inputs, before, args.repeat)
+        results[name] = result
+        print(
+            f"{name:<24} {result['throughput']:>10} {result['p50_us']:>9} {result['p95_us']:>9} "
+            f"{result['p99_us']:>9} {result['peak_bytes_per_call']:>9} {result['retained_blocks_per_call']:>7}"
+        )
+
+    if args.save_baseline:
+        with open(args.baseline, "w", encoding="utf-8") as baseline_file:
+            json.dump({
+                "python": platform.python_version(),
+                "machine": platform.machine(),
+                "messages": args.messages,
+                "seed": args.seed,
+                "results": results,
+            }, baseline_file, indent=2)
+        print(f"Baseline saved to {args.baseline}")
+        return 0
+
+    if not os.path.exists(args.baseline):
+        print("No baseline found; run with --save-baseline to record one.")
+        return 0
+
+    with open(args.baseline, encoding="utf-8") as baseline_file:
+        baseline = json.load(baseline_file)
+    if (baseline.get("messages"), baseline.get("seed")) != (args.messages, args.seed):
+        print("Warning: baseline was recorded with a different corpus size or seed.")
+    print("Compared with baseline:")
+    regressions = compare(results, baseline, args.tolerance)
+    if regressions:
+        print(f"Throughput regressed for: {', '.join(regressions)}")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
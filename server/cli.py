@@ -0,0 +1,122 @@
+# cli.py
+
+import os
+import sys
+import subprocess
+
+import click
+from flask import current_app
+from flask.cli import AppGroup
+
+# `flask schedule <command>`, next to Flask-Migrate's `flask db <command>`
+schedule_cli = AppGroup("schedule", help="Schedule maintenance commands.")
+
+# Slow imports that should only load on first use
+DEFERRED_MODULES = ("google.generativeai", "dateparser", "telethon", "httpx", "openpyxl")
+
+# Runs in the profiled interpreter: imports the module, then prints the wall time and peak RSS
+PROFILE_SCRIPT = (
+    "import sys, time, resource, importlib\n"
+    "started = time.perf_counter()\n"
+    "importlib.import_module(sys.argv[1])\n"
+    "print(round((time.perf_counter() - started) * 1000, 1), resource.getrusage(resource.RUSAGE_SELF).ru_maxrss)\n"
+)
+
+
+@schedule_cli.command("import-archive")
+@click.argument("path", type=click.Path(exists=True, dir_okay=False))
+@click.option("--workers", type=int, default=None, help="Parser processes (default: all CPU cores).")
+@click.option("--chunk-size", type=int, default=50, show_default=True, help="Messages per parser task.")
+@click.option("--batch-size", type=int, default=500, show_default=True, help="Messages per database transaction.")
+@click.option("--gemini/--no-gemini", default=False, show_default=True,
+              help="Send days the regex parser is unsure about to Gemini.")
+@click.option("--gemini-per-minute", type=float, default=10, show_default=True, help="Gemini rate limit.")
+@click.option("--restart", is_flag=True, help="Ignore the saved checkpoint and import from the start.")
+def import_archive_command(path, workers, chunk_size, batch_size, gemini, gemini_per_minute, restart):
+    """
+    Imports a channel export (Telegram Desktop JSON or JSON Lines).
+    Interrupted imports resume after the last committed batch.
+    """
+    from services.archive_import import import_archive
+
+    def report(stats):
+        click.echo(
+            f"{stats['messages']} messages ({stats['rate']}/s), {stats['days_written']} days written, "
+            f"{stats['failed']} failed, {stats['gemini_calls']} Gemini calls, "
+            f"checkpoint at message {stats['last_message_id']}"
+        )
+
+    stats = import_archive(
+        current_app._get_current_object(),
+        path,
+        workers=workers,
+        chunk_size=chunk_size,
+        batch_size=batch_size,
+        use_gemini=gemini,
+        gemini_per_minute=gemini_per_minute,
+        restart=restart,
+        progress=report,
+    )
+    click.echo(f"Done in {stats['elapsed']}s: {stats['messages']} messages, {stats['days_written']} days written.")
+    click.echo("Restart running servers so their in-memory schedule caches are rebuilt.")
+
+
+def parse_importtime(output: str) -> dict:
+    """
+    Parses `python -X importtime` stderr.
+
+    Returns:
+        dict: {module: (self us, cumulative us)} for every imported module.
+    """
+    modules = {}
+    for line in output.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        fields = line[len("import time:"):].split("|")
+        if len(fields) != 3 or not fields[0].strip().isdigit():
+            continue  # Header line
+        modules[fields[2].strip()] = (int(fields[0]), int(fields[1]))
+    return modules
+
+
+@schedule_cli.command("import-profile")
+@click.option("--module", default="app", show_default=True, help="Module whose import is profiled.")
+@click.option("--top", type=int, default=15, show_default=True, help="Number of slowest modules listed.")
+@click.option("--budget-ms", type=float, envvar="IMPORT_BUDGET_MS", default=None,
+              help="Fail when the import takes longer, in milliseconds (env: IMPORT_BUDGET_MS).")
+@click.option("--with-services", is_flag=True,
+              help="Also resume ingestion jobs, warm the playlist catalog and start the Telegram listener.")
+def import_profile_command(module, top, budget_ms, with_services):
+    """
+    Imports a module in a fresh interpreter under `-X importtime` and
+    reports its import time, peak memory, the slowest modules and which
+    deferred dependencies were loaded anyway. By default app.py's
+    background services are off, so only the import itself is measured.
+    """
+    environment = dict(os.environ, BACKGROUND_SERVICES_ENABLED=str(with_services).lower())
+    if not with_services:
+        environment["TELEGRAM_LISTENER_ENABLED"] = "false"
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", PROFILE_SCRIPT, module],
+        cwd=os.path.dirname(os.path.abspath(__file__)),
+        env=environment,
+        capture_output=True,
+        text=True,
+    )
+    if result.returncode != 0:
+        click.echo(result.stderr[-2000:], err=True)
+        raise click.ClickException(f"Importing '{module}' failed.")
+
+    elapsed_ms, peak_rss_kb = result.stdout.strip().splitlines()[-1].split()
+    modules = parse_importtime(result.stderr)
+    click.echo(f"import {module}: {elapsed_ms} ms, {len(modules)} modules, peak RSS {int(peak_rss_kb) // 1024} MB")
+
+    click.echo(f"{'self ms':>9} {'cumul. ms':>10}  module")
+    for name, (self_us, cumulative_us) in sorted(modules.items(), key=lambda item: -item[1][1])[:top]:
+        click.echo(f"{self_us / 1000:>9.1f} {cumulative_us / 1000:>10.1f}  {name}")
+
+    eager = [name for name in DEFERRED_MODULES if name in modules]
+    click.echo(f"Deferred dependencies loaded at import: {', '.join(eager) if eager else 'none'}")
+
+    if budget_ms is not None and float(elapsed_ms) > budget_ms:
+        raise click.ClickException(f"Import took {elapsed_ms} ms, over the {budget_ms:g} ms budget.")
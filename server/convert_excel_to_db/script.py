@@ -1,17 +1,222 @@
 import os
-import pandas as pd
-from sqlalchemy import create_engine
+import sys
+import sqlite3
+import tempfile
+from itertools import islice
+
+from openpyxl import load_workbook
+from sqlalchemy import create_engine, text
+
+# Run as a standalone script; make the server packages importable
+sys.path.insert(0, os.path.dirname(os.path.abspath(os.path.dirname(__file__))))
+from services.playlist_fts import build_fts_table  # noqa: E402
+from services.reciter_search import normalize_arabic  # noqa: E402
 
 # Paths for the script
 BASE_DIR = os.path.abspath(os.path.dirname(__file__))  # Points to the current directory
 DB_PATH = os.path.join(BASE_DIR, "sheikh_playlist.db")
-DATABASE_URI = f"sqlite:///{DB_PATH}"
 EXCEL_FILE = os.path.join(BASE_DIR, "Sheikh Playlist.xlsx")
 
+TABLE = "sheikh_playlist"
+# Excel header -> table column
+REQUIRED_COLUMNS = {"الشيخ": "reciter", "بلايليست": "link"}
+# Sheet rows per transaction
+BATCH_SIZE = int(os.getenv("IMPORT_BATCH_SIZE", 500))
+# Rejected rows printed individually; the rest are only counted
+MAX_REPORTED_ERRORS = 20
+
+#####################################################################
+# Reading the workbook
+#####################################################################
+def cell_text(row, position) -> str:
+    value = row[position] if position < len(row) else None
+    return "" if value is None else str(value).strip()
+
+
+def iter_sheet_rows(path):
+    """
+    Streams (row number, reciter, link) from the first sheet. Read-only
+    mode keeps one row in memory at a time, whatever the sheet's size.
+
+    Raises:
+        ValueError: The sheet is empty or lacks a REQUIRED_COLUMNS header.
+    """
+    workbook = load_workbook(path, read_only=True, data_only=True)
+    try:
+        rows = workbook.active.iter_rows(values_only=True)
+        header = next(rows, None)
+        if header is None:
+            raise ValueError("The Excel file is empty.")
+
+        positions = {str(name).strip(): index for index, name in enumerate(header) if name is not None}
+        if not all(name in positions for name in REQUIRED_COLUMNS):
+            raise ValueError(f"Excel columns do not match expected structure. Found: {list(positions)}")
+
+        for row_number, row in enumerate(rows, start=2):
+            yield row_number, cell_text(row, positions["الشيخ"]), cell_text(row, positions["بلايليست"])
+    finally:
+        workbook.close()
+
+
+def validate_row(reciter: str, link: str):
+    """Returns why a sheet row cannot be imported, or None."""
+    if not reciter:
+        return "missing reciter"
+    if not normalize_arabic(reciter):
+        return f"reciter '{reciter}' has no letters"
+    if not link:
+        return "missing playlist link"
+    if not link.startswith(("http://", "https://")):
+        return f"link '{link}' is not a URL"
+    return None
+
+#####################################################################
+# Writing the catalog
+#####################################################################
+def prepare_catalog(connection):
+    """
+    Creates the catalog table and its indexes, upgrading a table written by
+    the old pandas importer (no primary key, no normalized name) in place.
+    Existing ids are kept; rows whose names normalize alike keep the lowest.
+    AUTOINCREMENT ids are never reused for a later reciter.
+    """
+    columns = [row[1] for row in connection.execute(text(f"PRAGMA table_info({TABLE})")).all()]
+    if columns and "reciter_normalized" not in columns:
+        connection.execute(text(f"ALTER TABLE {TABLE} RENAME TO {TABLE}_old"))
+
+    connection.execute(text(
+        f"CREATE TABLE IF NOT EXISTS {TABLE} ("
+        "id INTEGER PRIMARY KEY AUTOINCREMENT, "
+        "link TEXT NOT NULL, "
+        "reciter TEXT NOT NULL, "
+        "reciter_normalized TEXT NOT NULL)"
+    ))
+    connection.execute(text(
+        f"CREATE UNIQUE INDEX IF NOT EXISTS ix_{TABLE}_reciter_normalized ON {TABLE} (reciter_normalized)"
+    ))
+
+    if columns and "reciter_normalized" not in columns:
+        old_rows = connection.execute(text(
+            f"SELECT id, link, reciter FROM {TABLE}_old WHERE reciter IS NOT NULL ORDER BY id"
+        ))
+        while True:
+            batch = [
+                {"id": row.id, "link": row.link or "", "reciter": row.reciter,
+                 "reciter_normalized": normalize_arabic(row.reciter)}
+                for row in islice(old_rows, BATCH_SIZE)
+            ]
+            if not batch:
+                break
+            connection.execute(text(
+                f"INSERT OR IGNORE INTO {TABLE} (id, link, reciter, reciter_normalized) "
+                "VALUES (:id, :link, :reciter, :reciter_normalized)"
+            ), batch)
+        connection.execute(text(f"DROP TABLE {TABLE}_old"))
+        print(f"Upgraded the existing '{TABLE}' table, keeping its ids.")
+
+
+def upsert_batch(connection, batch):
+    """
+    Updates the name/link of known reciters and inserts new ones, matched by
+    normalized name so ids survive re-imports and spelling fixes. (An
+    INSERT ... ON CONFLICT DO UPDATE would burn an AUTOINCREMENT id per
+    existing row.)
+    """
+    connection.execute(text(
+        f"UPDATE {TABLE} SET link = :link, reciter = :reciter WHERE reciter_normalized = :reciter_normalized"
+    ), batch)
+    connection.execute(text(
+        f"INSERT INTO {TABLE} (link, reciter, reciter_normalized) "
+        "SELECT :link, :reciter, :reciter_normalized "
+        f"WHERE NOT EXISTS (SELECT 1 FROM {TABLE} WHERE reciter_normalized = :reciter_normalized)"
+    ), batch)
+    connection.execute(text(
+        "INSERT OR IGNORE INTO import_seen (reciter_normalized) VALUES (:reciter_normalized)"
+    ), batch)
+
+
+def iter_catalog(connection):
+    """
+    Yields the catalog in id order, BATCH_SIZE rows per query. No statement
+    stays open between batches, so the caller may drop and create tables.
+    """
+    last_id = -1
+    while True:
+        rows = connection.execute(
+            text(f"SELECT id, reciter, link FROM {TABLE} WHERE id > :last_id ORDER BY id LIMIT :limit"),
+            {"last_id": last_id, "limit": BATCH_SIZE},
+        ).all()
+        if not rows:
+            return
+        for row in rows:
+            yield row._mapping
+        last_id = rows[-1].id
+
+
+def import_rows(engine, sheet_rows):
+    """
+    Upserts `sheet_rows` in BATCH_SIZE transactions, deletes reciters no
+    longer in the sheet and rebuilds the FTS table.
+
+    Returns:
+        dict: imported, new, removed and rejected row counts.
+    """
+    stats = {"imported": 0, "new": 0, "removed": 0, "rejected": 0}
+    with engine.connect() as connection:
+        with connection.begin():
+            prepare_catalog(connection)
+            # Names seen in this import; on disk, so memory stays flat
+            connection.execute(text("CREATE TEMP TABLE import_seen (reciter_normalized TEXT PRIMARY KEY)"))
+            existing = connection.execute(text(f"SELECT COUNT(*) FROM {TABLE}")).scalar()
+
+        sheet_rows = iter(sheet_rows)
+        while True:
+            chunk = list(islice(sheet_rows, BATCH_SIZE))
+            if not chunk:
+                break
+            batch = []
+            for row_number, reciter, link in chunk:
+                error = validate_row(reciter, link)
+                if error:
+                    stats["rejected"] += 1
+                    if stats["rejected"] <= MAX_REPORTED_ERRORS:
+                        print(f"Row {row_number} skipped: {error}")
+                    continue
+                batch.append({"link": link, "reciter": reciter, "reciter_normalized": normalize_arabic(reciter)})
+            if batch:
+                with connection.begin():
+                    upsert_batch(connection, batch)
+                stats["imported"] += len(batch)
+
+        if not stats["imported"]:
+            return stats
+
+        with connection.begin():
+            stats["removed"] = connection.execute(text(
+                f"DELETE FROM {TABLE} WHERE reciter_normalized NOT IN (SELECT reciter_normalized FROM import_seen)"
+            )).rowcount
+            remaining = connection.execute(text(f"SELECT COUNT(*) FROM {TABLE}")).scalar()
+            stats["new"] = remaining - (existing - stats["removed"])
+            build_fts_table(connection, iter_catalog(connection))
+    return stats
+
+
+def copy_database(source_path: str, target_path: str):
+    """Consistent copy through SQLite's backup API, safe while the app reads the source."""
+    source = sqlite3.connect(source_path)
+    target = sqlite3.connect(target_path)
+    try:
+        source.backup(target)
+    finally:
+        target.close()
+        source.close()
+
 
 def load_excel_to_db():
     """
-    Reads an Excel file and writes its content to a SQLite database.
+    Streams the Excel file into a copy of the SQLite database, then swaps
+    the copy into place, so running servers never read a half-written
+    catalog and ids of existing reciters are preserved.
     """
     try:
         print(f"Database absolute path: {DB_PATH}")
@@ -22,31 +227,32 @@ def load_excel_to_db():
             print(f"Error: Excel file not found at {EXCEL_FILE}")
             return
 
-        # Read Excel file
-        df = pd.read_excel(EXCEL_FILE)
-
-        # Validate the DataFrame
-        if df.empty:
-            print("Error: The Excel file is empty.")
-            return
-
-        # Rename columns if necessary
-        required_columns = {"الشيخ": "reciter", "بلايليست": "link"}
-        if not all(col in df.columns for col in required_columns.keys()):
-            print(f"Error: Excel columns do not match expected structure. Found: {list(df.columns)}")
-            return
+        # Same directory as DB_PATH, so os.replace is an atomic rename
+        descriptor, temp_path = tempfile.mkstemp(prefix=".sheikh_playlist.", suffix=".db", dir=BASE_DIR)
+        os.close(descriptor)
+        try:
+            if os.path.exists(DB_PATH):
+                copy_database(DB_PATH, temp_path)
 
-        df.rename(columns=required_columns, inplace=True)
+            engine = create_engine(f"sqlite:///{temp_path}")
+            try:
+                stats = import_rows(engine, iter_sheet_rows(EXCEL_FILE))
+            finally:
+                engine.dispose()
 
-        # Add an 'id' column if missing
-        if 'id' not in df.columns:
-            df.reset_index(inplace=True, drop=False)
-            df.rename(columns={'index': 'id'}, inplace=True)
+            if not stats["imported"]:
+                print(f"Error: No valid rows in the Excel file ({stats['rejected']} rejected). Database left unchanged.")
+                return
 
-        # Create database connection and write data
-        engine = create_engine(DATABASE_URI)
-        df.to_sql('sheikh_playlist', engine, if_exists='replace', index=False)
+            os.replace(temp_path, DB_PATH)
+        finally:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
 
+        print(
+            f"Imported {stats['imported']} rows: {stats['new']} new reciters, "
+            f"{stats['removed']} removed, {stats['rejected']} rejected."
+        )
         print("Data successfully loaded into the database!")
 
     except Exception as e:
@@ -0,0 +1,94 @@
+"""add start_minute to daily_schedule
+
+Revision ID: 3c1f0a9d7b42
+Revises:
+Create Date: 2026-10-16 09:12:41.503118
+
+"""
+from datetime import datetime
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '3c1f0a9d7b42'
+down_revision = None
+branch_labels = None
+depends_on = None
+
+INDEX_NAME = 'ix_daily_schedule_date_start_minute'
+
+
+def upgrade(engine_name):
+    globals()["upgrade_%s" % engine_name]()
+
+
+def downgrade(engine_name):
+    globals()["downgrade_%s" % engine_name]()
+
+
+def _time_to_minutes(time_str):
+    # Frozen copy of schedule_parsing.parse_logic.time_to_minutes
+    time_str = (time_str or "").strip()
+    for fmt in ("%I:%M %p", "%H:%M"):
+        try:
+            parsed = datetime.strptime(time_str, fmt)
+        except ValueError:
+            continue
+        return parsed.hour * 60 + parsed.minute
+    return None
+
+
+def upgrade_dynamic():
+    bind = op.get_bind()
+    inspector = sa.inspect(bind)
+
+    # db.create_all() at app start may already have created the column and
+    # index on a fresh database, so only add what is missing.
+    columns = {col['name'] for col in inspector.get_columns('daily_schedule')}
+    if 'start_minute' not in columns:
+        with op.batch_alter_table('daily_schedule') as batch_op:
+            batch_op.add_column(sa.Column('start_minute', sa.Integer(), nullable=True))
+
+    indexes = {ix['name'] for ix in inspector.get_indexes('daily_schedule')}
+    if INDEX_NAME not in indexes:
+        op.create_index(INDEX_NAME, 'daily_schedule', ['schedule_date', 'start_minute'])
+
+    # Backfill existing rows
+    daily_schedule = sa.table(
+        'daily_schedule',
+        sa.column('id', sa.Integer),
+        sa.column('time', sa.String),
+        sa.column('start_minute', sa.Integer),
+    )
+    rows = bind.execute(
+        sa.select(daily_schedule.c.id, daily_schedule.c.time)
+        .where(daily_schedule.c.start_minute.is_(None))
+    ).fetchall()
+    updates = []
+    for row_id, time_str in rows:
+        minutes = _time_to_minutes(time_str)
+        if minutes is not None:
+            updates.append({"row_id": row_id, "minutes": minutes})
+    if updates:
+        bind.execute(
+            daily_schedule.update()
+            .where(daily_schedule.c.id == sa.bindparam("row_id"))
+            .values(start_minute=sa.bindparam("minutes")),
+            updates,
+        )
+
+
+def downgrade_dynamic():
+    op.drop_index(INDEX_NAME, table_name='daily_schedule')
+    with op.batch_alter_table('daily_schedule') as batch_op:
+        batch_op.drop_column('start_minute')
+
+
+def upgrade_static():
+    pass
+
+
+def downgrade_static():
+    pass
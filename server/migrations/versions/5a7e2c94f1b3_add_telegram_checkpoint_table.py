@@ -0,0 +1,49 @@
+"""add telegram_checkpoint table
+
+Revision ID: 5a7e2c94f1b3
+Revises: d19c6f3a8e20
+Create Date: 2026-10-16 13:41:09.528317
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '5a7e2c94f1b3'
+down_revision = 'd19c6f3a8e20'
+branch_labels = None
+depends_on = None
+
+
+def upgrade(engine_name):
+    globals()["upgrade_%s" % engine_name]()
+
+
+def downgrade(engine_name):
+    globals()["downgrade_%s" % engine_name]()
+
+
+def upgrade_dynamic():
+    # db.create_all() at app start may already have created the table
+    if sa.inspect(op.get_bind()).has_table('telegram_checkpoint'):
+        return
+    op.create_table(
+        'telegram_checkpoint',
+        sa.Column('channel', sa.String(length=255), nullable=False),
+        sa.Column('last_message_id', sa.Integer(), nullable=False),
+        sa.Column('updated_at', sa.DateTime(), nullable=False),
+        sa.PrimaryKeyConstraint('channel')
+    )
+
+
+def downgrade_dynamic():
+    op.drop_table('telegram_checkpoint')
+
+
+def upgrade_static():
+    pass
+
+
+def downgrade_static():
+    pass
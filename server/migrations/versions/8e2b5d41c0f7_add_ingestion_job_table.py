@@ -0,0 +1,57 @@
+"""add ingestion_job table
+
+Revision ID: 8e2b5d41c0f7
+Revises: 3c1f0a9d7b42
+Create Date: 2026-10-16 10:03:27.184502
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '8e2b5d41c0f7'
+down_revision = '3c1f0a9d7b42'
+branch_labels = None
+depends_on = None
+
+
+def upgrade(engine_name):
+    globals()["upgrade_%s" % engine_name]()
+
+
+def downgrade(engine_name):
+    globals()["downgrade_%s" % engine_name]()
+
+
+def upgrade_dynamic():
+    # db.create_all() at app start may already have created the table
+    if sa.inspect(op.get_bind()).has_table('ingestion_job'):
+        return
+    op.create_table(
+        'ingestion_job',
+        sa.Column('id', sa.String(length=32), nullable=False),
+        sa.Column('status', sa.String(length=20), nullable=False),
+        sa.Column('stage', sa.String(length=50), nullable=True),
+        sa.Column('raw_text', sa.Text(), nullable=False),
+        sa.Column('schedule_date', sa.Date(), nullable=True),
+        sa.Column('error', sa.Text(), nullable=True),
+        sa.Column('attempts', sa.Integer(), nullable=False),
+        sa.Column('created_at', sa.DateTime(), nullable=False),
+        sa.Column('updated_at', sa.DateTime(), nullable=False),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_ingestion_job_status', 'ingestion_job', ['status'])
+
+
+def downgrade_dynamic():
+    op.drop_index('ix_ingestion_job_status', table_name='ingestion_job')
+    op.drop_table('ingestion_job')
+
+
+def upgrade_static():
+    pass
+
+
+def downgrade_static():
+    pass
@@ -0,0 +1,53 @@
+"""add gemini_parse_cache table
+
+Revision ID: b74e9a0c2d15
+Revises: 8e2b5d41c0f7
+Create Date: 2026-10-16 10:41:55.902317
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'b74e9a0c2d15'
+down_revision = '8e2b5d41c0f7'
+branch_labels = None
+depends_on = None
+
+
+def upgrade(engine_name):
+    globals()["upgrade_%s" % engine_name]()
+
+
+def downgrade(engine_name):
+    globals()["downgrade_%s" % engine_name]()
+
+
+def upgrade_dynamic():
+    # db.create_all() at app start may already have created the table
+    if sa.inspect(op.get_bind()).has_table('gemini_parse_cache'):
+        return
+    op.create_table(
+        'gemini_parse_cache',
+        sa.Column('key', sa.String(length=64), nullable=False),
+        sa.Column('result', sa.Text(), nullable=False),
+        sa.Column('hits', sa.Integer(), nullable=False),
+        sa.Column('created_at', sa.DateTime(), nullable=False),
+        sa.Column('last_used_at', sa.DateTime(), nullable=False),
+        sa.PrimaryKeyConstraint('key')
+    )
+    op.create_index('ix_gemini_parse_cache_last_used_at', 'gemini_parse_cache', ['last_used_at'])
+
+
+def downgrade_dynamic():
+    op.drop_index('ix_gemini_parse_cache_last_used_at', table_name='gemini_parse_cache')
+    op.drop_table('gemini_parse_cache')
+
+
+def upgrade_static():
+    pass
+
+
+def downgrade_static():
+    pass
@@ -0,0 +1,46 @@
+"""add content_hash to daily_table_metadata
+
+Revision ID: d19c6f3a8e20
+Revises: b74e9a0c2d15
+Create Date: 2026-10-16 11:20:08.663041
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'd19c6f3a8e20'
+down_revision = 'b74e9a0c2d15'
+branch_labels = None
+depends_on = None
+
+
+def upgrade(engine_name):
+    globals()["upgrade_%s" % engine_name]()
+
+
+def downgrade(engine_name):
+    globals()["downgrade_%s" % engine_name]()
+
+
+def upgrade_dynamic():
+    # db.create_all() at app start may already have created the column.
+    # Existing days keep a NULL hash, so their first resend is written once.
+    columns = {col['name'] for col in sa.inspect(op.get_bind()).get_columns('daily_table_metadata')}
+    if 'content_hash' not in columns:
+        with op.batch_alter_table('daily_table_metadata') as batch_op:
+            batch_op.add_column(sa.Column('content_hash', sa.String(length=64), nullable=True))
+
+
+def downgrade_dynamic():
+    with op.batch_alter_table('daily_table_metadata') as batch_op:
+        batch_op.drop_column('content_hash')
+
+
+def upgrade_static():
+    pass
+
+
+def downgrade_static():
+    pass
@@ -0,0 +1,46 @@
+"""add edit to ingestion_job
+
+Revision ID: f3b8a61d9c24
+Revises: 5a7e2c94f1b3
+Create Date: 2026-10-17 09:05:12.418260
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'f3b8a61d9c24'
+down_revision = '5a7e2c94f1b3'
+branch_labels = None
+depends_on = None
+
+
+def upgrade(engine_name):
+    globals()["upgrade_%s" % engine_name]()
+
+
+def downgrade(engine_name):
+    globals()["downgrade_%s" % engine_name]()
+
+
+def upgrade_dynamic():
+    # db.create_all() at app start may already have created the column.
+    # Jobs queued before this revision were all plain stores.
+    columns = {col['name'] for col in sa.inspect(op.get_bind()).get_columns('ingestion_job')}
+    if 'edit' not in columns:
+        with op.batch_alter_table('ingestion_job') as batch_op:
+            batch_op.add_column(sa.Column('edit', sa.Boolean(), nullable=False, server_default=sa.false()))
+
+
+def downgrade_dynamic():
+    with op.batch_alter_table('ingestion_job') as batch_op:
+        batch_op.drop_column('edit')
+
+
+def upgrade_static():
+    pass
+
+
+def downgrade_static():
+    pass
@@ -1,3 +1,4 @@
+from datetime import datetime
 from database import db
 
 
@@ -23,9 +24,14 @@ class DailySchedule(db.Model):
     """
     __bind_key__ = 'dynamic'
     __tablename__ = 'daily_schedule'
+    __table_args__ = (
+        # Serves "one day in time order" reads as an index range scan
+        db.Index('ix_daily_schedule_date_start_minute', 'schedule_date', 'start_minute'),
+    )
 
     id = db.Column(db.Integer, primary_key=True)  # Auto-incrementing primary key
     time = db.Column(db.String(50), nullable=False)  # Recitation time (e.g., "06:00")
+    start_minute = db.Column(db.Integer, nullable=True)  # Cairo start time in minutes since midnight, NULL if unparseable
     reciter = db.Column(db.String(255), nullable=False)  # Name of the Sheikh/Reciter
     surah = db.Column(db.String(255), nullable=False)  # Name(s) of the Surah(s) recited
     duration = db.Column(db.String(50), nullable=True)  # Duration of the recitation (e.g., "28 ق")
@@ -42,3 +48,54 @@ class DailyTableMetadata(db.Model):
 
     id = db.Column(db.Integer, primary_key=True)  # Auto-incrementing primary key
     schedule_date = db.Column(db.Date, unique=True, nullable=False)  # Unique date for the schedule
+    content_hash = db.Column(db.String(64), nullable=True)  # sha256 of the stored rows, to skip unchanged resends
+
+
+class IngestionJob(db.Model):
+    """
+    Background ingestion job for a raw schedule message.
+    Persisted in the 'dynamic' database bind so queued jobs survive restarts.
+    """
+    __bind_key__ = 'dynamic'
+    __tablename__ = 'ingestion_job'
+
+    id = db.Column(db.String(32), primary_key=True)  # uuid4 hex
+    status = db.Column(db.String(20), nullable=False, default='queued', index=True)  # queued/running/succeeded/failed
+    stage = db.Column(db.String(50), nullable=True)  # Human-readable progress (e.g., "parsing")
+    raw_text = db.Column(db.Text, nullable=False)  # The message being ingested
+    schedule_date = db.Column(db.Date, nullable=True)  # Set once the header date is parsed
+    error = db.Column(db.Text, nullable=True)  # Failure reason
+    attempts = db.Column(db.Integer, nullable=False, default=0)  # Number of times a worker picked it up
+    edit = db.Column(db.Boolean, nullable=False, default=False, server_default=db.false())  # Apply as an edit of the stored day
+    created_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+    updated_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+
+class GeminiParseCache(db.Model):
+    """
+    Cache of validated Gemini parse results, keyed by a hash of the
+    normalized message text and the prompt template version.
+    This uses the 'dynamic' database bind.
+    """
+    __bind_key__ = 'dynamic'
+    __tablename__ = 'gemini_parse_cache'
+
+    key = db.Column(db.String(64), primary_key=True)  # sha256 hex of prompt version + normalized text
+    result = db.Column(db.Text, nullable=False)  # JSON of process_gemini_output's return value
+    hits = db.Column(db.Integer, nullable=False, default=0)  # Number of times the entry was served
+    created_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+    last_used_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow, index=True)  # LRU eviction order
+
+
+class TelegramCheckpoint(db.Model):
+    """
+    Last Telegram message id processed per channel, so the listener can
+    catch up on messages posted while it was down.
+    This uses the 'dynamic' database bind.
+    """
+    __bind_key__ = 'dynamic'
+    __tablename__ = 'telegram_checkpoint'
+
+    channel = db.Column(db.String(255), primary_key=True)  # Channel username as configured
+    last_message_id = db.Column(db.Integer, nullable=False, default=0)  # Highest message id handled
+    updated_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow, onupdate=datetime.utcnow)
@@ -1,6 +1,18 @@
-from flask import Blueprint, jsonify, request
+import os
+from flask import Blueprint, jsonify, request, make_response, redirect, url_for
 from database import db  # Single database instance
-from models import SheikhPlaylist  # Use the correct model for the static database
+from models import DailySchedule
+from services.schedule_version import schedule_version, conditional_validators, apply_validators
+from services.reciter_search import (
+    ensure_reciter_index_loaded,
+    fuzzy_reciter_index,
+    highlight_matches,
+    reciter_index,
+    reciter_suggester,
+    reset_reciter_indexes
+)
+from services.playlist_fts import FTS_MAX_LIMIT, search_fts, fts_table_exists
+from services.playlist_snapshot import playlist_snapshot, database_signature
 import logging
 
 # Configure logging
@@ -10,37 +22,208 @@ logger = logging.getLogger(__name__)
 # Define the blueprint
 playlist_bp = Blueprint("playlists", __name__)
 
+# "fts" queries the FTS5 table built by convert_excel_to_db/script.py,
+# "index" the in-memory trigram index
+PLAYLIST_SEARCH_BACKEND = os.getenv("PLAYLIST_SEARCH_BACKEND", "fts").strip().lower()
+
+
+def ensure_catalog_current():
+    """
+    Builds the catalog snapshot on first use, and rebuilds it with the search
+    indexes when an import has replaced sheikh_playlist.db since.
+    """
+    engine = db.engines["static"]
+    signature = database_signature(engine.url.database)
+    if playlist_snapshot.version is not None and playlist_snapshot.signature == signature:
+        return
+    if playlist_snapshot.version is not None:
+        logger.info("Static database replaced; reloading the playlist catalog.")
+        # Pooled connections still have the old file open
+        engine.dispose()
+        reset_reciter_indexes()
+    ensure_reciter_index_loaded()
+    playlist_snapshot.build(reciter_index.all(), signature)
+
+
+def search_playlists_fts(query, limit, offset):
+    """
+    bm25-ranked FTS5 search on the static database.
+    Returns None when the FTS table has not been built yet.
+    """
+    with db.engines["static"].connect() as connection:
+        if not fts_table_exists(connection):
+            logger.warning("FTS table missing; rerun convert_excel_to_db/script.py. Using the in-memory index.")
+            return None
+        return search_fts(connection, query, limit, offset)
+
+
+def ensure_reciter_suggester_current():
+    """
+    (Re)builds `reciter_suggester` when schedules changed since the last
+    build, so popularity follows the stored schedules.
+    """
+    version, _ = schedule_version.snapshot()
+    if reciter_suggester.version == version:
+        return
+    ensure_reciter_index_loaded()
+    reciter_counts = dict(
+        db.session.query(DailySchedule.reciter, db.func.count(DailySchedule.id))
+        .group_by(DailySchedule.reciter)
+        .all()
+    )
+    reciter_suggester.build(reciter_index.all(), reciter_counts, version)
+
+
 @playlist_bp.route("/", methods=["GET"])
 def get_playlists():
     """
     API endpoint to fetch playlists from the static database.
-    Supports filtering by reciter name using a query parameter.
+    Supports filtering by reciter name using a query parameter, ranked best
+    match first, either by bm25 over the FTS5 table or from the in-memory
+    trigram index, depending on PLAYLIST_SEARCH_BACKEND. Either way each
+    search result has a "highlight" field: the HTML-escaped name with the
+    matched words wrapped in <mark>.
+    Query parameters:
+      - q: Reciter name to search for.
+      - mode: "ranked" (default) or "fuzzy" for typo-tolerant matching within
+        a bounded edit distance. Ranked searches that find nothing fall back
+        to fuzzy matching.
+      - limit, offset: Page of results (at most FTS_MAX_LIMIT rows), for both
+        backends. Without limit every match from offset on is returned.
+    Without q, limit or offset the whole catalog is served from the
+    pre-compressed snapshot (see /catalog).
+    Answers conditional requests with 304 before querying the database.
     """
     try:
         # Retrieve optional search query from the request
         query = request.args.get("q", "").strip()
+        mode = request.args.get("mode", "ranked").strip().lower()
+        if mode not in ("ranked", "fuzzy"):
+            return jsonify({"error": "Invalid 'mode'. Expected 'ranked' or 'fuzzy'."}), 400
+        try:
+            limit = int(request.args["limit"]) if "limit" in request.args else None
+            offset = int(request.args.get("offset", 0))
+        except ValueError:
+            return jsonify({"error": "Invalid 'limit' or 'offset'. They must be integers."}), 400
+        if (limit is not None and limit < 1) or offset < 0:
+            return jsonify({"error": "'limit' must be positive and 'offset' non-negative."}), 400
+
+        ensure_catalog_current()
+        if not query and limit is None and not offset:
+            # Full catalog: pre-rendered bytes, also at the cacheable versioned URL
+            response = playlist_snapshot.response()
+            response.headers["Content-Location"] = catalog_url(playlist_snapshot.version)
+            return response
+
+        # Results depend on the catalog as well as on the stored schedules
+        etag, last_modified, not_modified = conditional_validators(
+            f"{playlist_snapshot.version}|{mode}|{query}|{limit}|{offset}"
+        )
+        if not_modified:
+            return apply_validators(make_response("", 304), etag, last_modified)
 
-        if query:
-            # Filter by reciter name (case-insensitive)
-            playlists = SheikhPlaylist.query.filter(
-                SheikhPlaylist.reciter.ilike(f"%{query}%")
-            ).all()
-        else:
-            # Fetch all playlists if no query is provided
-            playlists = SheikhPlaylist.query.all()
-
-        # Convert each row into a dictionary
-        result = [
-            {
-                "id": playlist.id,
-                "reciter": playlist.reciter,
-                "link": playlist.link
-            }
-            for playlist in playlists
-        ]
-
-        logger.info(f"Fetched {len(result)} playlists from the database.")
-        return jsonify(result), 200
+        if limit is not None:
+            limit = min(limit, FTS_MAX_LIMIT)
+        result = None
+        if query and mode == "ranked" and PLAYLIST_SEARCH_BACKEND == "fts":
+            result = search_playlists_fts(query, limit, offset)
+            if result == [] and offset:
+                # Past the last page rather than a miss; no fuzzy fallback
+                return apply_validators(jsonify(result), etag, last_modified), 200
+
+        if not result:
+            ensure_reciter_index_loaded()
+            if query and mode == "ranked":
+                # No FTS table, or no FTS hit: ranked match on Arabic-normalized
+                # names (hamza, taa marbuta, alef maqsura and tashkeel variants
+                # all match, as do inner substrings)
+                result = reciter_index.search(query, None if limit is None else offset + limit)
+            if query and not result:
+                # Fuzzy mode, or misspelled names (e.g. from Gemini or parse_reciter)
+                result = [playlist for playlist, _ in fuzzy_reciter_index.lookup(query)]
+            elif not query:
+                # Fetch all playlists if no query is provided
+                result = reciter_index.all()
+            result = result[offset:] if limit is None else result[offset:offset + limit]
+            if query:
+                # Same shape as the FTS results
+                result = [
+                    dict(playlist, highlight=highlight_matches(playlist["reciter"], query))
+                    for playlist in result
+                ]
+
+        logger.info(f"Fetched {len(result)} playlists from the search index.")
+        return apply_validators(jsonify(result), etag, last_modified), 200
     except Exception as e:
         logger.error(f"Error fetching playlists: {e}")
         return jsonify({"error": "Failed to fetch playlists"}), 500
+
+
+@playlist_bp.route("/suggest", methods=["GET"])
+def suggest_reciters():
+    """
+    Prefix autocomplete for reciter names.
+    Query parameters:
+      - prefix: Start of the reciter's name or of any word in it.
+      - k: Number of suggestions (default 8, max 20), most broadcast first.
+    Returns a compact [{"id", "reciter"}] list.
+    """
+    try:
+        prefix = request.args.get("prefix", "").strip()
+        try:
+            k = int(request.args.get("k", 8))
+        except ValueError:
+            return jsonify({"error": "Invalid 'k'. It must be an integer."}), 400
+
+        ensure_catalog_current()
+        etag, last_modified, not_modified = conditional_validators(
+            f"suggest|{playlist_snapshot.version}|{prefix}|{k}"
+        )
+        if not_modified:
+            return apply_validators(make_response("", 304), etag, last_modified)
+
+        ensure_reciter_suggester_current()
+        result = reciter_suggester.suggest(prefix, k)
+        return apply_validators(jsonify(result), etag, last_modified), 200
+    except Exception as e:
+        logger.error(f"Error suggesting reciters: {e}")
+        return jsonify({"error": "Failed to suggest reciters"}), 500
+
+
+def catalog_url(version):
+    return url_for("playlists.get_catalog_version", version=version)
+
+
+@playlist_bp.route("/catalog", methods=["GET"])
+def get_catalog():
+    """
+    Redirects to the versioned URL of the current catalog snapshot.
+    Clients that follow it can cache the catalog until the redirect changes.
+    """
+    try:
+        ensure_catalog_current()
+        response = redirect(catalog_url(playlist_snapshot.version), 302)
+        response.headers["Cache-Control"] = "no-cache"
+        return response
+    except Exception as e:
+        logger.error(f"Error redirecting to the playlist catalog: {e}")
+        return jsonify({"error": "Failed to fetch playlists"}), 500
+
+
+@playlist_bp.route("/catalog/<version>", methods=["GET"])
+def get_catalog_version(version):
+    """
+    Serves one catalog version as stored gzip, brotli or plain JSON bytes,
+    cacheable as immutable. Replaced versions answer 404 with the current URL.
+    """
+    try:
+        ensure_catalog_current()
+        if version != playlist_snapshot.version:
+            return jsonify({
+                "error": "Unknown catalog version",
+                "current": catalog_url(playlist_snapshot.version)
+            }), 404
+        return playlist_snapshot.response(immutable=True)
+    except Exception as e:
+        logger.error(f"Error serving playlist catalog {version}: {e}")
+        return jsonify({"error": "Failed to fetch playlists"}), 500
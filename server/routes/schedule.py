@@ -1,31 +1,54 @@
 import re
+import json
 import logging
-from datetime import datetime, timedelta
-from flask import Blueprint, request, jsonify, current_app
+from datetime import datetime, timedelta, timezone
+from flask import Blueprint, request, jsonify, current_app, make_response, Response, stream_with_context
 from flask_socketio import emit
-from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
-
-# >>> NEW
-import dateparser
+from zoneinfo import ZoneInfo
 
 # Local imports
 from database import db
-from models import DailySchedule, DailyTableMetadata
+from models import DailySchedule, DailyTableMetadata, IngestionJob
 from schedule_parsing.parse_logic import (
-    parse_schedule_final,  # the new top-level function
     remove_brackets
 )
+from schedule_parsing.fast_parser import parse_schedule_detailed
 from schedule_parsing.gemini_handler import (
     process_gemini_output,
-    retry_gemini_request
+    retry_gemini_request,
+    gemini_client
 )
 from schedule_parsing.gemini_handler import PROMPT_TEMPLATE, API_KEY, model
+from services.schedule_cache import schedule_cache
+from services.schedule_version import schedule_version, conditional_validators, apply_validators
+from services.now_playing import schedule_index, serialize_indexed_entry
+from services.reciter_search import match_reciter
+from services.timezones import timezone_service, DEFAULT_TIMEZONE
+from services.ingestion_jobs import enqueue_ingestion, serialize_job
+from services.gemini_cache import gemini_cache, gemini_cache_key
+from services.schedule_store import replace_schedule_day, apply_schedule_diff
+from services.fast_path import (
+    FAST_PATH_MIN_CONFIDENCE,
+    fast_path_metrics,
+    merge_schedules,
+    score_schedule,
+    to_storage_entry
+)
 
 logger = logging.getLogger(__name__)
 
 # Define the Blueprint
 schedule_bp = Blueprint("schedule_bp", __name__)
 
+# Limits for /range
+RANGE_MAX_DAYS = 31
+RANGE_DEFAULT_LIMIT = 500
+RANGE_MAX_LIMIT = 2000
+RANGE_STREAM_BATCH = 100
+
+# Limit for /next
+NEXT_MAX_ITEMS = 50
+
 ############################
 # HELPER: parse_header_dates
 ############################
@@ -82,6 +105,8 @@ def parse_gregorian_date(date_string: str) -> datetime:
     extracted_date_str = match.group(0)  # e.g. "09/01/2025" or "9/1/2025"
 
     # Use dateparser to flexibly handle the extracted substring
+    import dateparser  # Slow to import (large locale tables); deferred to first use
+
     parsed_dt = dateparser.parse(extracted_date_str, languages=['ar'])
     if not parsed_dt:
         raise ValueError(f"Could not parse date from '{extracted_date_str}' using dateparser.")
@@ -91,8 +116,8 @@ def parse_gregorian_date(date_string: str) -> datetime:
 # ------------------------ Helper Functions ------------------------
 def process_raw_text(raw_text):
     """
-    Processes raw schedule text using Gemini AI (with retry logic),
-    falling back to existing parsing logic if needed.
+    Processes raw schedule text with the regex parser, calling Gemini AI
+    (with retry logic) only when the regex parse is not confident enough.
     
     Returns structured data in the format:
     {
@@ -117,27 +142,17 @@ def process_raw_text(raw_text):
         logger.error(f"Invalid date format in the header: '{date_str}'. Error: {ve}")
         raise ValueError("Invalid date format in the header.")
 
-    # Step 2: Try Gemini (with retries) and then finalize its output
-    try:
-        logger.info("Attempting to process the schedule via Gemini + retry logic.")
-        gemini_raw_result = retry_gemini_request(raw_text, retries=3, backoff_factor=1.0)
-        # Convert Gemini's JSON to our final format
-        gemini_processed = process_gemini_output(gemini_raw_result)
-
-        # **Override** the date from Gemini with our locally parsed date
-        final_schedule = gemini_processed["final_schedule"]
-        logger.info("Gemini successfully processed the schedule with retry logic.")
-    except Exception as gemini_error:
-        # Gemini (all retries) failed -> fallback to parse_schedule_final
-        logger.error(f"Gemini processing failed: {gemini_error}. Falling back.")
-        try:
-            final_schedule = parse_schedule_final(raw_text)
-            if not final_schedule:
-                raise ValueError("Fallback parsing logic returned an empty schedule.")
-            logger.info("Fallback parsing logic successfully processed the schedule.")
-        except Exception as fallback_error:
-            logger.error(f"Fallback parsing logic failed: {fallback_error}")
-            raise ValueError("Both Gemini (after retries) and fallback parsing failed.")
+    # Step 2: Score the regex parse; a confident one skips Gemini entirely
+    records = parse_schedule_detailed(raw_text)
+    fast_schedule = [to_storage_entry(record) for record in records]
+    score = score_schedule(records)
+    if score >= FAST_PATH_MIN_CONFIDENCE:
+        logger.info(f"Regex parse scored {score:.2f}; storing without Gemini.")
+        fast_path_metrics.record("fast_path", score)
+        final_schedule = fast_schedule
+    else:
+        logger.info(f"Regex parse scored {score:.2f}; below {FAST_PATH_MIN_CONFIDENCE}, using Gemini.")
+        final_schedule = gemini_schedule_merged(raw_text, fast_schedule, score)
 
     # Double-check final schedule
     if not final_schedule:
@@ -155,6 +170,39 @@ def process_raw_text(raw_text):
     return processed_data
 
 
+def gemini_schedule_merged(raw_text, fast_schedule, score):
+    """
+    Runs Gemini (cached, with retries) and fills the fields it missed from
+    the regex parse. Falls back to the regex parse alone if Gemini fails.
+    """
+    try:
+        # Reposted or replayed messages reuse the validated result of an earlier call
+        cache_key = gemini_cache_key(raw_text)
+        gemini_processed = gemini_cache.get(cache_key)
+        if gemini_processed is None:
+            logger.info("Attempting to process the schedule via Gemini + retry logic.")
+            gemini_raw_result = retry_gemini_request(raw_text, retries=3, backoff_factor=1.0)
+            # Convert Gemini's JSON to our final format
+            gemini_processed = process_gemini_output(gemini_raw_result)
+            gemini_cache.put(cache_key, gemini_processed)
+        logger.info("Gemini successfully processed the schedule with retry logic.")
+    except Exception as gemini_error:
+        # Gemini (all retries) failed -> fallback to the regex parser
+        logger.error(f"Gemini processing failed: {gemini_error}. Falling back.")
+        if not fast_schedule:
+            raise ValueError("Both Gemini (after retries) and fallback parsing failed.")
+        fast_path_metrics.record("fallback", score)
+        logger.info("Fallback parsing logic successfully processed the schedule.")
+        return fast_schedule
+
+    # The date from Gemini is ignored in favour of the locally parsed header date
+    final_schedule, filled = merge_schedules(gemini_processed["final_schedule"], fast_schedule)
+    if filled:
+        logger.info(f"Filled {filled} fields of the Gemini schedule from the regex parse.")
+    fast_path_metrics.record("gemini_merged", score, filled)
+    return final_schedule
+
+
 def store_processed_data(processed_data):
     """
     Stores the processed schedule data into the database.
@@ -163,8 +211,12 @@ def store_processed_data(processed_data):
         "schedule_date": "YYYY-MM-DD",
         "final_schedule": [...]
     }
+    A schedule that already exists for the date is replaced atomically;
+    an identical resend is a no-op.
+    Returns:
+        bool: True if the day was written, False if it was unchanged.
     Raises:
-        ValueError if schedule already exists or invalid data.
+        ValueError if invalid data.
     """
     logger.info(f"Starting storage of schedule for date: {processed_data['schedule_date']}")
 
@@ -179,41 +231,14 @@ def store_processed_data(processed_data):
         logger.error(f"Invalid date format: '{schedule_date_str}'. Error: {ve}")
         raise ValueError("Invalid date format. Expected YYYY-MM-DD.")
 
-    # Check if this schedule already exists
-    existing_metadata = DailyTableMetadata.query.filter_by(schedule_date=schedule_date).first()
-    if existing_metadata:
-        logger.warning(f"Schedule for {schedule_date} already exists in daily_table_metadata.")
-        raise ValueError(f"Schedule for {schedule_date} already exists.")
-
-    # Insert metadata
-    new_metadata = DailyTableMetadata(schedule_date=schedule_date)
-    db.session.add(new_metadata)
-
-    # Insert each schedule entry
-    for idx, item in enumerate(final_schedule, start=1):
-        time_val = item.get("الوقت", "").strip()
-        reciter_val = item.get("القارئ", "").strip()
-        surah_val = item.get("السورة", "").strip()
-        duration_val = item.get("المدة", "").strip()  # Optional field
-
-        logger.debug(
-            f"Inserting entry #{idx}: time={time_val}, reciter={reciter_val}, "
-            f"surah={surah_val}, duration={duration_val}"
-        )
-
-        new_entry = DailySchedule(
-            time=time_val,
-            reciter=reciter_val,
-            surah=surah_val,
-            duration=duration_val,  # optional
-            schedule_date=schedule_date,
-        )
-        db.session.add(new_entry)
+    # Delete + bulk insert + metadata upsert in one transaction
+    if not replace_schedule_day(schedule_date, final_schedule):
+        return False
 
-    # Commit the transaction
-    logger.info("All schedule entries added to DB session. Committing...")
-    db.session.commit()
     logger.info(f"Schedule for {schedule_date} successfully stored in the database.")
+    schedule_cache.invalidate_date(schedule_date)
+    refresh_schedule_index(schedule_date)
+    schedule_version.bump()
 
     # Emit a WebSocket event if available
     socketio = current_app.config.get('SOCKETIO')
@@ -230,6 +255,192 @@ def store_processed_data(processed_data):
     else:
         logger.error("SocketIO instance not found. Cannot emit 'new_schedule' event.")
 
+    return True
+
+
+def update_processed_data(processed_data):
+    """
+    Applies an edited schedule message to the stored day, changing only the
+    rows that differ, and broadcasts a compact 'schedule_updated' delta
+    instead of the full schedule. Each entry carries its UTC instant so
+    clients can render it in their own timezone.
+    Returns:
+        dict | None: The delta, or None if the day was unchanged.
+    Raises:
+        ValueError if invalid data.
+    """
+    schedule_date_str = processed_data["schedule_date"].strip()
+    try:
+        schedule_date = datetime.strptime(schedule_date_str, "%Y-%m-%d").date()
+    except ValueError as ve:
+        logger.error(f"Invalid date format: '{schedule_date_str}'. Error: {ve}")
+        raise ValueError("Invalid date format. Expected YYYY-MM-DD.")
+
+    diff = apply_schedule_diff(schedule_date, processed_data["final_schedule"])
+    if diff is None:
+        return None
+
+    delta = {
+        "added": [serialize_delta_entry(entry) for entry in diff["added"]],
+        "changed": [serialize_delta_entry(entry) for entry in diff["changed"]],
+        "removed": diff["removed"],
+    }
+
+    schedule_cache.invalidate_date(schedule_date)
+    refresh_schedule_index(schedule_date)
+    schedule_version.bump()
+
+    socketio = current_app.config.get('SOCKETIO')
+    if socketio:
+        socketio.emit(
+            'schedule_updated',
+            {"schedule_date": schedule_date.strftime("%Y-%m-%d"), **delta},
+            namespace='/'
+        )
+        logger.info(f"Emitted 'schedule_updated' event for date: {schedule_date}")
+    else:
+        logger.error("SocketIO instance not found. Cannot emit 'schedule_updated' event.")
+
+    return delta
+
+
+def ensure_schedule_index_loaded():
+    """Loads every stored day into `schedule_index` the first time it is needed."""
+    if schedule_index.loaded:
+        return
+    rows_by_date = {}
+    for entry in DailySchedule.query.filter(DailySchedule.start_minute.isnot(None)).all():
+        rows_by_date.setdefault(entry.schedule_date, []).append(entry)
+    schedule_index.load(rows_by_date)
+
+
+def refresh_schedule_index(schedule_date):
+    """Re-indexes a single day after its rows were committed."""
+    if not schedule_index.loaded:
+        # The first /now or /next request will load everything, this day included
+        return
+    rows = DailySchedule.query.filter_by(schedule_date=schedule_date).all()
+    schedule_index.set_day(schedule_date, rows)
+
+
+def serialize_schedule_entry(entry, user_timezone) -> dict:
+    """
+    Converts one stored schedule row (ORM object or Core row) from Cairo time
+    into the user's timezone using its precomputed start_minute and the
+    day's offset tables from `timezone_service`.
+    """
+    local_date, local_time = timezone_service.day_converter(user_timezone, entry.schedule_date).display(
+        entry.start_minute
+    )
+    return {
+        "id": entry.id,
+        "schedule_date": local_date,
+        "time": local_time,
+        "start_minute": entry.start_minute,
+        "reciter": entry.reciter,
+        "surah": entry.surah,
+        "duration": entry.duration if entry.duration else ""
+    }
+
+
+def serialize_delta_entry(entry) -> dict:
+    """
+    Timezone-independent form of a listed row for 'schedule_updated': its
+    Cairo schedule_date and start_minute, plus the UTC instant it starts at,
+    as /now renders it.
+    """
+    converter = timezone_service.day_converter(timezone_service.schedule_zone, entry.schedule_date)
+    start = datetime.fromtimestamp(converter.to_utc_timestamp(entry.start_minute), timezone.utc)
+    return {
+        "id": entry.id,
+        "schedule_date": entry.schedule_date.strftime("%Y-%m-%d"),
+        "start_minute": entry.start_minute,
+        "start": start.isoformat(),
+        "reciter": entry.reciter,
+        "surah": entry.surah,
+        "duration": entry.duration if entry.duration else ""
+    }
+
+
+# (schedule version, newest stored date) from the last lookup
+_latest_schedule_date = (None, None)
+
+
+def latest_schedule_date():
+    """Newest stored schedule date, queried once per schedule version."""
+    global _latest_schedule_date
+    version, _ = schedule_version.snapshot()
+    cached_version, cached_date = _latest_schedule_date
+    if cached_version == version:
+        return cached_date
+    newest_metadata = DailyTableMetadata.query.order_by(DailyTableMetadata.schedule_date.desc()).first()
+    latest = newest_metadata.schedule_date if newest_metadata else None
+    _latest_schedule_date = (version, latest)
+    return latest
+
+
+def timezone_cache_key(user_timezone, requested_date):
+    """
+    Timezone part of a rendered page's cache key: the user's offset tables
+    for every day the page can be rendered from (the requested day, or the
+    latest one as fallback). Zones that agree on those offsets, like
+    Asia/Riyadh and Europe/Moscow, share cached pages.
+    """
+    days = {requested_date, latest_schedule_date()} - {None}
+    return tuple(timezone_service.day_signature(user_timezone, day) for day in sorted(days))
+
+
+def render_schedule_page(query_date, user_timezone, page, per_page, requested_date_str=""):
+    """
+    Runs the schedule query for one page and converts each entry to the user's timezone.
+
+    Args:
+        query_date (date | None): The requested date, or None for the latest schedule.
+        user_timezone (ZoneInfo): The timezone to render times in.
+        page (int): Page number.
+        per_page (int): Page size.
+        requested_date_str (str): The raw ?date= value as sent by the client.
+
+    Returns:
+        tuple: (payload dict, date the payload was rendered from or None)
+    """
+    query = DailySchedule.query
+    rendered_date = query_date
+    if query_date:
+        query = query.filter_by(schedule_date=query_date)
+    elif requested_date_str:
+        logger.warning(f"Invalid requested_date format: {requested_date_str}")
+
+    # Fallback to the LATEST date
+    if not requested_date_str or query.count() == 0:
+        newest_metadata = DailyTableMetadata.query.order_by(DailyTableMetadata.schedule_date.desc()).first()
+        if newest_metadata:
+            rendered_date = newest_metadata.schedule_date
+            logger.info(f"No valid requested date or no schedule found, fallback to latest: {rendered_date}")
+            query = DailySchedule.query.filter_by(schedule_date=rendered_date)
+        else:
+            # No schedules at all
+            logger.warning("No schedules exist in DB.")
+            return {"data": [], "message": "No schedules in DB"}, None
+
+    # Rows whose time could not be normalized at ingest are not listed
+    query = query.filter(DailySchedule.start_minute.isnot(None))
+    pagination = query.order_by(
+        DailySchedule.schedule_date.asc(), DailySchedule.start_minute.asc(), DailySchedule.id.asc()
+    ).paginate(
+        page=page, per_page=per_page, error_out=False
+    )
+
+    data = [serialize_schedule_entry(entry, user_timezone) for entry in pagination.items]
+
+    return {
+        "data": data,
+        "source_date": rendered_date.strftime("%Y-%m-%d"),
+        "total": pagination.total,
+        "pages": pagination.pages,
+        "current_page": pagination.page
+    }, rendered_date
+
 
 # ------------------------ Route Definitions ------------------------
 
@@ -237,7 +448,9 @@ def store_processed_data(processed_data):
 def get_all_schedules():
     """
     Fetches the schedule from the database in JSON.
-    ...
+    Rendered pages are served from `schedule_cache` until the
+    underlying schedule date is stored again or cleared, and
+    conditional requests are answered with 304 from `schedule_version`.
     """
     try:
         # user timezone from cookie or default
@@ -245,85 +458,235 @@ def get_all_schedules():
         user_timezone_str = request.cookies.get('user_timezone', 'Africa/Cairo')
         logger.debug(f"user_timezone_str from cookie: {user_timezone_str}")
 
-        try:
-            user_timezone = ZoneInfo(user_timezone_str)
-        except ZoneInfoNotFoundError:
-            logger.warning(f"Invalid or missing timezone '{user_timezone_str}'. Defaulting to Cairo's timezone.")
-            user_timezone = ZoneInfo("Africa/Cairo")
+        # Validators are taken before rendering so a concurrent store can only make them older
+        variant = f"{user_timezone_str}|{request.query_string.decode('utf-8', 'replace')}"
+        etag, last_modified, not_modified = conditional_validators(variant)
+        if not_modified:
+            return apply_validators(make_response("", 304), etag, last_modified, vary="Cookie")
 
-        cairo_timezone = ZoneInfo("Africa/Cairo")
+        user_timezone = timezone_service.resolve(user_timezone_str)
 
         # The user might request a specific date
         requested_date_str = request.args.get("date", "")  # e.g. ?date=2025-12-21
         logger.info(f"Requested date: {requested_date_str}")
 
-        query = DailySchedule.query
+        requested_date = None
         if requested_date_str:
             try:
                 requested_date = datetime.strptime(requested_date_str, "%Y-%m-%d").date()
-                query = query.filter_by(schedule_date=requested_date)
             except ValueError:
-                logger.warning(f"Invalid requested_date format: {requested_date_str}")
-
-        # Fallback to the LATEST date
-        if not requested_date_str or query.count() == 0:
-            newest_metadata = DailyTableMetadata.query.order_by(DailyTableMetadata.schedule_date.desc()).first()
-            if newest_metadata:
-                fallback_date = newest_metadata.schedule_date
-                logger.info(f"No valid requested date or no schedule found, fallback to latest: {fallback_date}")
-                query = DailySchedule.query.filter_by(schedule_date=fallback_date)
-            else:
-                # No schedules at all
-                logger.warning("No schedules exist in DB.")
-                return jsonify({"data": [], "message": "No schedules in DB"}), 200
+                requested_date = None
 
         # Pagination
         page = request.args.get("page", 1, type=int)
         per_page = request.args.get("per_page", 100, type=int)
 
-        pagination = query.order_by(DailySchedule.time.asc()).paginate(
-            page=page, per_page=per_page, error_out=False
+        # A malformed ?date= queries every day, so only well-formed requests are cached
+        cacheable = requested_date is not None or not requested_date_str
+        if cacheable:
+            cache_key = (requested_date, timezone_cache_key(user_timezone, requested_date), page, per_page)
+            payload = schedule_cache.get(cache_key)
+            if payload is not None:
+                return apply_validators(jsonify(payload), etag, last_modified, vary="Cookie"), 200
+
+        payload, rendered_date = render_schedule_page(
+            requested_date, user_timezone, page, per_page, requested_date_str
         )
+        if cacheable:
+            schedule_cache.put(cache_key, payload, rendered_date)
+
+        return apply_validators(jsonify(payload), etag, last_modified, vary="Cookie"), 200
 
-        data = []
-        for entry in pagination.items:
-            time_str = entry.time.strip()
-            cairo_dt = None
-            for fmt in ("%I:%M %p", "%H:%M"):
-                try:
-                    parsed_time = datetime.strptime(time_str, fmt).time()
-                    cairo_dt = datetime.combine(entry.schedule_date, parsed_time, tzinfo=cairo_timezone)
+    except Exception as e:
+        logger.error(f"Error fetching schedules: {e}", exc_info=True)
+        return jsonify({"error": "Failed to fetch schedules"}), 500
+
+
+def get_request_timezone():
+    """Returns the user's ZoneInfo from the cookie, defaulting to Cairo."""
+    return timezone_service.resolve(request.cookies.get('user_timezone', DEFAULT_TIMEZONE))
+
+
+def with_playlist_link(rendered: dict) -> dict:
+    """
+    Adds "link", the YouTube playlist of the closest catalog reciter, to a
+    rendered entry; None when no reciter is close enough to its name.
+    """
+    playlist = match_reciter(rendered["reciter"])
+    return dict(rendered, link=playlist["link"] if playlist else None)
+
+
+def encode_range_cursor(entry) -> str:
+    """Opaque keyset cursor for the row after which the next page starts."""
+    return f"{entry.schedule_date.strftime('%Y-%m-%d')}_{entry.start_minute}_{entry.id}"
+
+
+def decode_range_cursor(cursor: str):
+    """
+    Parses a cursor produced by encode_range_cursor.
+
+    Returns:
+        tuple: (schedule_date, start_minute, id)
+
+    Raises:
+        ValueError: If the cursor is malformed.
+    """
+    date_part, minute_part, id_part = cursor.split("_")
+    return (
+        datetime.strptime(date_part, "%Y-%m-%d").date(),
+        int(minute_part),
+        int(id_part),
+    )
+
+
+@schedule_bp.route("/range", methods=["GET"])
+def get_schedule_range():
+    """
+    Streams the schedules of several days in one indexed query.
+    Query params: from=YYYY-MM-DD, to=YYYY-MM-DD (inclusive, at most RANGE_MAX_DAYS),
+    limit (rows per page), cursor (the previous page's next_cursor).
+    Pagination is keyset based on (schedule_date, start_minute, id), so no COUNT is run.
+    """
+    from_str = request.args.get("from", "").strip()
+    to_str = request.args.get("to", "").strip()
+    try:
+        from_date = datetime.strptime(from_str, "%Y-%m-%d").date()
+        to_date = datetime.strptime(to_str, "%Y-%m-%d").date() if to_str else from_date
+    except ValueError:
+        logger.warning(f"Invalid range dates: from='{from_str}', to='{to_str}'")
+        return jsonify({"error": "Invalid date format. Expected from=YYYY-MM-DD&to=YYYY-MM-DD."}), 400
+
+    if to_date < from_date:
+        return jsonify({"error": "'to' must not be before 'from'."}), 400
+    if (to_date - from_date).days + 1 > RANGE_MAX_DAYS:
+        return jsonify({"error": f"Range cannot exceed {RANGE_MAX_DAYS} days."}), 400
+
+    limit = request.args.get("limit", RANGE_DEFAULT_LIMIT, type=int)
+    limit = max(1, min(limit, RANGE_MAX_LIMIT))
+
+    cursor = request.args.get("cursor", "").strip()
+    after = None
+    if cursor:
+        try:
+            after = decode_range_cursor(cursor)
+        except ValueError:
+            logger.warning(f"Invalid range cursor: '{cursor}'")
+            return jsonify({"error": "Invalid cursor."}), 400
+
+    user_timezone_str = request.cookies.get('user_timezone', 'Africa/Cairo')
+    user_timezone = get_request_timezone()
+
+    variant = f"range|{user_timezone_str}|{request.query_string.decode('utf-8', 'replace')}"
+    etag, last_modified, not_modified = conditional_validators(variant)
+    if not_modified:
+        return apply_validators(make_response("", 304), etag, last_modified, vary="Cookie")
+
+    stmt = (
+        db.select(
+            DailySchedule.id,
+            DailySchedule.schedule_date,
+            DailySchedule.start_minute,
+            DailySchedule.reciter,
+            DailySchedule.surah,
+            DailySchedule.duration,
+        )
+        .where(
+            DailySchedule.schedule_date >= from_date,
+            DailySchedule.schedule_date <= to_date,
+            DailySchedule.start_minute.isnot(None),
+        )
+        .order_by(DailySchedule.schedule_date, DailySchedule.start_minute, DailySchedule.id)
+        # One extra row tells us whether another page exists
+        .limit(limit + 1)
+    )
+    if after:
+        stmt = stmt.where(
+            db.tuple_(DailySchedule.schedule_date, DailySchedule.start_minute, DailySchedule.id)
+            > db.tuple_(*after)
+        )
+
+    def generate():
+        result = db.session.execute(stmt.execution_options(yield_per=RANGE_STREAM_BATCH))
+        yield '{"data":['
+        sent = 0
+        last_entry = None
+        has_more = False
+        for partition in result.partitions():
+            chunk = []
+            for entry in partition:
+                if sent == limit:
+                    has_more = True
                     break
-                except ValueError:
-                    continue
-
-            if not cairo_dt:
-                logger.error(f"Time parsing error for entry ID {entry.id}: '{time_str}'")
-                continue
-
-            # Convert to user's TZ
-            user_datetime = cairo_dt.astimezone(user_timezone)
-            converted_time = user_datetime.strftime("%I:%M %p")
-
-            data.append({
-                "id": entry.id,
-                "schedule_date": user_datetime.strftime("%Y-%m-%d"),
-                "time": converted_time,
-                "reciter": entry.reciter,
-                "surah": entry.surah,
-                "duration": entry.duration if entry.duration else ""
-            })
+                chunk.append(json.dumps(serialize_schedule_entry(entry, user_timezone), ensure_ascii=False))
+                last_entry = entry
+                sent += 1
+            if chunk:
+                yield ("," if sent > len(chunk) else "") + ",".join(chunk)
+            if has_more:
+                break
+        result.close()
+
+        next_cursor = encode_range_cursor(last_entry) if has_more else None
+        yield '],' + json.dumps({
+            "from": from_date.strftime("%Y-%m-%d"),
+            "to": to_date.strftime("%Y-%m-%d"),
+            "count": sent,
+            "next_cursor": next_cursor
+        })[1:]
+
+    response = Response(stream_with_context(generate()), mimetype="application/json")
+    return apply_validators(response, etag, last_modified, vary="Cookie")
+
+
+@schedule_bp.route("/now", methods=["GET"])
+def get_now_playing():
+    """
+    Returns the program playing right now and the one after it, each linked
+    to its reciter's playlist.
+    Served from the in-memory indexes; no database access per request.
+    """
+    try:
+        ensure_schedule_index_loaded()
+        user_timezone = get_request_timezone()
+        now_utc = datetime.now(ZoneInfo("UTC"))
 
+        current, upcoming = schedule_index.now(now_utc)
         return jsonify({
-            "data": data,
-            "total": pagination.total,
-            "pages": pagination.pages,
-            "current_page": pagination.page
+            "server_time": now_utc.isoformat(),
+            "now": with_playlist_link(serialize_indexed_entry(*current, user_timezone)) if current else None,
+            "next": with_playlist_link(serialize_indexed_entry(*upcoming, user_timezone)) if upcoming else None
         }), 200
 
     except Exception as e:
-        logger.error(f"Error fetching schedules: {e}", exc_info=True)
-        return jsonify({"error": "Failed to fetch schedules"}), 500
+        logger.error(f"Error fetching now playing: {e}", exc_info=True)
+        return jsonify({"error": "Failed to fetch now playing"}), 500
+
+
+@schedule_bp.route("/next", methods=["GET"])
+def get_up_next():
+    """
+    Returns the next `n` programs (default 5, at most NEXT_MAX_ITEMS), each
+    linked to its reciter's playlist.
+    Served from the in-memory indexes; no database access per request.
+    """
+    try:
+        ensure_schedule_index_loaded()
+        user_timezone = get_request_timezone()
+        n = max(1, min(request.args.get("n", 5, type=int), NEXT_MAX_ITEMS))
+        now_utc = datetime.now(ZoneInfo("UTC"))
+
+        upcoming = schedule_index.upcoming(now_utc, n)
+        return jsonify({
+            "server_time": now_utc.isoformat(),
+            "data": [
+                with_playlist_link(serialize_indexed_entry(day, pos, user_timezone))
+                for day, pos in upcoming
+            ]
+        }), 200
+
+    except Exception as e:
+        logger.error(f"Error fetching upcoming programs: {e}", exc_info=True)
+        return jsonify({"error": "Failed to fetch upcoming programs"}), 500
 
 
 @schedule_bp.route("/process", methods=["POST"])
@@ -363,13 +726,14 @@ def store_schedule():
     """
     Endpoint to store the Quran schedule into the database.
     Accepts either:
-    - Raw text: { "raw_text": "schedule text" }
+    - Raw text: { "raw_text": "schedule text", "edit": false }
     OR
     - Structured data: {
         "schedule_date": "YYYY-MM-DD",
         "final_schedule": [ ... ]
     }
-    Returns a confirmation of successful storage.
+    Raw text is queued as a background job and answered with 202 and a job id.
+    Structured data is stored immediately and answered with 200.
     """
     try:
         data = request.get_json()
@@ -382,28 +746,9 @@ def store_schedule():
             raw_text = data["raw_text"].strip()
             logger.info(f"Received raw text for processing (length={len(raw_text)}).")
 
-            try:
-                processed_data = process_raw_text(raw_text)
-            except ValueError as ve:
-                logger.error(f"Processing error: {ve}")
-                return jsonify({"error": str(ve)}), 400
-
-            # Store the processed data
-            try:
-                store_processed_data(processed_data)
-            except ValueError as ve:
-                logger.error(f"Storage error: {ve}")
-                db.session.rollback()
-                return jsonify({"error": str(ve)}), 400
-            except Exception as e:
-                logger.error(f"Unexpected storage error: {e}", exc_info=True)
-                db.session.rollback()
-                return jsonify({"error": "Failed to store schedule."}), 500
-
-            return jsonify({
-                "status": "success",
-                "message": f"Schedule for {processed_data['schedule_date']} stored successfully."
-            }), 200
+            # Gemini + storage run on the ingestion worker pool;
+            # "edit": true applies the message as a diff of the stored day
+            return accepted_job_response(raw_text, update=bool(data.get("edit")))
 
         # Case 2: structured data
         else:
@@ -444,64 +789,19 @@ def store_schedule():
 
             logger.info(f"Storing schedule for date: {schedule_date}")
 
-            existing_metadata = DailyTableMetadata.query.filter_by(schedule_date=schedule_date).first()
-            if existing_metadata:
-                logger.warning(f"Schedule for {schedule_date} already exists.")
-                return jsonify({"error": f"Schedule for {schedule_date} already exists."}), 400
-
-            new_metadata = DailyTableMetadata(schedule_date=schedule_date)
-            db.session.add(new_metadata)
-
-            for idx, item in enumerate(final_schedule, start=1):
-                time_val = item.get("الوقت", "").strip()
-                reciter_val = item.get("القارئ", "").strip()
-                surah_val = item.get("السورة", "").strip()
-                duration_val = item.get("المدة", "").strip()  # optional
-
-                logger.debug(
-                    f"Inserting entry #{idx}: time={time_val}, reciter={reciter_val}, "
-                    f"surah={surah_val}, duration={duration_val}"
-                )
-                new_entry = DailySchedule(
-                    time=time_val,
-                    reciter=reciter_val,
-                    surah=surah_val,
-                    duration=duration_val,
-                    schedule_date=schedule_date,
-                )
-                db.session.add(new_entry)
-
-            # Commit
-            try:
-                logger.info("All schedule entries added. Committing to DB...")
-                db.session.commit()
-                logger.info(f"Schedule for {schedule_date} stored in DB.")
-            except Exception as e:
-                logger.error(f"DB commit failed: {e}", exc_info=True)
-                db.session.rollback()
-                return jsonify({"error": "Failed to store schedule."}), 500
-
-            # WebSocket event
-            try:
-                socketio = current_app.config.get('SOCKETIO')
-                if socketio:
-                    socketio.emit(
-                        'new_schedule',
-                        {
-                            "schedule_date": schedule_date.strftime("%Y-%m-%d"),
-                            "final_schedule": final_schedule
-                        },
-                        namespace='/'
-                    )
-                    logger.info(f"Emitted 'new_schedule' event for {schedule_date}")
-                else:
-                    logger.error("SocketIO not found. Cannot emit 'new_schedule'.")
-            except Exception as e:
-                logger.error(f"Failed to emit 'new_schedule': {e}", exc_info=True)
-
+            changed = store_processed_data({
+                "schedule_date": schedule_date_str,
+                "final_schedule": final_schedule,
+            })
+            message = (
+                f"Schedule for {schedule_date} stored successfully."
+                if changed else
+                f"Schedule for {schedule_date} is unchanged."
+            )
             return jsonify({
                 "status": "success",
-                "message": f"Schedule for {schedule_date} stored successfully."
+                "changed": changed,
+                "message": message
             }), 200
 
     except ValueError as ve:
@@ -514,11 +814,25 @@ def store_schedule():
         return jsonify({"error": "Failed to store schedule."}), 500
 
 
+def accepted_job_response(raw_text, update=False):
+    """Queues `raw_text` for background ingestion and builds the 202 response."""
+    job = enqueue_ingestion(current_app._get_current_object(), raw_text, update=update)
+    status_url = f"{request.script_root}/api/schedule/jobs/{job.id}"
+    response = jsonify({
+        "status": "accepted",
+        "job_id": job.id,
+        "status_url": status_url
+    })
+    response.headers["Location"] = status_url
+    return response, 202
+
+
 @schedule_bp.route("/process_and_store", methods=["POST"])
 def process_and_store_schedule():
     """
     Endpoint to process raw schedule text using Gemini AI (with retries)
     or fallback logic, then store in the DB.
+    Returns 202 with a job id; poll /jobs/<job_id> for the outcome.
     """
     try:
         data = request.get_json()
@@ -531,35 +845,8 @@ def process_and_store_schedule():
         raw_text = data["raw_text"].strip()
         logger.info(f"Received raw text for processing and storage (length={len(raw_text)}).")
 
-        # Process
-        try:
-            processed_data = process_raw_text(raw_text)
-            logger.info("Successfully processed raw text into structured data.")
-        except ValueError as ve:
-            logger.error(f"Processing error: {ve}")
-            return jsonify({"error": str(ve)}), 400
-        except Exception as e:
-            logger.error(f"Unexpected error during processing: {e}", exc_info=True)
-            return jsonify({"error": "Failed to process the schedule text."}), 500
-
-        # Store
-        try:
-            store_processed_data(processed_data)
-            logger.info(f"Successfully stored schedule for date: {processed_data['schedule_date']}")
-        except ValueError as ve:
-            logger.error(f"Storage error: {ve}")
-            db.session.rollback()
-            return jsonify({"error": str(ve)}), 400
-        except Exception as e:
-            logger.error(f"Unexpected storage error: {e}", exc_info=True)
-            db.session.rollback()
-            return jsonify({"error": "Failed to store the schedule in the database."}), 500
-
-        # Done
-        return jsonify({
-            "status": "success",
-            "message": f"Schedule for {processed_data['schedule_date']} processed and stored successfully."
-        }), 200
+        # Gemini + storage run on the ingestion worker pool
+        return accepted_job_response(raw_text)
 
     except Exception as e:
         logger.error(f"Error in process_and_store_schedule: {e}", exc_info=True)
@@ -569,6 +856,17 @@ def process_and_store_schedule():
         }), 500
 
 
+@schedule_bp.route("/jobs/<job_id>", methods=["GET"])
+def get_ingestion_job(job_id):
+    """
+    Reports the progress of a background ingestion job.
+    """
+    job = db.session.get(IngestionJob, job_id)
+    if job is None:
+        return jsonify({"error": "Job not found"}), 404
+    return jsonify(serialize_job(job)), 200
+
+
 @schedule_bp.route("/clear_old", methods=["DELETE"])
 def clear_old_schedules():
     """
@@ -592,6 +890,9 @@ def clear_old_schedules():
                 db.session.delete(md)
             db.session.commit()
             logger.info(f"Deleted schedules older than {cutoff_date}")
+            schedule_cache.invalidate_before(cutoff_date)
+            schedule_index.drop_before(cutoff_date)
+            schedule_version.bump()
             return jsonify({
                 "status": "success",
                 "message": f"Schedules older than {cutoff_date} removed."
@@ -612,10 +913,7 @@ def debug_timezone():
     Debug endpoint for timezone conversions.
     """
     user_timezone_str = request.cookies.get('user_timezone', 'Africa/Cairo')
-    try:
-        user_timezone = ZoneInfo(user_timezone_str)
-    except ZoneInfoNotFoundError:
-        user_timezone = ZoneInfo("Africa/Cairo")
+    user_timezone = timezone_service.resolve(user_timezone_str)
 
     now_utc = datetime.utcnow()
     now_user = now_utc.replace(tzinfo=ZoneInfo("UTC")).astimezone(user_timezone)
@@ -661,3 +959,21 @@ def debug_gemini_response():
     except Exception as e:
         logger.error(f"Error in Gemini debug endpoint: {e}", exc_info=True)
         return f"<h1>Failed to process Gemini response for debugging:</h1><pre>{e}</pre>", 500
+
+
+@schedule_bp.route("/gemini/cache", methods=["GET"])
+def gemini_cache_stats():
+    """
+    Hit/miss counters of the Gemini parse cache since startup, plus the
+    client's breaker state and latency.
+    """
+    return jsonify({**gemini_cache.stats(), "client": gemini_client.stats()}), 200
+
+
+@schedule_bp.route("/fast_path", methods=["GET"])
+def fast_path_stats():
+    """
+    How ingested schedules were produced since startup: regex fast path,
+    Gemini merged with the regex parse, or regex fallback after Gemini failed.
+    """
+    return jsonify(fast_path_metrics.stats()), 200
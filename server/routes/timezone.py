@@ -1,7 +1,7 @@
 # routes/timezone.py
 
 from flask import Blueprint, request, jsonify, make_response
-from zoneinfo import available_timezones  # Python 3.9+
+from services.timezones import timezone_service
 import logging
 
 logger = logging.getLogger(__name__)
@@ -9,7 +9,8 @@ logger = logging.getLogger(__name__)
 timezone_bp = Blueprint('timezone_bp', __name__)
 
 def is_valid_timezone(tz_str):
-    return tz_str in available_timezones()
+    # Zone names are loaded once per process, not on every request
+    return timezone_service.is_valid(tz_str)
 
 @timezone_bp.route('/set_timezone/', methods=['POST'])
 def set_timezone():
@@ -0,0 +1,392 @@
+import re
+from functools import lru_cache
+
+from schedule_parsing.parse_logic import incorporate_verse_range_into_surah, parse_schedule_final
+
+# -----------------------------------------------------------------------------
+# Single-pass schedule parser
+# -----------------------------------------------------------------------------
+# Produces exactly the same records as parse_schedule_final, which stays in
+# parse_logic.py as the reference implementation. The differences are purely
+# mechanical:
+#   * every pattern is compiled once, here, instead of on each call;
+#   * each line is bracket-stripped once and each chunk is cleaned once;
+#   * a cheap marker scan tells which extractors can possibly match a chunk,
+#     so e.g. the verse-range patterns only run when "الآية" or "حتى" occur;
+#   * chunk results are memoized, since the same lines recur across days.
+# Any change to the reference parser must be mirrored here;
+# tests/test_fast_parser.py runs diff_against_reference() over a corpus.
+#
+# parse_schedule_detailed() goes one step further than the reference: it
+# reads the (ص)/(م) marker that bracket stripping throws away, and adds the
+# "المدة" and "ambiguous_time" fields that services/fast_path.py scores.
+
+#############################
+# A) Compiled Patterns
+#############################
+
+# Bracket & emoji removal
+ROUND_BRACKETS = re.compile(r'\(.*?\)')
+SQUARE_BRACKETS = re.compile(r'\[.*?\]')
+CURLY_BRACKETS = re.compile(r'\{.*?\}')
+EMOJIS = re.compile(
+    r'[\U0001F300-\U0001F5FF'
+    r'\U0001F600-\U0001F64F'
+    r'\U0001F900-\U0001F9FF'
+    r'\U0001FA70-\U0001FAFF'
+    r'\u2600-\u26FF'
+    r'\u2700-\u27BF]+',
+    flags=re.UNICODE
+)
+
+# Chunk boundaries (Arabic has no case, so IGNORECASE reduces to startswith)
+ITEM_START_WORDS = ("الساعة", "تلاوة", "للشيخ", "للقارئ")
+ITEM_START_TIME = re.compile(r'^\s*\d{1,2}\s*[:\.]\s*\d{1,2}')
+
+# Time
+TIME = re.compile(
+    r'(?:الساعة[^0-9]*|\b)(\d{1,2}\s*[:\.]\s*\d{1,2}(?:\s*\(.*?\))?)',
+    re.IGNORECASE
+)
+TIME_AM = re.compile(r'\(\s*(?:ص|صباح[اً]*)\s*\)')
+TIME_PM = re.compile(r'\(\s*(?:م|مساء[اً]*)\s*\)')
+TIME_MARKER = re.compile(r'\(\s*(?:ص|صباح[اً]*|م|مساء[اً]*)\s*\)$')
+TIME_COLON = re.compile(r'\s*:\s*')
+TIME_HH_MM = re.compile(r'^(\d{1,2}):(\d{1,2})$')
+
+# Duration
+DURATION = re.compile(r'(?:مدة\s+التلاوة\s*:?\s*(\d+)|(\d+)\s*(?:دقيقة|دقائق|ق)(?!\w))')
+
+# Reciter
+RECITER = re.compile(
+    r'(?:تلاوة\s+للقارئ|للشيخ|للقارئ)\s*/?\s*([^\n]+?)'
+    r'(?=\s*(?:ما\s+تيسر|من\s+سورة|مدة\s+التلاوة|\d+\s*ق|$))',
+    re.IGNORECASE
+)
+RECITER_SURAH_TAIL = re.compile(r'(?i)(سورة\s+.*$|سورتى\s+.*$)')
+RECITER_DURATION_TAIL = re.compile(r'\d+\s*ق.*$')
+RECITER_MIN_PREFIX = re.compile(r'^\s*من\s+', re.IGNORECASE)
+RECITER_SLASH_TAIL = re.compile(r'/.*')
+RECITER_TAYASSAR_TAIL = re.compile(r'(?i)(ما\s*تيسر(?:\s*من)?|وما\s*تيسر(?:\s*من)?).*')
+RECITER_TRAILING_WAW = re.compile(r'\s+و$')
+
+# Surahs
+SURAHS = re.compile(
+    r'(?:ما\s+تيسر\s+من|من\s+(?:سورة|سور|سورتى))\s+(.+?)(?=\s*(?:ومدة\s+التلاوة|\d+\s*ق|$))',
+    re.IGNORECASE
+)
+SURAH_SPLIT = re.compile(r'(?:\s+و\s+)|[-/]')
+SHORT_SURAHS = re.compile(r'(?i)^قصار\s+السور$')
+SURAH_PREFIX = re.compile(r'^(?:سورة|سورتى|سور)', re.IGNORECASE)
+SURAH_PREFIX_WORD = re.compile(r'^(?:سورة|سورتى|سور)\s+', re.IGNORECASE)
+SURAH_STANDALONE = re.compile(r'\b(?:سورتى|سور)\b', re.IGNORECASE)
+SURAH_WORD = re.compile(r'(?i)^سورة$')
+
+# Verse ranges
+VERSE_RANGE = re.compile(
+    r'من\s+الآية\s*(\d+)\s*(?:من\s+)?سورة\s+([^..]+?)\s+'
+    r'(?:و?حتى\s+الآية|إلى\s+الآية)\s*(\d+)\s*(?:من\s+)?سورة\s+([^..]+?)\b',
+    re.IGNORECASE
+)
+WHOLE_SURAH_RANGE = re.compile(
+    r'من\s+(?:أول\s+)?سورة\s+([^\s]+)\s+'
+    r'(?:حتى\s+(?:ختام\s+)?سورة\s+([^\s]+)|وحتى\s+(?:ختام\s+)?سورة\s+([^\s]+))',
+    re.IGNORECASE
+)
+
+# Number of distinct chunks whose parse is memoized
+CHUNK_CACHE_SIZE = 8192
+
+#############################
+# B) Cleaning
+#############################
+
+def _collapse(text: str) -> str:
+    """
+    Same result as re.sub(r'\s+', ' ', text).strip(): str.split() and the
+    regex \s use the same Unicode whitespace definition.
+    """
+    return " ".join(text.split())
+
+def _strip_brackets(text: str) -> str:
+    """Same result as parse_logic.remove_brackets."""
+    if '(' in text:
+        text = ROUND_BRACKETS.sub('', text)
+    if '[' in text:
+        text = SQUARE_BRACKETS.sub('', text)
+    if '{' in text:
+        text = CURLY_BRACKETS.sub('', text)
+    return _collapse(text)
+
+def _starts_new_item(line: str) -> bool:
+    """Same result as parse_logic.should_start_new_item for a stripped line."""
+    # Without brackets, remove_brackets only collapses whitespace, which
+    # cannot change either prefix match
+    if '(' in line or '[' in line or '{' in line:
+        line = _strip_brackets(line)
+    if line.startswith(ITEM_START_WORDS):
+        return True
+    return bool(line) and line[0].isdecimal() and ITEM_START_TIME.match(line) is not None
+
+def _chunks(raw_text: str):
+    """Yields the merged item chunks, same as parse_logic.merge_lines."""
+    current_chunk = []
+    for line in raw_text.splitlines():
+        line = line.strip()
+        if not line:
+            continue
+        if _starts_new_item(line):
+            if current_chunk:
+                yield " ".join(current_chunk)
+            current_chunk = [line]
+        else:
+            current_chunk.append(line)
+    if current_chunk:
+        yield " ".join(current_chunk)
+
+#############################
+# C) Field Extractors
+#############################
+
+def _fix_time(time_str: str) -> str:
+    """Same result as parse_logic.fix_time_format."""
+    am_pm = ""
+    if '(' in time_str:
+        if TIME_AM.search(time_str):
+            am_pm = "AM"
+        elif TIME_PM.search(time_str):
+            am_pm = "PM"
+        time_str = ROUND_BRACKETS.sub('', time_str).strip()
+    time_str = time_str.replace('٫', '.').replace('،', '.')
+    time_str = _collapse(TIME_COLON.sub(':', time_str))
+
+    match = TIME_HH_MM.match(time_str)
+    if not match:
+        return ""
+
+    hour = int(match.group(1))
+    minute = int(match.group(2))
+    if hour > 23 and minute <= 23:
+        hour, minute = minute, hour
+    if minute < 10:
+        hour, minute = minute, hour
+    if hour > 23 or minute > 59:
+        return ""
+
+    if am_pm == "AM":
+        if hour == 12:
+            hour = 0
+    elif am_pm == "PM":
+        if hour < 12:
+            hour += 12
+
+    return f"{hour:02d}:{minute:02d}"
+
+def _marked_time(original: str, raw_time: str) -> str:
+    """
+    The occurrence of `raw_time` in the unstripped chunk followed by its
+    (ص)/(م) marker, or `raw_time` itself when the chunk has no marker.
+    """
+    for m_marked in TIME.finditer(original):
+        marked = m_marked.group(1)
+        if TIME_MARKER.search(marked) and ROUND_BRACKETS.sub('', marked).strip() == raw_time:
+            return marked
+    return raw_time
+
+def _ambiguous(raw_time: str, time_val: str) -> bool:
+    """
+    True when an unmarked time reads as 01:00-12:59, where it may be either
+    AM or PM.
+    """
+    if not time_val or ('(' in raw_time and TIME_MARKER.search(raw_time)):
+        return False
+    return 1 <= int(time_val[:2]) <= 12
+
+def _duration(line: str) -> str:
+    """Duration in minutes, e.g. "30 ق" or "مدة التلاوة 30" => "30"; "" if absent."""
+    m = DURATION.search(line)
+    if not m:
+        return ""
+    return m.group(1) or m.group(2)
+
+def _reciter(line: str) -> str:
+    """Same result as parse_logic.parse_reciter."""
+    m = RECITER.search(line)
+    if not m:
+        return ""
+
+    reciter_text = m.group(1).strip()
+    reciter_text = RECITER_SURAH_TAIL.sub('', reciter_text)
+    reciter_text = RECITER_DURATION_TAIL.sub('', reciter_text)
+    reciter_text = RECITER_MIN_PREFIX.sub('', reciter_text)
+    reciter_text = reciter_text.strip('/').strip()
+    reciter_text = RECITER_SLASH_TAIL.sub('', reciter_text)
+    reciter_text = RECITER_TAYASSAR_TAIL.sub('', reciter_text)
+    return _collapse(reciter_text)
+
+def _surahs(line: str) -> list:
+    """Same result as parse_logic.parse_surahs."""
+    all_surahs = []
+    for m in SURAHS.findall(line):
+        for c in SURAH_SPLIT.split(m):
+            c = c.strip()
+            if not c:
+                continue
+            if SHORT_SURAHS.match(c):
+                all_surahs.append("قصار السور")
+            else:
+                if not SURAH_PREFIX.match(c):
+                    c = "سورة " + c
+                all_surahs.append(c)
+    return all_surahs
+
+def _verse_info(line: str) -> dict:
+    """Same result as parse_logic.parse_verse_ranges."""
+    data = {}
+    if "الآية" in line:
+        m1 = VERSE_RANGE.search(line)
+        if m1:
+            data["from_verse"] = m1.group(1).strip()
+            data["sura_1"] = m1.group(2).strip()
+            data["to_verse"] = m1.group(3).strip()
+            data["sura_2"] = m1.group(4).strip()
+
+    m2 = WHOLE_SURAH_RANGE.search(line)
+    if m2:
+        data["from_verse"] = "أول"
+        data["sura_1"] = m2.group(1).strip()
+        sura2 = m2.group(2) if m2.group(2) else m2.group(3)
+        data["to_verse"] = "ختام"
+        data["sura_2"] = sura2.strip()
+    return data
+
+def _surah_string(sur_list: list) -> str:
+    """Same result as parse_logic.transform_surah_list."""
+    if not sur_list:
+        return ""
+
+    final_parts = []
+    for i, s in enumerate(sur_list):
+        s = s.strip()
+        token = "قصار السور" if SHORT_SURAHS.match(s) else SURAH_PREFIX_WORD.sub('', s)
+        if token.lower() == "قصار السور":
+            final_parts.append("قصار السور" if i == 0 else "و قصار السور")
+        else:
+            final_parts.append(f"سورة {token}" if i == 0 else f"و {token}")
+
+    joined = SURAH_STANDALONE.sub('', " ".join(final_parts))
+
+    # keep only the first standalone "سورة"
+    tokens = []
+    found_sura = False
+    for t in joined.split():
+        if SURAH_WORD.match(t):
+            if found_sura:
+                continue
+            found_sura = True
+        tokens.append(t)
+    return " ".join(tokens)
+
+#############################
+# D) Parser
+#############################
+
+@lru_cache(maxsize=CHUNK_CACHE_SIZE)
+def _parse_chunk(chunk: str):
+    """
+    Parses one merged chunk into a (time, marked_time, reciter, surah,
+    duration, ambiguous_time) tuple, or None if the chunk holds nothing.
+    `time` is what parse_schedule_final reads; `marked_time` also honours the
+    (ص)/(م) marker. Cached because the same lines recur across days.
+    """
+    line = EMOJIS.sub('', _strip_brackets(chunk))
+
+    # Marker scan: skip extractors whose patterns cannot match this chunk
+    has_reciter = "للشيخ" in line or "للقارئ" in line
+    has_surah = "تيسر" in line or "سور" in line
+    has_verse = "الآية" in line or "حتى" in line
+
+    time_val = ""
+    marked_val = ""
+    raw_time = ""
+    m_time = TIME.search(line)
+    if m_time:
+        raw_time = _collapse(m_time.group(1))
+        time_val = marked_val = _fix_time(raw_time)
+        if '(' in chunk:
+            raw_time = _marked_time(_collapse(chunk), raw_time)
+            marked_val = _fix_time(raw_time)
+
+    reciter_val = _reciter(line) if has_reciter else ""
+    sur_list = _surahs(line) if has_surah else []
+    verse_info = _verse_info(line) if has_verse else {}
+
+    # If truly empty => skip
+    if not (time_val or reciter_val or sur_list or verse_info):
+        return None
+
+    sur_str = incorporate_verse_range_into_surah(_surah_string(sur_list), verse_info)
+    reciter_val = reciter_val or "لم يمكن التعرف علي القارئ"
+    return (
+        time_val or "لم يمكن تحديد الوقت",
+        marked_val or "لم يمكن تحديد الوقت",
+        RECITER_TRAILING_WAW.sub('', reciter_val).strip(),
+        sur_str or "لم يمكن تحديد السورة",
+        _duration(line),
+        _ambiguous(raw_time, marked_val),
+    )
+
+def parse_schedule_fast(raw_text: str) -> list:
+    """
+    Drop-in replacement for parse_schedule_final: same input, same records.
+    """
+    results = []
+    for chunk in _chunks(raw_text):
+        parsed = _parse_chunk(chunk)
+        if parsed is None:
+            continue
+        time_val, _, reciter_val, surah_val, _, _ = parsed
+        results.append({
+            "الوقت": time_val,
+            "قارئ": reciter_val,
+            "السورة": surah_val,
+        })
+    return results
+
+def parse_schedule_detailed(raw_text: str) -> list:
+    """
+    Like parse_schedule_fast, but the time honours its (ص)/(م) marker and
+    each record also carries "المدة" and "ambiguous_time" for scoring.
+    """
+    results = []
+    for chunk in _chunks(raw_text):
+        parsed = _parse_chunk(chunk)
+        if parsed is None:
+            continue
+        _, time_val, reciter_val, surah_val, duration, ambiguous_time = parsed
+        results.append({
+            "الوقت": time_val,
+            "قارئ": reciter_val,
+            "السورة": surah_val,
+            "المدة": duration,
+            "ambiguous_time": ambiguous_time,
+        })
+    return results
+
+def diff_against_reference(raw_text: str) -> list:
+    """
+    Differential check against parse_schedule_final.
+
+    Returns:
+        list: (index, reference_record, fast_record) for every record that
+        differs; empty when both parsers agree.
+    """
+    reference = parse_schedule_final(raw_text)
+    fast = parse_schedule_fast(raw_text)
+    mismatches = []
+    for idx in range(max(len(reference), len(fast))):
+        ref_record = reference[idx] if idx < len(reference) else None
+        fast_record = fast[idx] if idx < len(fast) else None
+        if ref_record != fast_record:
+            mismatches.append((idx, ref_record, fast_record))
+    return mismatches
@@ -0,0 +1,213 @@
+import os
+import re
+import abc
+import json
+import time
+import random
+import hashlib
+import logging
+import threading
+
+from schedule_parsing.fast_parser import parse_schedule_detailed
+from schedule_parsing.parse_logic import time_to_minutes
+
+logger = logging.getLogger(__name__)
+
+# -----------------------------------------------------------------------------
+# Gemini model stand-ins
+# -----------------------------------------------------------------------------
+# Every backend exposes generate_content(prompt) returning an object with a
+# `.text` attribute, like genai.GenerativeModel, so GeminiClient and the
+# ingestion pipeline run unchanged against them:
+#   * live   - the real Gemini model;
+#   * record - the real model, saving prompt-hash -> response pairs to disk;
+#   * replay - serves recorded responses without the network;
+#   * fake   - builds responses from parse_schedule_detailed.
+# replay and fake can inject latency and failures, seeded for repeatable runs.
+
+BACKENDS = ("live", "record", "replay", "fake")
+
+# Directory holding recorded responses, one <prompt sha256>.json per prompt
+GEMINI_RECORDINGS_DIR = os.getenv(
+    "GEMINI_RECORDINGS_DIR",
+    os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "gemini_recordings"),
+)
+# Injected behaviour for replay/fake
+GEMINI_STUB_LATENCY_MS = float(os.getenv("GEMINI_STUB_LATENCY_MS", 0))
+GEMINI_STUB_JITTER_MS = float(os.getenv("GEMINI_STUB_JITTER_MS", 0))
+GEMINI_STUB_FAILURE_RATE = float(os.getenv("GEMINI_STUB_FAILURE_RATE", 0))
+GEMINI_STUB_SEED = os.getenv("GEMINI_STUB_SEED")
+
+# The raw message is the tail of PROMPT_TEMPLATE
+RAW_TEXT_MARKER = "Raw Arabic Radio Schedule Text:\n"
+# No trailing \b: headers write the year as "2025م"
+gregorian_date_pattern = re.compile(r"\b\d{1,2}/\d{1,2}/\d{4}")
+# FakeModel derives a missing duration from the gap to the next entry within these bounds (minutes)
+FAKE_DURATION_RANGE = (5, 60)
+
+
+class StubResponse:
+    def __init__(self, text: str):
+        self.text = text
+
+
+class InjectedFailure(RuntimeError):
+    """Raised by replay/fake backends to simulate a failed Gemini call."""
+
+
+def prompt_hash(prompt: str) -> str:
+    return hashlib.sha256(prompt.encode("utf-8")).hexdigest()
+
+
+class RecordingModel:
+    """Forwards to the real model and saves every successful response."""
+
+    def __init__(self, model, directory: str = GEMINI_RECORDINGS_DIR):
+        self.model = model
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+
+    def generate_content(self, prompt: str):
+        response = self.model.generate_content(prompt)
+        key = prompt_hash(prompt)
+        path = os.path.join(self.directory, f"{key}.json")
+        with open(path, "w", encoding="utf-8") as recording:
+            json.dump({"prompt": prompt, "response": response.text}, recording, ensure_ascii=False)
+        logger.info(f"Recorded Gemini response {key[:12]}.")
+        return response
+
+
+class StubModel(abc.ABC):
+    """Shared latency and failure injection for the offline backends."""
+
+    def __init__(self, latency_ms=GEMINI_STUB_LATENCY_MS, jitter_ms=GEMINI_STUB_JITTER_MS,
+                 failure_rate=GEMINI_STUB_FAILURE_RATE, seed=GEMINI_STUB_SEED):
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.failure_rate = failure_rate
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self.calls = 0
+
+    @abc.abstractmethod
+    def _respond(self, prompt: str) -> str:
+        """Returns the response text for `prompt`."""
+
+    def generate_content(self, prompt: str):
+        with self._lock:
+            self.calls += 1
+            delay = self.latency_ms + self._random.uniform(0, self.jitter_ms)
+            fail = self._random.random() < self.failure_rate
+        if delay:
+            time.sleep(delay / 1000)
+        if fail:
+            raise InjectedFailure("Injected Gemini failure.")
+        return StubResponse(self._respond(prompt))
+
+
+class ReplayModel(StubModel):
+    """Serves responses saved by RecordingModel."""
+
+    def __init__(self, directory: str = GEMINI_RECORDINGS_DIR, **kwargs):
+        super().__init__(**kwargs)
+        self.directory = directory
+
+    def _respond(self, prompt: str) -> str:
+        key = prompt_hash(prompt)
+        path = os.path.join(self.directory, f"{key}.json")
+        try:
+            with open(path, encoding="utf-8") as recording:
+                return json.load(recording)["response"]
+        except FileNotFoundError:
+            raise InjectedFailure(f"No recorded Gemini response for prompt {key[:12]}.")
+
+
+class FakeModel(StubModel):
+    """
+    Answers in Gemini's JSON format using the regex parser. Durations are
+    written like Gemini's ("30 ق"): the message's own, or else the gap to
+    the next entry when it is a plausible recitation length.
+    """
+
+    @staticmethod
+    def _durations(records: list) -> list:
+        starts = [time_to_minutes(record["الوقت"]) for record in records]
+        durations = []
+        for idx, record in enumerate(records):
+            minutes = record["المدة"]
+            following = starts[idx + 1] if idx + 1 < len(starts) else None
+            if not minutes and starts[idx] is not None and following is not None:
+                gap = following - starts[idx]
+                if FAKE_DURATION_RANGE[0] <= gap <= FAKE_DURATION_RANGE[1]:
+                    minutes = str(gap)
+            durations.append(f"{minutes} ق" if minutes else "")
+        return durations
+
+    def _respond(self, prompt: str) -> str:
+        raw_text = prompt.split(RAW_TEXT_MARKER, 1)[-1]
+        match = gregorian_date_pattern.search(raw_text)
+        records = parse_schedule_detailed(raw_text)
+        schedule = [
+            {
+                "الوقت": record["الوقت"],
+                "القارئ": record["قارئ"],
+                "السور": record["السورة"],
+                "المدة": duration,
+            }
+            for record, duration in zip(records, self._durations(records))
+        ]
+        return json.dumps(
+            {"date": match.group(0) if match else "", "schedule": schedule},
+            ensure_ascii=False,
+        )
+
+
+class LazyModel:
+    """
+    Builds the wrapped model on the first generate_content() call, so
+    importing the handler never loads google.generativeai or contacts the
+    API; processes that never call Gemini never pay for it.
+    """
+
+    def __init__(self, factory):
+        self._factory = factory
+        self._model = None
+        self._lock = threading.Lock()
+
+    @property
+    def loaded(self) -> bool:
+        return self._model is not None
+
+    def get(self):
+        if self._model is None:
+            with self._lock:
+                if self._model is None:
+                    self._model = self._factory()
+        return self._model
+
+    def generate_content(self, prompt: str):
+        return self.get().generate_content(prompt)
+
+
+def create_model(backend: str, live_model_factory):
+    """
+    Builds the model object for `backend`. The name is checked right away;
+    the real model behind "live" and "record" is only built on first use.
+
+    Args:
+        backend (str): One of BACKENDS.
+        live_model_factory (callable): Returns the real genai model; only
+            called for "live" and "record".
+
+    Raises:
+        ValueError: `backend` is not one of BACKENDS.
+    """
+    if backend not in BACKENDS:
+        raise ValueError(f"Unknown GEMINI_BACKEND '{backend}'; expected one of {', '.join(BACKENDS)}.")
+    if backend == "live":
+        return LazyModel(live_model_factory)
+    if backend == "record":
+        return LazyModel(lambda: RecordingModel(live_model_factory()))
+    if backend == "replay":
+        return ReplayModel()
+    return FakeModel()
@@ -1,13 +1,18 @@
 import os
 import json
+import hashlib
 import logging
 import re
 import time
-import google.generativeai as genai
+import random
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
 from dotenv import load_dotenv
 from jsonschema import validate, ValidationError
 from datetime import datetime
-import dateparser
+
+from schedule_parsing.gemini_backends import create_model
 
 # Load environment variables
 load_dotenv()
@@ -16,15 +21,38 @@ load_dotenv()
 logger = logging.getLogger(__name__)
 logging.basicConfig(level=logging.INFO)
 
+# live (default), record, replay or fake; see gemini_backends.py
+GEMINI_BACKEND = os.getenv("GEMINI_BACKEND", "live").lower()
+
 # Load API key from environment variables
 API_KEY = os.getenv("GEMINI_API_KEY")
-if not API_KEY:
-    logger.error("GEMINI_API_KEY is not set in the environment variables.")
-    raise EnvironmentError("GEMINI_API_KEY is required but not set.")
+if GEMINI_BACKEND in ("live", "record"):
+    if not API_KEY:
+        logger.error("GEMINI_API_KEY is not set in the environment variables.")
+        raise EnvironmentError("GEMINI_API_KEY is required but not set.")
+
+
+def create_live_model():
+    """Configures the Gemini SDK and returns the real model."""
+    import google.generativeai as genai  # Slow to import; deferred to the first Gemini call
+
+    genai.configure(api_key=API_KEY)
+    return genai.GenerativeModel("gemini-1.5-flash")
 
-# Initialize the Gemini client
-genai.configure(api_key=API_KEY)
-model = genai.GenerativeModel("gemini-1.5-flash")
+
+# An unknown backend fails here; the real model is built on first use (see LazyModel)
+model = create_model(GEMINI_BACKEND, create_live_model)
+if GEMINI_BACKEND != "live":
+    logger.warning(f"Using the '{GEMINI_BACKEND}' Gemini backend.")
+
+# Time budget of one retry_gemini_request call, across all attempts
+GEMINI_DEADLINE_SECONDS = float(os.getenv("GEMINI_DEADLINE_SECONDS", 30))
+# Time budget of a single attempt, including its hedged duplicate
+GEMINI_ATTEMPT_TIMEOUT_SECONDS = float(os.getenv("GEMINI_ATTEMPT_TIMEOUT_SECONDS", 12))
+# Consecutive failed attempts that open the circuit breaker
+GEMINI_BREAKER_FAILURES = int(os.getenv("GEMINI_BREAKER_FAILURES", 5))
+# Seconds the breaker stays open before letting one trial request through
+GEMINI_BREAKER_RESET_SECONDS = float(os.getenv("GEMINI_BREAKER_RESET_SECONDS", 60))
 
 # -----------------------------------------------------------------------------
 # PROMPT_TEMPLATE
@@ -73,6 +101,10 @@ Raw Arabic Radio Schedule Text:
 {raw_text}
 """
 
+# Changes whenever PROMPT_TEMPLATE is edited, so cached parses from an older
+# prompt are never reused.
+PROMPT_TEMPLATE_VERSION = hashlib.sha256(PROMPT_TEMPLATE.encode("utf-8")).hexdigest()[:12]
+
 # -----------------------------------------------------------------------------
 # GEMINI_RESPONSE_SCHEMA
 # -----------------------------------------------------------------------------
@@ -111,6 +143,43 @@ def strip_code_fences(text: str) -> str:
         return match.group(1).strip()
     return text.strip()
 
+# -----------------------------------------------------------------------------
+# parse_gemini_response
+# -----------------------------------------------------------------------------
+def parse_gemini_response(text: str) -> dict:
+    """
+    Strips code fences from a Gemini reply, parses it as JSON and validates it
+    against GEMINI_RESPONSE_SCHEMA.
+
+    Raises:
+        ValueError: If the reply is empty, not JSON, or lacks required data.
+    """
+    if not text:
+        logger.error("No response received from Gemini.")
+        raise ValueError("Gemini API returned an empty response.")
+
+    # Strip potential code fences
+    cleaned_response = strip_code_fences(text)
+
+    try:
+        # Parse the response as JSON
+        parsed_json = json.loads(cleaned_response)
+
+        # Validate the structure of the JSON against our schema
+        validate(instance=parsed_json, schema=GEMINI_RESPONSE_SCHEMA)
+
+    except json.JSONDecodeError as e:
+        logger.error(f"Failed to parse JSON from Gemini response: {e}")
+        logger.debug(f"Gemini raw response: {text}")
+        raise ValueError("Invalid JSON format in Gemini response.") from e
+
+    except ValidationError as e:
+        logger.error(f"Schema validation error in Gemini response: {e.message}")
+        logger.debug(f"Gemini raw response: {text}")
+        raise ValueError("Gemini response does not match the expected schema.") from e
+
+    return parsed_json
+
 # -----------------------------------------------------------------------------
 # process_schedule_with_gemini
 # -----------------------------------------------------------------------------
@@ -137,35 +206,12 @@ def process_schedule_with_gemini(raw_text: str) -> dict:
     try:
         # Send the prompt to Gemini
         response = model.generate_content(prompt)
-
-        if not response.text:
-            logger.error("No response received from Gemini.")
-            raise ValueError("Gemini API returned an empty response.")
-
         logger.debug("Response received from Gemini.")
 
-        # Strip potential code fences
-        cleaned_response = strip_code_fences(response.text)
-
-        # Parse the response as JSON
-        parsed_json = json.loads(cleaned_response)
-
-        # Validate the structure of the JSON against our schema
-        validate(instance=parsed_json, schema=GEMINI_RESPONSE_SCHEMA)
-
+        parsed_json = parse_gemini_response(response.text)
         logger.info("Successfully processed schedule with Gemini.")
         return parsed_json
 
-    except json.JSONDecodeError as e:
-        logger.error(f"Failed to parse JSON from Gemini response: {e}")
-        logger.debug(f"Gemini raw response: {response.text}")
-        raise ValueError("Invalid JSON format in Gemini response.") from e
-
-    except ValidationError as e:
-        logger.error(f"Schema validation error in Gemini response: {e.message}")
-        logger.debug(f"Gemini raw response: {response.text}")
-        raise ValueError("Gemini response does not match the expected schema.") from e
-
     except Exception as e:
         logger.error(f"Error while processing schedule with Gemini: {e}")
         raise
@@ -196,6 +242,8 @@ def process_gemini_output(gemini_output: dict) -> dict:
     extracted_date = match.group(0)  # e.g. "09/01/2025"
 
     # 3) Convert the substring into a Python datetime
+    import dateparser  # Slow to import (large locale tables); deferred to first use
+
     parsed_dt = dateparser.parse(extracted_date, languages=["ar"])
     if not parsed_dt:
         raise ValueError(f"Could not parse date from '{extracted_date}' using dateparser.")
@@ -220,34 +268,233 @@ def process_gemini_output(gemini_output: dict) -> dict:
         "final_schedule": final_schedule
     }
 
+# -----------------------------------------------------------------------------
+# Gemini client: deadlines, hedging and circuit breaking
+# -----------------------------------------------------------------------------
+class GeminiUnavailable(Exception):
+    """Raised when Gemini is skipped (breaker open) or runs out of time."""
+
+
+class LatencyTracker:
+    """Rolling window of successful call latencies."""
+
+    def __init__(self, window: int = 50, min_samples: int = 10):
+        self._samples = deque(maxlen=window)
+        self._lock = threading.Lock()
+        self.min_samples = min_samples
+
+    def add(self, seconds: float):
+        with self._lock:
+            self._samples.append(seconds)
+
+    def p95(self):
+        """Returns the 95th percentile, or None until enough samples exist."""
+        with self._lock:
+            if len(self._samples) < self.min_samples:
+                return None
+            ordered = sorted(self._samples)
+        return ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))]
+
+
+class CircuitBreaker:
+    """
+    Opens after `failure_threshold` consecutive failures. Once `reset_timeout`
+    has passed it half-opens and lets a single trial through: success closes
+    it again, failure re-opens it.
+    """
+
+    def __init__(self, failure_threshold: int, reset_timeout: float, clock=time.monotonic):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.clock = clock
+        self._lock = threading.Lock()
+        self.state = "closed"
+        self.failures = 0
+        self.opened_at = None
+
+    def allow(self) -> bool:
+        with self._lock:
+            if self.state == "closed":
+                return True
+            if self.state == "open" and self.clock() - self.opened_at >= self.reset_timeout:
+                logger.info("Gemini circuit breaker half-open; sending a trial request.")
+                self.state = "half_open"
+                return True
+            return False
+
+    def record_success(self):
+        with self._lock:
+            if self.state != "closed":
+                logger.info("Gemini circuit breaker closed.")
+            self.state = "closed"
+            self.failures = 0
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            if self.state == "half_open" or self.failures >= self.failure_threshold:
+                if self.state != "open":
+                    logger.warning(f"Gemini circuit breaker opened after {self.failures} failures.")
+                self.state = "open"
+                self.opened_at = self.clock()
+
+    @property
+    def is_open(self) -> bool:
+        return self.state == "open"
+
+
+class GeminiClient:
+    """
+    Calls `model.generate_content` under an overall deadline and a
+    per-attempt timeout.
+
+    When an attempt is still pending after the rolling p95 latency, an
+    identical hedged request is sent and whichever answers first wins.
+    Consecutive failures open a circuit breaker, after which requests fail
+    immediately with GeminiUnavailable so callers go straight to the regex
+    parser. Any object with a `generate_content(prompt)` method returning
+    something with a `.text` attribute can stand in for the model.
+    """
+
+    def __init__(
+        self,
+        model,
+        deadline: float = GEMINI_DEADLINE_SECONDS,
+        attempt_timeout: float = GEMINI_ATTEMPT_TIMEOUT_SECONDS,
+        breaker: CircuitBreaker = None,
+        hedge: bool = True,
+        clock=time.monotonic,
+        sleep=time.sleep,
+        max_workers: int = 4,
+    ):
+        self.model = model
+        self.deadline = deadline
+        self.attempt_timeout = attempt_timeout
+        self.breaker = breaker or CircuitBreaker(GEMINI_BREAKER_FAILURES, GEMINI_BREAKER_RESET_SECONDS, clock)
+        self.hedge = hedge
+        self.clock = clock
+        self.sleep = sleep
+        self.latency = LatencyTracker()
+        self.hedges_sent = 0
+        # Timed-out calls cannot be cancelled; they finish here in the background
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="gemini")
+
+    def _call(self, prompt: str) -> str:
+        started = self.clock()
+        response = self.model.generate_content(prompt)
+        self.latency.add(self.clock() - started)
+        return response.text
+
+    def _attempt(self, prompt: str, timeout: float) -> str:
+        """One attempt, hedged once if it is slower than the rolling p95."""
+        started = self.clock()
+        hedge_after = self.latency.p95() if self.hedge else None
+        pending = {self._executor.submit(self._call, prompt)}
+        last_error = None
+
+        while pending:
+            elapsed = self.clock() - started
+            remaining = timeout - elapsed
+            if remaining <= 0:
+                break
+            wait_for = remaining
+            if hedge_after is not None:
+                wait_for = min(remaining, max(hedge_after - elapsed, 0))
+
+            done, pending = wait(pending, timeout=wait_for, return_when=FIRST_COMPLETED)
+            for future in done:
+                try:
+                    return future.result()
+                except Exception as e:
+                    last_error = e
+
+            if hedge_after is not None and pending and self.clock() - started >= hedge_after:
+                logger.info(f"Gemini call slower than p95 ({hedge_after:.2f}s); sending a hedged request.")
+                pending.add(self._executor.submit(self._call, prompt))
+                self.hedges_sent += 1
+                hedge_after = None
+
+        if pending:
+            raise TimeoutError(f"Gemini did not answer within {timeout:.1f}s.")
+        raise last_error
+
+    def request(self, raw_text: str, retries: int = 3, backoff_factor: float = 1.0) -> dict:
+        """
+        Returns the validated schedule JSON for `raw_text`.
+
+        Raises:
+            GeminiUnavailable: If the breaker is open, or no attempt succeeded
+                within the deadline.
+        """
+        if not self.breaker.allow():
+            raise GeminiUnavailable("Gemini circuit breaker is open.")
+
+        prompt = PROMPT_TEMPLATE.format(raw_text=raw_text)
+        deadline = self.clock() + self.deadline
+        last_error = None
+
+        for attempt in range(retries):
+            remaining = deadline - self.clock()
+            if remaining <= 0:
+                break
+            logger.info(f"Attempt {attempt + 1} of {retries} to process schedule with Gemini.")
+            try:
+                text = self._attempt(prompt, min(self.attempt_timeout, remaining))
+            except Exception as e:
+                logger.warning(f"Attempt {attempt + 1} failed: {e}")
+                last_error = e
+                self.breaker.record_failure()
+                if self.breaker.is_open:
+                    break
+            else:
+                # Gemini answered, so the API is healthy even if the reply is malformed
+                self.breaker.record_success()
+                try:
+                    return parse_gemini_response(text)
+                except ValueError as e:
+                    logger.warning(f"Attempt {attempt + 1} returned an unusable reply: {e}")
+                    last_error = e
+
+            if attempt < retries - 1:
+                # Full jitter, never sleeping past the deadline
+                delay = random.uniform(0, backoff_factor * (2 ** attempt))
+                delay = min(delay, max(deadline - self.clock(), 0))
+                logger.info(f"Retrying after {delay:.2f} seconds...")
+                self.sleep(delay)
+
+        logger.error("All attempts to process schedule with Gemini failed.")
+        raise GeminiUnavailable(f"Failed to process schedule with Gemini: {last_error}")
+
+    def stats(self) -> dict:
+        p95 = self.latency.p95()
+        return {
+            "breaker_state": self.breaker.state,
+            "consecutive_failures": self.breaker.failures,
+            "latency_p95": round(p95, 3) if p95 is not None else None,
+            "hedges_sent": self.hedges_sent,
+        }
+
+
+# Shared client used by retry_gemini_request
+gemini_client = GeminiClient(model)
+
 # -----------------------------------------------------------------------------
 # retry_gemini_request
 # -----------------------------------------------------------------------------
 def retry_gemini_request(raw_text: str, retries: int = 3, backoff_factor: float = 1.0) -> dict:
     """
-    Retries the Gemini request in case of failures.
+    Requests the schedule from Gemini through `gemini_client`, bounded by
+    GEMINI_DEADLINE_SECONDS overall and GEMINI_ATTEMPT_TIMEOUT_SECONDS per attempt.
 
     Args:
         raw_text (str): The raw schedule text.
-        retries (int): Number of retries.
-        backoff_factor (float): Backoff multiplier for delay.
+        retries (int): Maximum number of attempts.
+        backoff_factor (float): Backoff multiplier for the jittered delay.
 
     Returns:
         dict: Parsed schedule JSON from Gemini.
 
     Raises:
-        Exception: If all retries fail.
+        GeminiUnavailable: If the breaker is open or all attempts fail.
     """
-    for attempt in range(retries):
-        try:
-            logger.info(f"Attempt {attempt + 1} of {retries} to process schedule with Gemini.")
-            return process_schedule_with_gemini(raw_text)
-        except Exception as e:
-            logger.warning(f"Attempt {attempt + 1} failed: {e}")
-            if attempt < retries - 1:
-                delay = backoff_factor * (2 ** attempt)
-                logger.info(f"Retrying after {delay} seconds...")
-                time.sleep(delay)
-
-    logger.error("All retry attempts to process schedule with Gemini failed.")
-    raise Exception("Failed to process schedule with Gemini after multiple attempts.")
+    return gemini_client.request(raw_text, retries=retries, backoff_factor=backoff_factor)
@@ -1,6 +1,7 @@
 import re
 from collections import defaultdict
 import json
+from datetime import datetime
 
 #############################
 # A) Bracket & Emoji Removal
@@ -38,7 +39,7 @@ def remove_emojis(text: str) -> str:
 
 def fix_time_format(time_str: str) -> str:
     """
-    Attempts to parse times like "06:00", "40 : 6 (ص)" => "06:40",
+    Attempts to parse times like "06:00", "40 : 6 (ص)" or "40 : 6 (صباحا)" => "06:40",
     swapping if reversed, ignoring parentheses, etc.
 
     NEW HEURISTIC:
@@ -46,11 +47,11 @@ def fix_time_format(time_str: str) -> str:
 
     Returns "" if invalid.
     """
-    # Check for (ص)/(م) => optional AM/PM usage
+    # Check for (ص)/(م) or (صباحا)/(مساء) => optional AM/PM usage
     am_pm = ""
-    if re.search(r'\(.*?[ص]\)', time_str):
+    if re.search(r'\(\s*(?:ص|صباح[اً]*)\s*\)', time_str):
         am_pm = "AM"
-    elif re.search(r'\(.*?[م]\)', time_str):
+    elif re.search(r'\(\s*(?:م|مساء[اً]*)\s*\)', time_str):
         am_pm = "PM"
 
     # Remove parentheses
@@ -92,6 +93,22 @@ def fix_time_format(time_str: str) -> str:
 
     return f"{hour:02d}:{minute:02d}"
 
+def time_to_minutes(time_str: str):
+    """
+    Converts a stored schedule time ("06:40 AM" from Gemini or "06:40" from
+    parse_schedule_final) into minutes since midnight.
+
+    Returns None if the string matches neither format.
+    """
+    time_str = (time_str or "").strip()
+    for fmt in ("%I:%M %p", "%H:%M"):
+        try:
+            parsed = datetime.strptime(time_str, fmt)
+        except ValueError:
+            continue
+        return parsed.hour * 60 + parsed.minute
+    return None
+
 #############################
 # C) Reciter Parsing
 #############################
@@ -0,0 +1,249 @@
+# services/archive_import.py
+
+import os
+import json
+import time
+import logging
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+
+logger = logging.getLogger(__name__)
+
+# Only messages containing this marker are schedules
+SCHEDULE_MARKER = "برنامج إذاعة القرآن"
+
+# Bytes read from the export file at a time
+READ_SIZE = 1 << 20
+
+
+def message_text(message: dict) -> str:
+    """
+    Flattens the `text` of a Telegram Desktop export message, which is either
+    a string or a list of strings and {"type": ..., "text": ...} entities.
+    """
+    text = message.get("text", "")
+    if isinstance(text, list):
+        return "".join(part if isinstance(part, str) else part.get("text", "") for part in text)
+    return text or ""
+
+
+def iter_export_messages(path: str):
+    """
+    Streams the messages of a channel export without loading the whole file.
+
+    Accepts a Telegram Desktop JSON export ({"messages": [...]}) or a JSON
+    Lines file with one message object per line.
+
+    Yields:
+        dict: Each message object, in file order.
+    """
+    if path.endswith(".jsonl"):
+        with open(path, encoding="utf-8") as export_file:
+            for line in export_file:
+                if line.strip():
+                    yield json.loads(line)
+        return
+
+    decoder = json.JSONDecoder()
+    with open(path, encoding="utf-8") as export_file:
+        buffer = ""
+        # Find the start of the "messages" array
+        while True:
+            chunk = export_file.read(READ_SIZE)
+            if not chunk:
+                raise ValueError(f"No \"messages\" array found in {path}.")
+            buffer += chunk
+            key = buffer.find('"messages"')
+            if key != -1:
+                start = buffer.find("[", key)
+                if start != -1:
+                    buffer = buffer[start + 1:]
+                    break
+
+        position = 0
+        eof = False
+        while True:
+            # Skip separators between elements
+            while position < len(buffer) and buffer[position] in " \t\r\n,":
+                position += 1
+            if position < len(buffer) and buffer[position] == "]":
+                return
+            try:
+                message, end = decoder.raw_decode(buffer, position)
+            except json.JSONDecodeError:
+                if eof:
+                    raise
+                chunk = export_file.read(READ_SIZE)
+                eof = not chunk
+                buffer = buffer[position:] + chunk
+                position = 0
+                continue
+            yield message
+            position = end
+            if position > READ_SIZE:
+                buffer = buffer[position:]
+                position = 0
+
+
+def iter_schedule_messages(path: str, after_id: int = 0):
+    """Yields (message_id, text) for schedule posts newer than `after_id`."""
+    for message in iter_export_messages(path):
+        if message.get("type", "message") != "message":
+            continue
+        message_id = message.get("id", 0)
+        if message_id <= after_id:
+            continue
+        text = message_text(message)
+        if SCHEDULE_MARKER in text:
+            yield message_id, text
+
+
+def parse_messages(messages: list) -> list:
+    """
+    Process-pool worker: parses a chunk of (message_id, text) pairs.
+
+    Returns:
+        list: (message_id, "YYYY-MM-DD" or None, final_schedule or error,
+        fast path score) tuples.
+    """
+    from routes.schedule import parse_header_dates, parse_gregorian_date
+    from schedule_parsing.fast_parser import parse_schedule_detailed
+    from services.fast_path import score_schedule, to_storage_entry
+
+    results = []
+    for message_id, text in messages:
+        date_str = parse_header_dates(text).get("التاريخ_الميلادي", "")
+        try:
+            schedule_date = parse_gregorian_date(date_str).strftime("%Y-%m-%d")
+        except ValueError as ve:
+            results.append((message_id, None, str(ve), 0.0))
+            continue
+        records = parse_schedule_detailed(text)
+        final_schedule = [to_storage_entry(record) for record in records]
+        results.append((message_id, schedule_date, final_schedule, score_schedule(records)))
+    return results
+
+
+def parse_in_parallel(messages, workers: int, chunk_size: int):
+    """
+    Parses `messages` across a process pool, keeping every worker busy, and
+    yields each chunk's results in input order.
+    """
+    messages = iter(messages)
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        pending = deque()
+        while True:
+            chunk = list(islice(messages, chunk_size))
+            if not chunk:
+                break
+            pending.append(pool.submit(parse_messages, chunk))
+            if len(pending) >= workers * 2:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
+
+
+class RateLimiter:
+    """Spaces calls at least 60 / per_minute seconds apart."""
+
+    def __init__(self, per_minute: float):
+        self.interval = 60.0 / per_minute
+        self._next = 0.0
+
+    def wait(self):
+        now = time.monotonic()
+        if now < self._next:
+            time.sleep(self._next - now)
+        self._next = max(now, self._next) + self.interval
+
+
+def import_archive(app, path, workers=None, chunk_size=50, batch_size=500,
+                   use_gemini=False, gemini_per_minute=10, restart=False, progress=None):
+    """
+    Imports every schedule post of a channel export.
+
+    Messages are parsed in a process pool. Each batch of `batch_size` parsed
+    messages is written in one transaction, newest message per date winning,
+    and the batch's last message id is checkpointed so an interrupted import
+    resumes after it. With `use_gemini`, days the regex parse is not
+    confident about are sent to Gemini at most `gemini_per_minute` times a minute.
+
+    Args:
+        app (Flask): The application whose database is written.
+        path (str): Export file (.json or .jsonl).
+        progress (callable): Called with a stats dict after every batch.
+
+    Returns:
+        dict: Final counters.
+    """
+    from datetime import datetime
+    from routes.schedule import gemini_schedule_merged
+    from services.fast_path import FAST_PATH_MIN_CONFIDENCE
+    from services.schedule_store import replace_schedule_days
+    from services.telegram_checkpoints import get_checkpoint, advance_checkpoint
+
+    workers = workers or os.cpu_count() or 1
+    checkpoint_key = f"archive:{os.path.basename(path)}"
+    after_id = 0 if restart else (get_checkpoint(app, checkpoint_key) or 0)
+    if after_id:
+        logger.info(f"Resuming import of {path} after message id {after_id}.")
+
+    limiter = RateLimiter(gemini_per_minute) if use_gemini else None
+    stats = {"messages": 0, "failed": 0, "days_written": 0, "gemini_calls": 0, "last_message_id": after_id}
+    started = time.monotonic()
+    batch = {}
+    batch_messages = 0
+
+    def flush():
+        nonlocal batch, batch_messages
+        with app.app_context():
+            days = {}
+            for schedule_date, (text, final_schedule, score) in batch.items():
+                if limiter and score < FAST_PATH_MIN_CONFIDENCE:
+                    limiter.wait()
+                    stats["gemini_calls"] += 1
+                    try:
+                        final_schedule = gemini_schedule_merged(text, final_schedule, score)
+                    except ValueError as ve:
+                        logger.warning(f"Gemini could not improve {schedule_date}: {ve}")
+                if final_schedule:
+                    days[datetime.strptime(schedule_date, "%Y-%m-%d").date()] = final_schedule
+            stats["days_written"] += len(replace_schedule_days(days))
+        advance_checkpoint(app, checkpoint_key, stats["last_message_id"])
+
+        elapsed = time.monotonic() - started
+        stats["rate"] = round(stats["messages"] / elapsed, 1) if elapsed else 0.0
+        if progress:
+            progress(dict(stats))
+        batch = {}
+        batch_messages = 0
+
+    # Texts are kept next to the parse only while Gemini might need them
+    texts = {}
+    messages = iter_schedule_messages(path, after_id)
+    if use_gemini:
+        def remember(items):
+            for message_id, text in items:
+                texts[message_id] = text
+                yield message_id, text
+        messages = remember(messages)
+
+    for results in parse_in_parallel(messages, workers, chunk_size):
+        for message_id, schedule_date, outcome, score in results:
+            stats["messages"] += 1
+            stats["last_message_id"] = message_id
+            batch_messages += 1
+            text = texts.pop(message_id, None)
+            if schedule_date is None:
+                stats["failed"] += 1
+                logger.warning(f"Skipping message {message_id}: {outcome}")
+                continue
+            batch[schedule_date] = (text, outcome, score)
+        if batch_messages >= batch_size:
+            flush()
+    if batch_messages:
+        flush()
+
+    stats["elapsed"] = round(time.monotonic() - started, 1)
+    return stats
@@ -0,0 +1,165 @@
+# services/fast_path.py
+
+import os
+import re
+import logging
+from threading import Lock
+
+from schedule_parsing.parse_logic import time_to_minutes
+
+logger = logging.getLogger(__name__)
+
+# Share of fully parsed entries needed to store the regex parse without Gemini
+FAST_PATH_MIN_CONFIDENCE = float(os.getenv("FAST_PATH_MIN_CONFIDENCE", 0.9))
+
+# Placeholders written by the regex parsers
+TIME_PLACEHOLDER = "لم يمكن تحديد الوقت"
+RECITER_PLACEHOLDER = "لم يمكن التعرف علي القارئ"
+SURAH_PLACEHOLDER = "لم يمكن تحديد السورة"
+
+# Credit kept by an otherwise complete entry whose time lacks a (ص)/(م)
+# marker on a 12-hour reading, or which has no duration
+AMBIGUOUS_TIME_WEIGHT = 0.5
+MISSING_DURATION_WEIGHT = 0.8
+
+# A recognized reciter is a short run of words without digits
+RECITER_MAX_WORDS = 8
+digit_pattern = re.compile(r'[0-9٠-٩]')
+
+
+def valid_time(value: str) -> bool:
+    return time_to_minutes(value) is not None
+
+
+def recognized_reciter(value: str) -> bool:
+    value = (value or "").strip()
+    if not value or value == RECITER_PLACEHOLDER or digit_pattern.search(value):
+        return False
+    return len(value.split()) <= RECITER_MAX_WORDS
+
+
+def valid_surah(value: str) -> bool:
+    value = (value or "").strip()
+    return bool(value) and value != SURAH_PLACEHOLDER
+
+
+def valid_duration(value: str) -> bool:
+    return bool((value or "").strip())
+
+
+def to_storage_entry(record: dict) -> dict:
+    """Renames a regex parser record to the keys Gemini results use."""
+    return {
+        "الوقت": record.get("الوقت", ""),
+        "القارئ": record.get("قارئ", record.get("القارئ", "")),
+        "السورة": record.get("السورة", ""),
+        "المدة": record.get("المدة", ""),
+    }
+
+
+def score_entry(record: dict) -> float:
+    """
+    Confidence in one regex parser record: 0 unless it has a valid time, a
+    recognized reciter and a real surah, reduced when the time could be AM
+    or PM or the duration is missing.
+    """
+    entry = to_storage_entry(record)
+    if not (
+        valid_time(entry["الوقت"])
+        and recognized_reciter(entry["القارئ"])
+        and valid_surah(entry["السورة"])
+    ):
+        return 0.0
+    score = 1.0
+    if record.get("ambiguous_time"):
+        score *= AMBIGUOUS_TIME_WEIGHT
+    if not valid_duration(entry["المدة"]):
+        score *= MISSING_DURATION_WEIGHT
+    return score
+
+
+def score_schedule(records: list) -> float:
+    """
+    Confidence of a regex parse: the mean score_entry of its records, as
+    returned by parse_schedule_detailed. An empty schedule scores 0.
+    """
+    if not records:
+        return 0.0
+    return sum(score_entry(record) for record in records) / len(records)
+
+
+def merge_schedules(gemini_schedule: list, fast_schedule: list):
+    """
+    Fills fields Gemini left empty or invalid from the regex parse.
+
+    Entries are paired by start minute, or by position when both parses found
+    the same number of entries. Gemini stays authoritative for every field it
+    got right.
+
+    Returns:
+        tuple: (merged schedule, number of fields taken from the regex parse)
+    """
+    by_minute = {}
+    for entry in fast_schedule:
+        minute = time_to_minutes(entry.get("الوقت"))
+        if minute is not None:
+            by_minute.setdefault(minute, entry)
+    same_length = len(gemini_schedule) == len(fast_schedule)
+
+    checks = (
+        ("الوقت", valid_time),
+        ("القارئ", recognized_reciter),
+        ("السورة", valid_surah),
+        ("المدة", valid_duration),
+    )
+
+    merged = []
+    filled = 0
+    for idx, entry in enumerate(gemini_schedule):
+        entry = dict(entry)
+        counterpart = by_minute.get(time_to_minutes(entry.get("الوقت")))
+        if counterpart is None and same_length:
+            counterpart = fast_schedule[idx]
+
+        if counterpart is not None:
+            for field, is_valid in checks:
+                if not is_valid(entry.get(field)) and is_valid(counterpart.get(field)):
+                    entry[field] = counterpart[field]
+                    filled += 1
+        merged.append(entry)
+
+    return merged, filled
+
+
+class FastPathMetrics:
+    """Counts how each ingested schedule was produced."""
+
+    OUTCOMES = ("fast_path", "gemini_merged", "fallback")
+
+    def __init__(self):
+        self._lock = Lock()
+        self.outcomes = dict.fromkeys(self.OUTCOMES, 0)
+        self.fields_filled = 0
+        self.score_total = 0.0
+
+    def record(self, outcome: str, score: float, fields_filled: int = 0):
+        with self._lock:
+            self.outcomes[outcome] += 1
+            self.fields_filled += fields_filled
+            self.score_total += score
+
+    def stats(self) -> dict:
+        with self._lock:
+            total = sum(self.outcomes.values())
+            return {
+                **self.outcomes,
+                "total": total,
+                "fast_path_rate": round(self.outcomes["fast_path"] / total, 3) if total else 0.0,
+                "mean_score": round(self.score_total / total, 3) if total else 0.0,
+                "fields_filled_from_regex": self.fields_filled,
+                "min_confidence": FAST_PATH_MIN_CONFIDENCE,
+            }
+
+
+# Shared instance used by the ingestion pipeline
+fast_path_metrics = FastPathMetrics()
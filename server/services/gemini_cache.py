@@ -0,0 +1,233 @@
+# services/gemini_cache.py
+
+import os
+import re
+import json
+import time
+import hashlib
+import logging
+from collections import OrderedDict
+from datetime import datetime
+from threading import Lock
+
+from database import db
+from models import GeminiParseCache
+from schedule_parsing.parse_logic import remove_emojis
+from schedule_parsing.gemini_handler import PROMPT_TEMPLATE_VERSION
+
+logger = logging.getLogger(__name__)
+
+# Maximum number of cached parses kept in the database
+GEMINI_CACHE_MAX_ENTRIES = int(os.getenv("GEMINI_CACHE_MAX_ENTRIES", 500))
+# Most recently used entries also kept in process memory
+GEMINI_CACHE_MEMORY_ENTRIES = int(os.getenv("GEMINI_CACHE_MEMORY_ENTRIES", 64))
+# Hit counters are written in one batch once this many entries have pending
+# hits, or the oldest pending hit is this many seconds old
+GEMINI_CACHE_FLUSH_HITS = int(os.getenv("GEMINI_CACHE_FLUSH_HITS", 50))
+GEMINI_CACHE_FLUSH_SECONDS = float(os.getenv("GEMINI_CACHE_FLUSH_SECONDS", 60))
+
+
+def normalize_message(raw_text: str) -> str:
+    """
+    Normalizes a schedule message so reposts and cosmetic edits hash the same:
+    emojis are removed and all whitespace runs collapse to single spaces.
+    Bracketed text is kept because it carries the (ص)/(م) markers of the times.
+    """
+    return re.sub(r'\s+', ' ', remove_emojis(raw_text)).strip()
+
+
+def gemini_cache_key(raw_text: str) -> str:
+    """Content address of a message for the current prompt template."""
+    payload = f"{PROMPT_TEMPLATE_VERSION}\n{normalize_message(raw_text)}"
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class GeminiResultCache:
+    """
+    Persistent, size-bounded cache of `process_gemini_output` results.
+
+    Entries live in the `gemini_parse_cache` table and are evicted least
+    recently used first. Reads and writes go through their own connection so
+    they never commit unrelated work pending on `db.session`.
+
+    The most recently used entries are also held in an in-process LRU, so a
+    repeated hit reads nothing from the database. Hits only update
+    `hits`/`last_used_at` in memory; the pending counters are written in one
+    batch (see GEMINI_CACHE_FLUSH_HITS/SECONDS) and always before evicting.
+    """
+
+    def __init__(self, max_entries: int = GEMINI_CACHE_MAX_ENTRIES,
+                 memory_entries: int = GEMINI_CACHE_MEMORY_ENTRIES):
+        self.max_entries = max_entries
+        self.memory_entries = memory_entries
+        self._lock = Lock()
+        # key -> JSON text, least recently used first
+        self._memory = OrderedDict()
+        # key -> (hits not yet written, last use)
+        self._pending_hits = {}
+        self._pending_since = None
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def _table(self):
+        return GeminiParseCache.__table__
+
+    @property
+    def _engine(self):
+        return db.engines["dynamic"]
+
+    def _count(self, hit: bool):
+        with self._lock:
+            if hit:
+                self.hits += 1
+            else:
+                self.misses += 1
+
+    def _remember(self, key: str, result_json: str):
+        """Adds `key` to the in-process LRU. Caller holds the lock."""
+        self._memory[key] = result_json
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.memory_entries:
+            self._memory.popitem(last=False)
+
+    def _record_hit(self, key: str):
+        """Counts a hit to be written later. Caller holds the lock."""
+        hits, _ = self._pending_hits.get(key, (0, None))
+        self._pending_hits[key] = (hits + 1, datetime.utcnow())
+        if self._pending_since is None:
+            self._pending_since = time.monotonic()
+
+    def _take_pending_hits(self, force: bool = False) -> list:
+        """
+        Empties the pending hit counters when due (or when `force`).
+        Caller holds the lock.
+
+        Returns:
+            list: UPDATE parameters, empty when nothing is due.
+        """
+        if not self._pending_hits:
+            return []
+        due = (
+            len(self._pending_hits) >= GEMINI_CACHE_FLUSH_HITS
+            or time.monotonic() - self._pending_since >= GEMINI_CACHE_FLUSH_SECONDS
+        )
+        if not (force or due):
+            return []
+        pending = [
+            {"entry_key": key, "new_hits": hits, "used_at": used_at}
+            for key, (hits, used_at) in self._pending_hits.items()
+        ]
+        self._pending_hits = {}
+        self._pending_since = None
+        return pending
+
+    def _write_hits(self, conn, pending: list):
+        """Applies taken hit counters with one executemany UPDATE."""
+        if not pending:
+            return
+        table = self._table
+        conn.execute(
+            table.update()
+            .where(table.c.key == db.bindparam("entry_key"))
+            .values(hits=table.c.hits + db.bindparam("new_hits"), last_used_at=db.bindparam("used_at")),
+            pending,
+        )
+
+    def flush(self, force: bool = True):
+        """Writes the pending hit counters (by default even if not yet due)."""
+        with self._lock:
+            pending = self._take_pending_hits(force)
+        if not pending:
+            return
+        try:
+            with self._engine.begin() as conn:
+                self._write_hits(conn, pending)
+        except Exception as e:
+            # Only usage statistics and eviction order are lost
+            logger.error(f"Gemini cache hit counters could not be written: {e}")
+
+    def get(self, key: str):
+        """Returns the cached result for `key`, or None on a miss or a cache error."""
+        with self._lock:
+            result_json = self._memory.get(key)
+            if result_json is not None:
+                self._memory.move_to_end(key)
+
+        if result_json is None:
+            table = self._table
+            try:
+                with self._engine.connect() as conn:
+                    row = conn.execute(
+                        db.select(table.c.result).where(table.c.key == key)
+                    ).first()
+            except Exception as e:
+                logger.error(f"Gemini cache lookup failed: {e}")
+                row = None
+            if row is not None:
+                result_json = row.result
+                with self._lock:
+                    self._remember(key, result_json)
+
+        self._count(hit=result_json is not None)
+        if result_json is None:
+            return None
+
+        with self._lock:
+            self._record_hit(key)
+        self.flush(force=False)
+        logger.info(f"Gemini cache hit for {key[:12]}.")
+        # Parsed per hit, so callers can never modify the cached copy
+        return json.loads(result_json)
+
+    def put(self, key: str, result: dict):
+        """Stores a validated result and evicts the least recently used overflow."""
+        table = self._table
+        now = datetime.utcnow()
+        result_json = json.dumps(result, ensure_ascii=False)
+        with self._lock:
+            self._remember(key, result_json)
+            # Eviction goes by last_used_at, so pending hits are written first
+            pending = self._take_pending_hits(force=True)
+        try:
+            with self._engine.begin() as conn:
+                self._write_hits(conn, pending)
+                conn.execute(table.delete().where(table.c.key == key))
+                conn.execute(table.insert().values(
+                    key=key,
+                    result=result_json,
+                    hits=0,
+                    created_at=now,
+                    last_used_at=now,
+                ))
+
+                total = conn.execute(db.select(db.func.count()).select_from(table)).scalar()
+                overflow = total - self.max_entries
+                if overflow > 0:
+                    oldest = (
+                        db.select(table.c.key)
+                        .order_by(table.c.last_used_at.asc())
+                        .limit(overflow)
+                    )
+                    conn.execute(table.delete().where(table.c.key.in_(oldest)))
+                    logger.info(f"Evicted {overflow} entries from the Gemini cache.")
+        except Exception as e:
+            # A failed write only costs a future cache miss
+            logger.error(f"Gemini cache write failed: {e}")
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 3) if lookups else 0.0,
+                "max_entries": self.max_entries,
+                "memory_entries": len(self._memory),
+                "pending_hit_updates": len(self._pending_hits),
+                "prompt_version": PROMPT_TEMPLATE_VERSION,
+            }
+
+
+# Shared instance used by the ingestion pipeline
+gemini_cache = GeminiResultCache()
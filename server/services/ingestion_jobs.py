@@ -0,0 +1,170 @@
+# services/ingestion_jobs.py
+
+import os
+import uuid
+import logging
+from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor
+
+from database import db
+from models import IngestionJob
+
+logger = logging.getLogger(__name__)
+
+# Number of background workers running Gemini / fallback parsing
+INGESTION_WORKERS = int(os.getenv("INGESTION_WORKERS", 2))
+# Jobs picked up this many times (e.g. across crashes) are not resumed again
+INGESTION_MAX_ATTEMPTS = int(os.getenv("INGESTION_MAX_ATTEMPTS", 3))
+
+FINISHED_STATUSES = ("succeeded", "failed")
+
+executor = ThreadPoolExecutor(max_workers=INGESTION_WORKERS, thread_name_prefix="ingestion")
+
+
+def serialize_job(job: IngestionJob) -> dict:
+    return {
+        "id": job.id,
+        "status": job.status,
+        "stage": job.stage,
+        "schedule_date": job.schedule_date.strftime("%Y-%m-%d") if job.schedule_date else None,
+        "error": job.error,
+        "attempts": job.attempts,
+        "edit": job.edit,
+        "created_at": job.created_at.strftime("%Y-%m-%dT%H:%M:%SZ"),
+        "updated_at": job.updated_at.strftime("%Y-%m-%dT%H:%M:%SZ"),
+    }
+
+
+def enqueue_ingestion(app, raw_text: str, update: bool = False) -> IngestionJob:
+    """
+    Persists a new job for `raw_text` and hands it to the worker pool.
+
+    Args:
+        app (Flask): The application the worker should run in.
+        raw_text (str): The raw schedule message.
+        update (bool): Apply the message as an edit of the stored day.
+
+    Returns:
+        IngestionJob: The queued job.
+    """
+    job = _create_job(raw_text, update)
+    executor.submit(run_ingestion_job, app, job.id)
+    return job
+
+
+def _create_job(raw_text: str, update: bool) -> IngestionJob:
+    job = IngestionJob(id=uuid.uuid4().hex, status="queued", stage="queued", raw_text=raw_text, edit=update)
+    db.session.add(job)
+    db.session.commit()
+    logger.info(f"Queued ingestion job {job.id} (length={len(raw_text)}).")
+    return job
+
+
+def ingest_raw_text(app, raw_text: str, update: bool = False) -> dict:
+    """
+    Runs the whole pipeline for `raw_text` on the calling thread, for
+    in-process producers such as the Telegram listener. The job is still
+    recorded, so an interrupted run is resumed like a queued one.
+
+    Args:
+        app (Flask): The application to run in.
+        raw_text (str): The raw schedule message.
+        update (bool): Apply the message as an edit of the stored day.
+
+    Returns:
+        dict: The finished job, as returned by /api/schedule/jobs/<id>.
+    """
+    with app.app_context():
+        try:
+            job_id = _create_job(raw_text, update).id
+        finally:
+            db.session.remove()
+
+    run_ingestion_job(app, job_id)
+
+    with app.app_context():
+        try:
+            return serialize_job(db.session.get(IngestionJob, job_id))
+        finally:
+            db.session.remove()
+
+
+def _finish_job(job_id, status, stage, error=None):
+    db.session.rollback()
+    job = db.session.get(IngestionJob, job_id)
+    job.status = status
+    job.stage = stage
+    job.error = error
+    db.session.commit()
+
+
+def run_ingestion_job(app, job_id: str):
+    """
+    Worker entry point: parses the job's text, stores the schedule and
+    records the outcome. store_processed_data emits 'new_schedule' on success;
+    for edit jobs, update_processed_data applies only the differing rows and
+    emits 'schedule_updated'. The edit flag is read from the job, so a
+    resumed edit is still applied as one.
+    """
+    # Imported here because routes.schedule imports this module
+    from routes.schedule import process_raw_text, store_processed_data, update_processed_data
+
+    with app.app_context():
+        try:
+            job = db.session.get(IngestionJob, job_id)
+            if job is None or job.status in FINISHED_STATUSES:
+                return
+
+            job.status = "running"
+            job.stage = "parsing"
+            job.attempts += 1
+            db.session.commit()
+            logger.info(f"Ingestion job {job_id} started (attempt {job.attempts}).")
+
+            try:
+                processed_data = process_raw_text(job.raw_text)
+
+                job.schedule_date = datetime.strptime(processed_data["schedule_date"], "%Y-%m-%d").date()
+                job.stage = "storing"
+                db.session.commit()
+
+                if job.edit:
+                    changed = update_processed_data(processed_data) is not None
+                else:
+                    changed = store_processed_data(processed_data)
+            except ValueError as ve:
+                logger.error(f"Ingestion job {job_id} failed: {ve}")
+                _finish_job(job_id, "failed", "failed", str(ve))
+                return
+            except Exception as e:
+                logger.error(f"Ingestion job {job_id} crashed: {e}", exc_info=True)
+                _finish_job(job_id, "failed", "failed", "Failed to process and store the schedule.")
+                return
+
+            _finish_job(job_id, "succeeded", "done" if changed else "unchanged")
+            logger.info(f"Ingestion job {job_id} succeeded for {processed_data['schedule_date']}.")
+        except Exception as e:
+            logger.error(f"Could not update ingestion job {job_id}: {e}", exc_info=True)
+        finally:
+            db.session.remove()
+
+
+def resume_pending_jobs(app):
+    """Re-queues jobs that were queued or running when the process last stopped."""
+    with app.app_context():
+        pending = IngestionJob.query.filter(IngestionJob.status.in_(("queued", "running"))).all()
+        for job in pending:
+            if job.attempts >= INGESTION_MAX_ATTEMPTS:
+                job.status = "failed"
+                job.stage = "failed"
+                job.error = f"Gave up after {job.attempts} attempts."
+                continue
+            job.status = "queued"
+            job.stage = "queued"
+        db.session.commit()
+
+        resumed = [job.id for job in pending if job.status == "queued"]
+        for job_id in resumed:
+            executor.submit(run_ingestion_job, app, job_id)
+        if resumed:
+            logger.info(f"Resumed {len(resumed)} pending ingestion jobs.")
@@ -0,0 +1,224 @@
+# services/now_playing.py
+
+import re
+import logging
+from bisect import bisect_right
+from datetime import datetime, timedelta, time as dt_time, timezone
+from threading import Lock
+from zoneinfo import ZoneInfo
+
+logger = logging.getLogger(__name__)
+
+# Stored schedule times are Cairo local times
+CAIRO_TIMEZONE = ZoneInfo("Africa/Cairo")
+
+# Used only for the last entry of the last known day when it has no duration
+DEFAULT_DURATION_MINUTES = 30
+
+duration_pattern = re.compile(r'(\d+(?:\.\d+)?)')
+
+
+def parse_duration_minutes(duration: str):
+    """
+    Extracts the number of minutes from a duration like "28 ق" or "28".
+    Returns None if there is no number.
+    """
+    match = duration_pattern.search(duration or "")
+    if not match:
+        return None
+    return float(match.group(1))
+
+
+class DayIndex:
+    """
+    Immutable, start-sorted view of one day's schedule.
+
+    `starts` holds UTC epoch seconds so lookups are a plain bisect;
+    `entries` holds the matching pre-rendered entry dicts.
+    """
+
+    __slots__ = ("schedule_date", "starts", "ends", "entries")
+
+    def __init__(self, schedule_date, starts, ends, entries):
+        self.schedule_date = schedule_date
+        self.starts = starts
+        self.ends = ends
+        self.entries = entries
+
+
+class ScheduleIntervalIndex:
+    """
+    In-memory per-day interval index used by /now and /next.
+
+    Days are loaded once from the database and replaced one at a time when
+    a schedule is stored, so the polling endpoints never hit SQLite.
+    """
+
+    def __init__(self):
+        self._lock = Lock()
+        self._rows = {}  # schedule_date -> [(start_epoch, duration_minutes, entry)]
+        # (sorted schedule dates, {schedule_date: DayIndex}); replaced as a whole
+        # on every write so readers never need the lock
+        self._snapshot = ([], {})
+        self.loaded = False
+
+    # ------------------------ Building ------------------------
+
+    @staticmethod
+    def _prepare_rows(schedule_date, rows):
+        prepared = []
+        for row in rows:
+            if row.start_minute is None:
+                continue
+            start_time = dt_time(row.start_minute // 60, row.start_minute % 60)
+            start = datetime.combine(schedule_date, start_time, tzinfo=CAIRO_TIMEZONE)
+            prepared.append((
+                start.timestamp(),
+                parse_duration_minutes(row.duration),
+                {
+                    "id": row.id,
+                    "reciter": row.reciter,
+                    "surah": row.surah,
+                    "duration": row.duration if row.duration else "",
+                },
+            ))
+        prepared.sort(key=lambda item: (item[0], item[2]["id"]))
+        return prepared
+
+    def _rebuild_day(self, days, schedule_date):
+        """Recomputes end instants for one day; the next day's first start bounds its last entry."""
+        rows = self._rows.get(schedule_date)
+        if not rows:
+            days.pop(schedule_date, None)
+            return
+
+        following = self._rows.get(schedule_date + timedelta(days=1))
+        next_day_start = following[0][0] if following else None
+
+        starts, ends, entries = [], [], []
+        for idx, (start, duration, entry) in enumerate(rows):
+            if duration is not None:
+                end = start + duration * 60
+            elif idx + 1 < len(rows):
+                end = rows[idx + 1][0]
+            elif next_day_start is not None:
+                end = next_day_start
+            else:
+                end = start + DEFAULT_DURATION_MINUTES * 60
+            starts.append(start)
+            ends.append(end)
+            entries.append(entry)
+
+        days[schedule_date] = DayIndex(schedule_date, tuple(starts), tuple(ends), tuple(entries))
+
+    def load(self, rows_by_date: dict):
+        """Replaces the whole index with {schedule_date: [rows]}."""
+        with self._lock:
+            self._rows = {
+                schedule_date: self._prepare_rows(schedule_date, rows)
+                for schedule_date, rows in rows_by_date.items()
+            }
+            days = {}
+            for schedule_date in self._rows:
+                self._rebuild_day(days, schedule_date)
+            self._snapshot = (sorted(days), days)
+            self.loaded = True
+        logger.info(f"Schedule interval index loaded with {len(days)} days")
+
+    def set_day(self, schedule_date, rows):
+        """Replaces a single day, touching only it and the day before it."""
+        with self._lock:
+            self._rows[schedule_date] = self._prepare_rows(schedule_date, rows)
+            days = dict(self._snapshot[1])
+            self._rebuild_day(days, schedule_date)
+            self._rebuild_day(days, schedule_date - timedelta(days=1))
+            self._snapshot = (sorted(days), days)
+        logger.info(f"Schedule interval index updated for {schedule_date}")
+
+    def drop_before(self, cutoff_date):
+        with self._lock:
+            for schedule_date in [d for d in self._rows if d < cutoff_date]:
+                del self._rows[schedule_date]
+            days = {d: day for d, day in self._snapshot[1].items() if d >= cutoff_date}
+            self._snapshot = (sorted(days), days)
+
+    # ------------------------ Lookups ------------------------
+
+    def _position(self, at_epoch):
+        """
+        Returns (dates, days, day_pos, entry_pos) of the last entry starting at
+        or before `at_epoch`, or entry_pos == -1 if nothing has started yet.
+        """
+        dates, days = self._snapshot
+        at_date = datetime.fromtimestamp(at_epoch, CAIRO_TIMEZONE).date()
+        day_pos = bisect_right(dates, at_date) - 1
+        while day_pos >= 0:
+            day = days[dates[day_pos]]
+            entry_pos = bisect_right(day.starts, at_epoch) - 1
+            if entry_pos >= 0:
+                return dates, days, day_pos, entry_pos
+            day_pos -= 1
+        return dates, days, -1, -1
+
+    @staticmethod
+    def _iter_from(dates, days, day_pos, entry_pos):
+        while day_pos < len(dates):
+            day = days[dates[day_pos]]
+            while entry_pos < len(day.starts):
+                yield day, entry_pos
+                entry_pos += 1
+            day_pos += 1
+            entry_pos = 0
+
+    def now(self, at: datetime):
+        """
+        Returns (current, upcoming) as (DayIndex, position) pairs or None.
+        `current` is the entry whose [start, end) interval contains `at`.
+        """
+        at_epoch = at.timestamp()
+        dates, days, day_pos, entry_pos = self._position(at_epoch)
+
+        current = None
+        if entry_pos >= 0:
+            day = days[dates[day_pos]]
+            if at_epoch < day.ends[entry_pos]:
+                current = (day, entry_pos)
+            following = self._iter_from(dates, days, day_pos, entry_pos + 1)
+        else:
+            following = self._iter_from(dates, days, 0, 0)
+
+        upcoming = next(following, None)
+        return current, upcoming
+
+    def upcoming(self, at: datetime, n: int):
+        """Returns up to `n` (DayIndex, position) pairs starting after `at`."""
+        dates, days, day_pos, entry_pos = self._position(at.timestamp())
+        if entry_pos >= 0:
+            following = self._iter_from(dates, days, day_pos, entry_pos + 1)
+        else:
+            following = self._iter_from(dates, days, 0, 0)
+
+        result = []
+        for item in following:
+            if len(result) >= n:
+                break
+            result.append(item)
+        return result
+
+
+def serialize_indexed_entry(day, position, user_timezone) -> dict:
+    """Renders an index entry for the API in the user's timezone."""
+    start = datetime.fromtimestamp(day.starts[position], timezone.utc)
+    end = datetime.fromtimestamp(day.ends[position], timezone.utc)
+    user_start = start.astimezone(user_timezone)
+    return {
+        **day.entries[position],
+        "schedule_date": user_start.strftime("%Y-%m-%d"),
+        "time": user_start.strftime("%I:%M %p"),
+        "start": start.isoformat(),
+        "end": end.isoformat(),
+    }
+
+
+# Shared instance used by the schedule routes
+schedule_index = ScheduleIntervalIndex()
@@ -0,0 +1,167 @@
+# services/playlist_fts.py
+
+import re
+import logging
+from itertools import islice
+
+from sqlalchemy import text, inspect
+
+from services.reciter_search import normalize_arabic, highlight_matches
+
+logger = logging.getLogger(__name__)
+
+# -----------------------------------------------------------------------------
+# FTS5 full-text index over sheikh_playlist
+# -----------------------------------------------------------------------------
+# Lives next to sheikh_playlist in sheikh_playlist.db and is rebuilt by
+# convert_excel_to_db/script.py. SQLite's tokenizers know nothing about
+# hamza or taa marbuta variants, so names are indexed pre-normalized with
+# normalize_arabic (reciter_normalized) and queries go through the same
+# function. rowid is the playlist id. FTS5 matches whole tokens (or their
+# prefixes), so each name is indexed twice:
+#   * reciter_normalized - compound names joined ("عبد الباسط" and
+#     "عبدالباسط" are both written), the form queries are turned into;
+#   * reciter_words - the separate words, joined compounds split again,
+#     plus each word without its "ال" article, so "الباسط", "باسط" (for
+#     "عبدالباسط") and "رزيق" (for "الرزيقي") match too.
+
+FTS_TABLE = "sheikh_playlist_fts"
+
+# Most rows one FTS request may return
+FTS_MAX_LIMIT = 100
+
+# Rows per INSERT while building
+FTS_BATCH_SIZE = 1000
+
+# First halves of compound names, joined to the following word (normalized)
+compound_name_pattern = re.compile(r'\b(عبد|ابو) (?=\w)')
+
+# Joined compounds, indexed split as well (normalized)
+joined_compound_pattern = re.compile(r'^(عبد|ابو)(ال\w{2,})$')
+
+# Definite article, also indexed stripped when at least this many letters follow
+ARTICLE = "ال"
+ARTICLE_MIN_STEM = 2
+
+
+def fts_text(name: str) -> str:
+    """Normalized, compound-joined form of `name` as stored and queried."""
+    return compound_name_pattern.sub(r'\1', normalize_arabic(name))
+
+
+def fts_words(name: str) -> str:
+    """
+    Normalized words of `name`, followed by the halves of joined compounds
+    and by the words starting with "ال" without it.
+    """
+    words = normalize_arabic(name).split()
+    for word in list(words):
+        compound = joined_compound_pattern.match(word)
+        if compound:
+            words.extend(compound.groups())
+    stems = [
+        word[len(ARTICLE):] for word in words
+        if word.startswith(ARTICLE) and len(word) - len(ARTICLE) >= ARTICLE_MIN_STEM
+    ]
+    return " ".join(words + stems)
+
+
+def build_fts_table(connection, playlists):
+    """
+    Drops and recreates FTS_TABLE from `playlists`.
+
+    Args:
+        connection: SQLAlchemy connection inside a transaction.
+        playlists (iterable): Mappings with "id", "reciter" and "link".
+
+    Returns:
+        int: Number of indexed rows.
+    """
+    connection.execute(text(f"DROP TABLE IF EXISTS {FTS_TABLE}"))
+    connection.execute(text(
+        f"CREATE VIRTUAL TABLE {FTS_TABLE} USING fts5("
+        "reciter UNINDEXED, link UNINDEXED, reciter_normalized, reciter_words, tokenize = 'unicode61')"
+    ))
+    insert = text(
+        f"INSERT INTO {FTS_TABLE} (rowid, reciter, link, reciter_normalized, reciter_words) "
+        "VALUES (:id, :reciter, :link, :reciter_normalized, :reciter_words)"
+    )
+    playlists = iter(playlists)
+    indexed = 0
+    while True:
+        # Batched, so an import streaming the catalog never holds all of it
+        rows = [
+            {
+                "id": int(playlist["id"]),
+                "reciter": playlist["reciter"],
+                "link": playlist["link"],
+                "reciter_normalized": fts_text(playlist["reciter"]),
+                "reciter_words": fts_words(playlist["reciter"]),
+            }
+            for playlist in islice(playlists, FTS_BATCH_SIZE)
+        ]
+        if not rows:
+            break
+        connection.execute(insert, rows)
+        indexed += len(rows)
+    # Merge the b-tree segments written by the inserts into one
+    connection.execute(text(f"INSERT INTO {FTS_TABLE} ({FTS_TABLE}) VALUES ('optimize')"))
+    return indexed
+
+
+def fts_table_exists(connection) -> bool:
+    return inspect(connection).has_table(FTS_TABLE)
+
+
+def fts_match_expression(query: str) -> str:
+    """
+    Turns a user query into an FTS5 MATCH expression: every fts_text word
+    as a quoted prefix term, all required ("احمد نع" -> '"احمد"* "نع"*').
+    Each term may match either indexed column. Returns "" when nothing
+    searchable is left.
+    """
+    terms = fts_text(query).split()
+    return " ".join('"' + term.replace('"', '""') + '"*' for term in terms)
+
+
+def search_fts(connection, query: str, limit: int = None, offset: int = 0) -> list:
+    """
+    Searches FTS_TABLE, best bm25 score first.
+
+    Args:
+        connection: SQLAlchemy connection to the static database.
+        query (str): Reciter name or part of it.
+        limit (int | None): Page size, capped at FTS_MAX_LIMIT; None for
+            every match.
+        offset (int): Rows to skip.
+
+    Returns:
+        list: {"id", "reciter", "link", "highlight"} dicts, where "highlight"
+        is the HTML-escaped name with matched words wrapped in <mark>.
+    """
+    expression = fts_match_expression(query)
+    if not expression:
+        return []
+
+    rows = connection.execute(
+        text(
+            f"SELECT rowid, reciter, link FROM {FTS_TABLE} "
+            f"WHERE {FTS_TABLE} MATCH :expression "
+            f"ORDER BY bm25({FTS_TABLE}) LIMIT :limit OFFSET :offset"
+        ),
+        {
+            "expression": expression,
+            # SQLite reads a negative LIMIT as no limit
+            "limit": -1 if limit is None else max(1, min(limit, FTS_MAX_LIMIT)),
+            "offset": max(0, offset),
+        },
+    ).all()
+    return [
+        {
+            "id": row.rowid,
+            "reciter": row.reciter,
+            "link": row.link,
+            "highlight": highlight_matches(row.reciter, query),
+        }
+        for row in rows
+    ]
@@ -0,0 +1,114 @@
+# services/playlist_snapshot.py
+
+import os
+import gzip
+import json
+import hashlib
+import logging
+from datetime import datetime, timezone
+from threading import Lock
+from flask import request, make_response
+
+try:
+    import brotli
+except ImportError:  # Optional; clients then get gzip
+    brotli = None
+
+logger = logging.getLogger(__name__)
+
+# -----------------------------------------------------------------------------
+# Pre-rendered full catalog
+# -----------------------------------------------------------------------------
+# The static bind only changes when convert_excel_to_db/script.py swaps in a
+# new sheikh_playlist.db, so the unfiltered playlist list is serialized and
+# compressed once per catalog and served as stored bytes. The version is a
+# hash of the JSON body: the same catalog always gets the same URL and ETag,
+# across restarts and workers.
+
+# Lifetime of /api/playlists/catalog/<version> responses (one year)
+PLAYLIST_CATALOG_MAX_AGE = int(os.getenv("PLAYLIST_CATALOG_MAX_AGE", 31536000))
+
+# Preferred first when the client accepts several
+ENCODINGS = ("br", "gzip", "identity") if brotli else ("gzip", "identity")
+
+
+def database_signature(path: str):
+    """Identifies one version of a database file; changes when an import replaces it."""
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    return stat.st_ino, stat.st_mtime_ns, stat.st_size
+
+
+class PlaylistSnapshot:
+    """
+    Holds the full catalog as raw JSON bytes plus gzip and brotli variants,
+    replaced atomically on rebuild.
+    """
+
+    def __init__(self):
+        self._lock = Lock()
+        # (version, {encoding: bytes}, last_modified)
+        self._snapshot = (None, {}, None)
+        self.signature = None
+
+    @property
+    def version(self):
+        return self._snapshot[0]
+
+    def build(self, playlists, signature=None):
+        """
+        Args:
+            playlists (list): {"id", "reciter", "link"} dicts, served as is.
+            signature: database_signature() of the file they were read from.
+        """
+        body = json.dumps(playlists, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+        bodies = {"identity": body, "gzip": gzip.compress(body, compresslevel=9, mtime=0)}
+        if brotli:
+            bodies["br"] = brotli.compress(body, quality=11)
+        version = hashlib.sha256(body).hexdigest()[:16]
+        last_modified = datetime.now(timezone.utc).replace(microsecond=0)
+
+        with self._lock:
+            self._snapshot = (version, bodies, last_modified)
+            self.signature = signature
+        sizes = ", ".join(f"{encoding} {len(data)} B" for encoding, data in bodies.items())
+        logger.info(f"Playlist catalog snapshot {version} built: {len(playlists)} playlists ({sizes})")
+        return version
+
+    def response(self, immutable: bool = False):
+        """
+        Serves the snapshot in the best encoding the client accepts.
+
+        Args:
+            immutable (bool): True for the versioned URL, which can be cached
+                for PLAYLIST_CATALOG_MAX_AGE without revalidation.
+        """
+        version, bodies, last_modified = self._snapshot
+        encoding = request.accept_encodings.best_match(
+            [encoding for encoding in ENCODINGS if encoding in bodies], default="identity"
+        )
+        # Strong ETags name one exact byte sequence, so each encoding has its own
+        etag = version if encoding == "identity" else f"{version}-{encoding}"
+
+        if request.if_none_match.contains(etag):
+            response = make_response("", 304)
+        else:
+            response = make_response(bodies[encoding])
+            response.content_type = "application/json"
+            if encoding != "identity":
+                response.content_encoding = encoding
+
+        response.set_etag(etag)
+        response.last_modified = last_modified
+        response.vary.add("Accept-Encoding")
+        if immutable:
+            response.headers["Cache-Control"] = f"public, max-age={PLAYLIST_CATALOG_MAX_AGE}, immutable"
+        else:
+            response.headers["Cache-Control"] = "no-cache"
+        return response
+
+
+# Shared instance used by the routes
+playlist_snapshot = PlaylistSnapshot()
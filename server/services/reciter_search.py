@@ -0,0 +1,435 @@
+# services/reciter_search.py
+
+import re
+import html
+import heapq
+import logging
+from bisect import bisect_left
+from collections import Counter
+from threading import Lock
+
+logger = logging.getLogger(__name__)
+
+# A candidate must share at least this share of the query's trigrams
+MIN_TRIGRAM_COVERAGE = 0.6
+
+# Largest k served by suggest(); answers for 1-2 letter prefixes are precomputed
+SUGGEST_MAX_K = 20
+SUGGEST_PRECOMPUTED_PREFIX = 2
+
+# Honorifics ignored when matching schedule reciters to playlists (normalized)
+TITLE_WORDS = {"الشيخ", "للشيخ", "القاري", "للقاري"}
+
+# Edit distance tolerated by fuzzy lookups; terms shorter than
+# FUZZY_SHORT_TERM letters only tolerate one edit
+FUZZY_MAX_DISTANCE = 2
+FUZZY_SHORT_TERM = 5
+
+# Tashkeel (harakat, tanween, shadda, sukun, superscript alef) and tatweel
+diacritics_pattern = re.compile(r'[\u064B-\u065F\u0670\u0640]')
+non_word_pattern = re.compile(r'[^\w\s]')
+whitespace_pattern = re.compile(r'\s+')
+# Where highlight_matches lets a query word start: a word start or the end of
+# a joined "عبد"/"ابو", optionally followed by the "ال" article
+word_start_pattern = r'(?:(?<!\w)|(?<=عبد)|(?<=ابو))(?:ال)?'
+
+# Orthographic variants folded onto one letter
+ARABIC_FOLDING = str.maketrans({
+    "أ": "ا", "إ": "ا", "آ": "ا", "ٱ": "ا",
+    "ؤ": "و",
+    "ئ": "ي",
+    "ى": "ي",
+    "ة": "ه",
+})
+
+
+def normalize_arabic(text: str) -> str:
+    """
+    Folds spelling variants so "أحمد"/"احمد", "ة"/"ه", "ى"/"ي" and vowelled
+    or unvowelled names compare equal. Punctuation becomes spaces.
+    """
+    text = diacritics_pattern.sub('', text or "")
+    text = text.translate(ARABIC_FOLDING).lower()
+    text = non_word_pattern.sub(' ', text)
+    return whitespace_pattern.sub(' ', text).strip()
+
+
+def highlight_matches(text: str, query: str, start: str = "<mark>", end: str = "</mark>") -> str:
+    """
+    Wraps the parts of the original `text` that match a word prefix of the
+    normalized `query`, so "احمد" highlights "أحمد" with its hamza intact.
+    A prefix after the "ال" article or inside a joined compound counts, as
+    in the FTS index ("باسط" highlights "عبدالباسط").
+
+    Returns:
+        str: HTML; `text` is escaped before the marks are added.
+    """
+    tokens = normalize_arabic(query).split()
+    if not tokens:
+        return html.escape(text)
+
+    # Normalized view of `text`, remembering which original letter each char came from
+    chars, origin = [], []
+    for index, char in enumerate(text):
+        if diacritics_pattern.match(char):
+            continue
+        folded = char.translate(ARABIC_FOLDING).lower()
+        if non_word_pattern.match(folded):
+            folded = " "
+        for folded_char in folded:
+            chars.append(folded_char)
+            origin.append(index)
+    normalized = "".join(chars)
+
+    spans = []
+    for token in tokens:
+        for match in re.finditer(word_start_pattern + re.escape(token), normalized):
+            spans.append((origin[match.start()], origin[match.end() - 1] + 1))
+    if not spans:
+        return html.escape(text)
+
+    spans.sort()
+    merged = [list(spans[0])]
+    for span_start, span_end in spans[1:]:
+        if span_start <= merged[-1][1]:
+            merged[-1][1] = max(merged[-1][1], span_end)
+        else:
+            merged.append([span_start, span_end])
+
+    parts, position = [], 0
+    for span_start, span_end in merged:
+        parts.append(html.escape(text[position:span_start]))
+        parts.append(f"{start}{html.escape(text[span_start:span_end])}{end}")
+        position = span_end
+    parts.append(html.escape(text[position:]))
+    return "".join(parts)
+
+
+def trigrams(normalized: str) -> set:
+    """Trigrams of a normalized string, padded so word starts and ends count."""
+    padded = f" {normalized} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+class ReciterSearchIndex:
+    """
+    In-memory trigram index over `SheikhPlaylist.reciter`.
+
+    The static table only changes when convert_excel_to_db/script.py is run,
+    so the index is built once, on first use, and swapped atomically on rebuild.
+    """
+
+    def __init__(self):
+        self._lock = Lock()
+        # (playlists, normalized names, {trigram: tuple of playlist positions},
+        #  {1-2 letter word prefix: tuple of playlist positions})
+        self._snapshot = ((), (), {}, {})
+        self.loaded = False
+
+    def build(self, playlists):
+        """Indexes `playlists`, a list of {"id", "reciter", "link"} dicts."""
+        playlists = tuple(playlists)
+        names = tuple(normalize_arabic(playlist["reciter"]) for playlist in playlists)
+        postings = {}
+        prefixes = {}
+        for position, name in enumerate(names):
+            for gram in trigrams(name):
+                postings.setdefault(gram, []).append(position)
+            # Queries too short for a trigram look up word prefixes directly
+            for prefix in {word[:length] for word in name.split() for length in (1, 2)}:
+                prefixes.setdefault(prefix, []).append(position)
+
+        with self._lock:
+            self._snapshot = (
+                playlists,
+                names,
+                {gram: tuple(ids) for gram, ids in postings.items()},
+                {prefix: tuple(ids) for prefix, ids in prefixes.items()},
+            )
+            self.loaded = True
+        logger.info(f"Reciter search index built: {len(playlists)} playlists, {len(postings)} trigrams")
+
+    def all(self) -> list:
+        return list(self._snapshot[0])
+
+    def _candidates(self, query, postings):
+        """Returns {position: shared trigram count} and the number of query trigrams."""
+        grams = trigrams(query)
+        counts = Counter()
+        for gram in grams:
+            counts.update(postings.get(gram, ()))
+        return counts, len(grams)
+
+    def search(self, query: str, limit: int = None) -> list:
+        """
+        Ranks playlists for `query`: exact substring matches first (word
+        prefixes before inner matches), then near matches by trigram overlap.
+        """
+        playlists, names, postings, prefixes = self._snapshot
+        query = normalize_arabic(query)
+        if not query:
+            return list(playlists)
+
+        if len(query) < 3:
+            # Names with a word starting with the query
+            ranked = [
+                (0 if names[position].startswith(query) else 1, len(names[position]), position)
+                for position in prefixes.get(query, ())
+            ]
+        else:
+            counts, total = self._candidates(query, postings)
+            ranked = []
+            for position, shared in counts.items():
+                name = names[position]
+                if query in name:
+                    tier = 0 if name.startswith(query) or f" {query}" in name else 1
+                    ranked.append((tier, -shared, len(name), position))
+                elif shared / total >= MIN_TRIGRAM_COVERAGE:
+                    ranked.append((2, -shared, len(name), position))
+
+        ranked.sort()
+        if limit is not None:
+            ranked = ranked[:limit]
+        return [playlists[item[-1]] for item in ranked]
+
+
+def reciter_key(normalized: str) -> str:
+    """Normalized name without honorifics, used to join schedules and playlists."""
+    return " ".join(token for token in normalized.split() if token not in TITLE_WORDS)
+
+
+class ReciterSuggester:
+    """
+    Prefix autocomplete over reciter names, ranked by popularity.
+
+    Every normalized name is stored once per word it contains, as the
+    suffix starting at that word ("الشيخ محمد رفعت" -> "الشيخ محمد رفعت",
+    "محمد رفعت", "رفعت"), in one sorted array. A prefix is a bisect range
+    in that array. Popularity is how often the reciter appears in the
+    stored schedules.
+    """
+
+    def __init__(self):
+        self._lock = Lock()
+        # (playlists, sorted keys, matching playlist positions, sort ranks,
+        #  {short prefix: top positions}, overall top positions)
+        self._snapshot = ((), (), (), (), {}, ())
+        self.version = None
+
+    def build(self, playlists, reciter_counts: dict, version=None):
+        """
+        Args:
+            playlists (list): {"id", "reciter", "link"} dicts.
+            reciter_counts (dict): {schedule reciter string: occurrences}.
+            version: Opaque tag of the data the counts came from.
+        """
+        playlists = tuple(playlists)
+        popularity = Counter()
+        for reciter, count in reciter_counts.items():
+            popularity[reciter_key(normalize_arabic(reciter))] += count
+
+        names = [normalize_arabic(playlist["reciter"]) for playlist in playlists]
+        # Most popular first, then shorter names, then table order
+        ranks = tuple(
+            (-popularity.get(reciter_key(name), 0), len(name), position)
+            for position, name in enumerate(names)
+        )
+
+        entries = sorted(
+            (" ".join(tokens[i:]), position)
+            for position, tokens in enumerate(name.split() for name in names)
+            for i in range(len(tokens))
+        )
+        keys = tuple(key for key, _ in entries)
+        positions = tuple(position for _, position in entries)
+
+        precomputed = {}
+        for key, position in entries:
+            for length in range(1, SUGGEST_PRECOMPUTED_PREFIX + 1):
+                if len(key) >= length:
+                    precomputed.setdefault(key[:length], set()).add(position)
+        precomputed = {
+            prefix: tuple(heapq.nsmallest(SUGGEST_MAX_K, found, key=ranks.__getitem__))
+            for prefix, found in precomputed.items()
+        }
+        overall = tuple(heapq.nsmallest(SUGGEST_MAX_K, range(len(playlists)), key=ranks.__getitem__))
+
+        with self._lock:
+            self._snapshot = (playlists, keys, positions, ranks, precomputed, overall)
+            self.version = version
+        logger.info(f"Reciter suggester built: {len(keys)} keys over {len(playlists)} playlists")
+
+    def suggest(self, prefix: str, k: int) -> list:
+        """Returns up to `k` (at most SUGGEST_MAX_K) playlists whose name or a name word starts with `prefix`."""
+        playlists, keys, positions, ranks, precomputed, overall = self._snapshot
+        k = max(1, min(k, SUGGEST_MAX_K))
+        prefix = normalize_arabic(prefix)
+
+        if not prefix:
+            top = overall[:k]
+        elif len(prefix) <= SUGGEST_PRECOMPUTED_PREFIX:
+            top = precomputed.get(prefix, ())[:k]
+        else:
+            lo = bisect_left(keys, prefix)
+            hi = bisect_left(keys, prefix + "\uffff", lo)
+            top = heapq.nsmallest(k, set(positions[lo:hi]), key=ranks.__getitem__)
+
+        return [
+            {"id": playlists[position]["id"], "reciter": playlists[position]["reciter"]}
+            for position in top
+        ]
+
+
+def _deletes(term: str, max_distance: int) -> set:
+    """`term` and every string obtained by deleting up to `max_distance` letters."""
+    found = {term}
+    frontier = {term}
+    for _ in range(max_distance):
+        frontier = {
+            word[:i] + word[i + 1:]
+            for word in frontier if len(word) > 1
+            for i in range(len(word))
+        }
+        found |= frontier
+    return found
+
+
+def edit_distance(a: str, b: str, limit: int) -> int:
+    """
+    Optimal string alignment distance (insertions, deletions, substitutions,
+    adjacent transpositions). Returns limit + 1 as soon as it must exceed `limit`.
+    """
+    if abs(len(a) - len(b)) > limit:
+        return limit + 1
+    previous2 = None
+    previous = list(range(len(b) + 1))
+    for i in range(1, len(a) + 1):
+        current = [i] + [0] * len(b)
+        for j in range(1, len(b) + 1):
+            cost = 0 if a[i - 1] == b[j - 1] else 1
+            current[j] = min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + cost)
+            if i > 1 and j > 1 and a[i - 1] == b[j - 2] and a[i - 2] == b[j - 1]:
+                current[j] = min(current[j], previous2[j - 2] + 1)
+        if min(current) > limit:
+            return limit + 1
+        previous2, previous = previous, current
+    return previous[-1]
+
+
+class FuzzyReciterIndex:
+    """
+    SymSpell-style deletion dictionary for typo-tolerant reciter lookup.
+
+    Each reciter's full name (without honorifics) and each of its words is
+    indexed under all its deletions up to FUZZY_MAX_DISTANCE letters. A
+    query's own deletions then meet a term's deletions whenever the two are
+    within that distance, so a lookup is a handful of dict probes plus exact
+    distance checks on the few candidates, independent of the table size.
+    """
+
+    def __init__(self, max_distance: int = FUZZY_MAX_DISTANCE):
+        self.max_distance = max_distance
+        self._lock = Lock()
+        # (playlists, {term: positions}, {deletion: terms})
+        self._snapshot = ((), {}, {})
+
+    def _allowed(self, term: str) -> int:
+        return 1 if len(term) < FUZZY_SHORT_TERM else self.max_distance
+
+    def build(self, playlists):
+        playlists = tuple(playlists)
+        terms = {}
+        for position, playlist in enumerate(playlists):
+            key = reciter_key(normalize_arabic(playlist["reciter"]))
+            for term in {key, *key.split()}:
+                if len(term) >= 3:
+                    terms.setdefault(term, set()).add(position)
+
+        deletions = {}
+        for term in terms:
+            for deletion in _deletes(term, self._allowed(term)):
+                deletions.setdefault(deletion, set()).add(term)
+
+        with self._lock:
+            self._snapshot = (playlists, terms, deletions)
+        logger.info(f"Fuzzy reciter index built: {len(terms)} terms, {len(deletions)} deletions")
+
+    def lookup(self, name: str, limit: int = None) -> list:
+        """
+        Returns [(playlist, distance)] for reciters whose name, or one of its
+        words, is within the allowed edit distance of `name`; closest first.
+        """
+        playlists, terms, deletions = self._snapshot
+        query = reciter_key(normalize_arabic(name))
+        if len(query) < 3:
+            return []
+        allowed = self._allowed(query)
+
+        best = {}
+        candidates = set()
+        for deletion in _deletes(query, allowed):
+            candidates |= deletions.get(deletion, set())
+        for term in candidates:
+            distance = edit_distance(query, term, allowed)
+            if distance > min(allowed, self._allowed(term)):
+                continue
+            for position in terms[term]:
+                if distance < best.get(position, allowed + 1):
+                    best[position] = distance
+
+        ranked = sorted(best.items(), key=lambda item: (item[1], len(playlists[item[0]]["reciter"]), item[0]))
+        if limit is not None:
+            ranked = ranked[:limit]
+        return [(playlists[position], distance) for position, distance in ranked]
+
+    def best_match(self, name: str):
+        """The single closest playlist for `name`, or None if nothing is close enough."""
+        matches = self.lookup(name, limit=1)
+        return matches[0][0] if matches else None
+
+
+# Shared instances used by the playlist routes and the ingestion pipeline
+reciter_index = ReciterSearchIndex()
+reciter_suggester = ReciterSuggester()
+fuzzy_reciter_index = FuzzyReciterIndex()
+
+
+def ensure_reciter_index_loaded():
+    """
+    Builds `reciter_index` and `fuzzy_reciter_index` from the static table the
+    first time either is needed. Must run inside an app context.
+    """
+    if reciter_index.loaded:
+        return
+    # Imported here so the index classes stay usable without the app
+    from models import SheikhPlaylist
+
+    playlists = [
+        {
+            "id": playlist.id,
+            "reciter": playlist.reciter,
+            "link": playlist.link
+        }
+        for playlist in SheikhPlaylist.query.all()
+    ]
+    fuzzy_reciter_index.build(playlists)
+    reciter_index.build(playlists)
+
+
+def reset_reciter_indexes():
+    """
+    Marks the indexes stale after an import replaced the static database;
+    they are rebuilt from the new catalog on next use.
+    """
+    reciter_index.loaded = False
+    reciter_suggester.version = None
+
+
+def match_reciter(name: str):
+    """
+    Maps a possibly misspelled reciter name, as Gemini or parse_reciter
+    stored it in the schedule, to the closest playlist, or None. Used to link
+    /now and /next entries to their playlists. Must run inside an app context.
+    """
+    ensure_reciter_index_loaded()
+    return fuzzy_reciter_index.best_match(name)
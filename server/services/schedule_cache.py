@@ -0,0 +1,105 @@
+# services/schedule_cache.py
+
+import os
+import logging
+from collections import OrderedDict
+from threading import Lock
+
+logger = logging.getLogger(__name__)
+
+# Maximum number of rendered pages kept in memory
+SCHEDULE_CACHE_SIZE = int(os.getenv("SCHEDULE_CACHE_SIZE", 256))
+
+
+class ScheduleResponseCache:
+    """
+    Bounded LRU cache of rendered `/api/schedule/all` pages.
+
+    Keys are (requested_date, timezone, page, per_page) tuples, where
+    requested_date is None when the client asked for the latest schedule.
+    Each entry also remembers the schedule date it was actually rendered
+    from, so that storing or deleting a day only drops the pages that depend
+    on it.
+    """
+
+    def __init__(self, maxsize: int = SCHEDULE_CACHE_SIZE):
+        self.maxsize = maxsize
+        self._entries = OrderedDict()
+        self._lock = Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key):
+        """Returns the cached payload for `key`, or None on a miss."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def put(self, key, payload, schedule_date):
+        """
+        Stores a rendered payload.
+
+        Args:
+            key (tuple): (requested_date, timezone offset tables, page, per_page).
+            payload (dict): The JSON-serializable response body.
+            schedule_date (date | None): The date the payload was rendered from.
+        """
+        with self._lock:
+            self._entries[key] = (schedule_date, payload)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def invalidate_date(self, schedule_date):
+        """
+        Drops every page that was, or could now be, rendered from
+        `schedule_date`: a page that fell back to the latest schedule is
+        stale once a newer day is stored.
+        """
+        with self._lock:
+            stale = [
+                key for key, (rendered_date, _) in self._entries.items()
+                if key[0] is None
+                or key[0] == schedule_date
+                or rendered_date == schedule_date
+                or (rendered_date != key[0] and (rendered_date is None or rendered_date < schedule_date))
+            ]
+            for key in stale:
+                del self._entries[key]
+        logger.info(f"Invalidated {len(stale)} cached schedule pages for {schedule_date}")
+
+    def invalidate_before(self, cutoff_date):
+        """Drops every page that depends on a schedule older than `cutoff_date`."""
+        with self._lock:
+            stale = [
+                key for key, (rendered_date, _) in self._entries.items()
+                if key[0] is None
+                or key[0] < cutoff_date
+                or rendered_date is None
+                or rendered_date < cutoff_date
+            ]
+            for key in stale:
+                del self._entries[key]
+        logger.info(f"Invalidated {len(stale)} cached schedule pages older than {cutoff_date}")
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "size": len(self._entries),
+                "maxsize": self.maxsize,
+                "hits": self.hits,
+                "misses": self.misses,
+            }
+
+
+# Shared instance used by the schedule routes
+schedule_cache = ScheduleResponseCache()
@@ -0,0 +1,239 @@
+# services/schedule_store.py
+
+import json
+import hashlib
+import logging
+from difflib import SequenceMatcher
+
+from database import db
+from models import DailySchedule, DailyTableMetadata
+from schedule_parsing.parse_logic import time_to_minutes
+
+logger = logging.getLogger(__name__)
+
+
+def build_schedule_rows(schedule_date, final_schedule: list) -> list:
+    """
+    Converts `final_schedule` items into column dicts for a Core insert.
+
+    Accepts both the Gemini key "القارئ" and the fallback parser key "قارئ"
+    for the reciter.
+    """
+    rows = []
+    for idx, item in enumerate(final_schedule, start=1):
+        time_val = (item.get("الوقت") or "").strip()
+        start_minute = time_to_minutes(time_val)
+        if start_minute is None:
+            logger.warning(f"Entry #{idx} has an unrecognized time '{time_val}'; it will not be listed.")
+
+        rows.append({
+            "time": time_val,
+            "start_minute": start_minute,
+            "reciter": (item.get("القارئ") or item.get("قارئ") or "").strip(),
+            "surah": (item.get("السورة") or "").strip(),
+            "duration": (item.get("المدة") or "").strip(),  # optional
+            "schedule_date": schedule_date,
+        })
+    return rows
+
+
+def schedule_content_hash(rows: list) -> str:
+    """Stable hash of a day's rows, used to recognize unchanged resends."""
+    canonical = [
+        [row["time"], row["reciter"], row["surah"], row["duration"]]
+        for row in rows
+    ]
+    payload = json.dumps(canonical, ensure_ascii=False, separators=(",", ":"))
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def replace_schedule_day(schedule_date, final_schedule: list) -> bool:
+    """
+    Atomically replaces every row of `schedule_date` with `final_schedule`.
+
+    The delete, the executemany insert and the metadata upsert share one
+    transaction. If the stored content hash already matches, nothing is
+    written.
+
+    Returns:
+        bool: True if the day was written, False if it was unchanged.
+    """
+    rows = build_schedule_rows(schedule_date, final_schedule)
+    content_hash = schedule_content_hash(rows)
+
+    metadata = DailyTableMetadata.query.filter_by(schedule_date=schedule_date).first()
+    if metadata and metadata.content_hash == content_hash:
+        logger.info(f"Schedule for {schedule_date} is unchanged; nothing to store.")
+        return False
+
+    try:
+        table = DailySchedule.__table__
+        db.session.execute(table.delete().where(table.c.schedule_date == schedule_date))
+        if rows:
+            db.session.execute(table.insert(), rows)
+
+        if metadata:
+            metadata.content_hash = content_hash
+        else:
+            db.session.add(DailyTableMetadata(schedule_date=schedule_date, content_hash=content_hash))
+
+        db.session.commit()
+    except Exception:
+        db.session.rollback()
+        raise
+
+    action = "Replaced" if metadata else "Stored"
+    logger.info(f"{action} {len(rows)} schedule entries for {schedule_date}.")
+    return True
+
+
+def replace_schedule_days(days: dict) -> list:
+    """
+    Bulk variant of replace_schedule_day for imports: replaces every day in
+    {schedule_date: final_schedule} in a single transaction, skipping days
+    whose content hash is unchanged.
+
+    Returns:
+        list: The schedule dates that were written.
+    """
+    if not days:
+        return []
+
+    prepared = {}
+    for schedule_date, final_schedule in days.items():
+        rows = build_schedule_rows(schedule_date, final_schedule)
+        prepared[schedule_date] = (rows, schedule_content_hash(rows))
+
+    metadata_by_date = {
+        metadata.schedule_date: metadata
+        for metadata in DailyTableMetadata.query.filter(DailyTableMetadata.schedule_date.in_(list(prepared)))
+    }
+    changed = [
+        schedule_date for schedule_date, (_, content_hash) in prepared.items()
+        if schedule_date not in metadata_by_date
+        or metadata_by_date[schedule_date].content_hash != content_hash
+    ]
+    if not changed:
+        return []
+
+    try:
+        table = DailySchedule.__table__
+        db.session.execute(table.delete().where(table.c.schedule_date.in_(changed)))
+        rows = [row for schedule_date in changed for row in prepared[schedule_date][0]]
+        if rows:
+            db.session.execute(table.insert(), rows)
+
+        for schedule_date in changed:
+            content_hash = prepared[schedule_date][1]
+            metadata = metadata_by_date.get(schedule_date)
+            if metadata:
+                metadata.content_hash = content_hash
+            else:
+                db.session.add(DailyTableMetadata(schedule_date=schedule_date, content_hash=content_hash))
+
+        db.session.commit()
+    except Exception:
+        db.session.rollback()
+        raise
+
+    logger.info(f"Stored {len(rows)} schedule entries across {len(changed)} days.")
+    return changed
+
+
+# Columns compared when diffing a day against an edited message
+DIFF_FIELDS = ("time", "start_minute", "reciter", "surah", "duration")
+
+
+def _diff_key(row) -> tuple:
+    if isinstance(row, dict):
+        return tuple(row[field] for field in DIFF_FIELDS)
+    return tuple(getattr(row, field) for field in DIFF_FIELDS)
+
+
+def _listing_order(row: dict) -> tuple:
+    # (start_minute, id) as SQLite orders it, NULLs first; rows get ids in list order
+    return (row["start_minute"] is not None, row["start_minute"] or 0)
+
+
+def apply_schedule_diff(schedule_date, final_schedule: list):
+    """
+    Updates `schedule_date` to match `final_schedule` by touching only the
+    rows that differ, in one transaction. Stored rows and new entries are
+    aligned in listing order, (start_minute, id); aligned pairs that differ
+    are updated in place, so row ids stay stable across edits.
+
+    Rows without a start_minute are not listed by /all, so the diff is
+    reported as the listing sees it: a row that gains a time is added, one
+    that loses it is removed, and unlisted rows are left out.
+
+    Returns:
+        dict | None: {"added": [DailySchedule], "changed": [DailySchedule],
+        "removed": [ids]}, or None if the day is unchanged.
+    """
+    rows = build_schedule_rows(schedule_date, final_schedule)
+    content_hash = schedule_content_hash(rows)
+    rows.sort(key=_listing_order)
+
+    metadata = DailyTableMetadata.query.filter_by(schedule_date=schedule_date).first()
+    if metadata and metadata.content_hash == content_hash:
+        logger.info(f"Schedule for {schedule_date} is unchanged; nothing to update.")
+        return None
+
+    existing = (
+        DailySchedule.query
+        .filter_by(schedule_date=schedule_date)
+        .order_by(DailySchedule.start_minute, DailySchedule.id)
+        .all()
+    )
+    matcher = SequenceMatcher(
+        a=[_diff_key(entry) for entry in existing],
+        b=[_diff_key(row) for row in rows],
+        autojunk=False,
+    )
+
+    added, changed, removed = [], [], []
+    try:
+        for tag, a_start, a_end, b_start, b_end in matcher.get_opcodes():
+            if tag == "equal":
+                continue
+            old_entries = existing[a_start:a_end]
+            new_rows = rows[b_start:b_end]
+            paired = min(len(old_entries), len(new_rows))
+
+            for entry, row in zip(old_entries[:paired], new_rows[:paired]):
+                was_listed = entry.start_minute is not None
+                for field in DIFF_FIELDS:
+                    setattr(entry, field, row[field])
+                if entry.start_minute is None:
+                    if was_listed:
+                        removed.append(entry.id)
+                elif was_listed:
+                    changed.append(entry)
+                else:
+                    added.append(entry)
+            for entry in old_entries[paired:]:
+                if entry.start_minute is not None:
+                    removed.append(entry.id)
+                db.session.delete(entry)
+            for row in new_rows[paired:]:
+                entry = DailySchedule(**row)
+                db.session.add(entry)
+                if entry.start_minute is not None:
+                    added.append(entry)
+
+        if metadata:
+            metadata.content_hash = content_hash
+        else:
+            db.session.add(DailyTableMetadata(schedule_date=schedule_date, content_hash=content_hash))
+
+        # Assigns ids to the added rows before they are serialized
+        db.session.commit()
+    except Exception:
+        db.session.rollback()
+        raise
+
+    logger.info(
+        f"Updated schedule for {schedule_date}: {len(added)} added, "
+        f"{len(changed)} changed, {len(removed)} removed."
+    )
+    return {"added": added, "changed": changed, "removed": removed}
@@ -0,0 +1,89 @@
+# services/schedule_version.py
+
+import time
+import hashlib
+import logging
+from datetime import datetime, timezone
+from threading import Lock
+from flask import request
+
+logger = logging.getLogger(__name__)
+
+
+class ScheduleVersion:
+    """
+    Monotonically increasing version of the stored schedules.
+
+    Bumped whenever schedules are stored or cleared. ETags combine the
+    version with the process start time, so a restart (which resets the
+    counter) can never re-issue an ETag for different content.
+    """
+
+    def __init__(self):
+        self._lock = Lock()
+        self._boot_id = int(time.time())
+        self._version = 0
+        self._last_modified = self._now()
+
+    @staticmethod
+    def _now() -> datetime:
+        # HTTP dates have one-second resolution
+        return datetime.now(timezone.utc).replace(microsecond=0)
+
+    def bump(self) -> int:
+        with self._lock:
+            self._version += 1
+            self._last_modified = self._now()
+            logger.info(f"Schedule version bumped to {self._version}")
+            return self._version
+
+    def snapshot(self):
+        """Returns (version, last_modified) read atomically."""
+        with self._lock:
+            return self._version, self._last_modified
+
+    def etag_for(self, version: int, variant: str = "") -> str:
+        """
+        Builds a strong ETag for one representation of a resource.
+
+        Args:
+            version (int): The schedule version the body was rendered from.
+            variant (str): Everything else the body depends on (query string, timezone).
+        """
+        variant_hash = hashlib.sha1(variant.encode("utf-8")).hexdigest()[:12]
+        return f"{self._boot_id}-{version}-{variant_hash}"
+
+
+# Shared instance used by the routes
+schedule_version = ScheduleVersion()
+
+
+def conditional_validators(variant: str = ""):
+    """
+    Computes the validators for the current request before any rendering.
+
+    Returns:
+        tuple: (etag, last_modified, not_modified) where not_modified is True
+        if the client's If-None-Match / If-Modified-Since already match.
+    """
+    version, last_modified = schedule_version.snapshot()
+    etag = schedule_version.etag_for(version, variant)
+
+    if request.if_none_match:
+        not_modified = request.if_none_match.contains(etag)
+    elif request.if_modified_since:
+        not_modified = last_modified <= request.if_modified_since
+    else:
+        not_modified = False
+    return etag, last_modified, not_modified
+
+
+def apply_validators(response, etag, last_modified, vary=None):
+    """Attaches the ETag / Last-Modified headers to a response and returns it."""
+    response.set_etag(etag)
+    response.last_modified = last_modified
+    # Let clients keep the body but revalidate it on every use
+    response.headers["Cache-Control"] = "no-cache"
+    if vary:
+        response.vary.add(vary)
+    return response
@@ -0,0 +1,40 @@
+# services/telegram_checkpoints.py
+
+import logging
+
+from database import db
+from models import TelegramCheckpoint
+
+logger = logging.getLogger(__name__)
+
+
+def get_checkpoint(app, channel: str):
+    """Returns the last processed message id for `channel`, or None if it was never recorded."""
+    with app.app_context():
+        try:
+            checkpoint = db.session.get(TelegramCheckpoint, channel)
+            return checkpoint.last_message_id if checkpoint else None
+        finally:
+            db.session.remove()
+
+
+def advance_checkpoint(app, channel: str, message_id: int):
+    """
+    Records `message_id` as processed for `channel`. The checkpoint only
+    moves forward, so live events and catch-up can advance it in any order.
+    """
+    with app.app_context():
+        try:
+            checkpoint = db.session.get(TelegramCheckpoint, channel)
+            if checkpoint is None:
+                db.session.add(TelegramCheckpoint(channel=channel, last_message_id=message_id))
+            elif message_id > checkpoint.last_message_id:
+                checkpoint.last_message_id = message_id
+            else:
+                return
+            db.session.commit()
+        except Exception as e:
+            db.session.rollback()
+            logger.error(f"Could not advance Telegram checkpoint for {channel}: {e}")
+        finally:
+            db.session.remove()
@@ -0,0 +1,219 @@
+# services/timezones.py
+
+import os
+import calendar
+import logging
+from bisect import bisect_right
+from collections import OrderedDict
+from datetime import datetime, timedelta, timezone
+from threading import Lock
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError, available_timezones
+
+logger = logging.getLogger(__name__)
+
+# Used when the cookie is missing or names an unknown zone
+DEFAULT_TIMEZONE = "Africa/Cairo"
+# Stored schedule times are wall-clock times in this zone
+SCHEDULE_TIMEZONE = "Africa/Cairo"
+
+# (zone, schedule day) offset tables kept in memory
+TIMEZONE_TABLE_CACHE_SIZE = int(os.getenv("TIMEZONE_TABLE_CACHE_SIZE", 1024))
+
+MINUTES_PER_DAY = 24 * 60
+UTC_EPOCH = datetime(1970, 1, 1)
+
+
+def find_transitions(offset_at, start: int, end: int, step: int) -> list:
+    """
+    Tabulates a piecewise-constant offset function over [start, end].
+
+    offset_at is sampled every `step` units and each change is located
+    exactly by bisection. No zone changes offset twice within an hour, so
+    an hour's worth of `step` never misses a transition.
+
+    Returns:
+        list: [(x, offset)] sorted by x, starting at `start`; offset holds
+        from x until the next entry.
+    """
+    previous = offset_at(start)
+    table = [(start, previous)]
+    low = start
+    while low < end:
+        high = min(low + step, end)
+        current = offset_at(high)
+        if current != previous:
+            # offset_at(low) == previous, offset_at(high) == current
+            left, right = low, high
+            while right - left > 1:
+                middle = (left + right) // 2
+                if offset_at(middle) == previous:
+                    left = middle
+                else:
+                    right = middle
+            table.append((right, current))
+            previous = current
+        low = high
+    return table
+
+
+class DayConverter:
+    """
+    Converts the schedule zone's wall-clock minutes of one day into a user's
+    local time with two bisects over precomputed offset tables, instead of
+    two zoneinfo conversions per entry.
+
+    `signature` is the user's UTC-offset table over that day: zones with
+    equal signatures render the day identically. Users in the schedule's
+    own zone see the published wall-clock times unchanged, as astimezone()
+    does, even inside a DST gap.
+    """
+
+    __slots__ = ("schedule_date", "signature", "same_zone", "_day_start", "_minutes", "_source_offsets",
+                 "_instants", "_user_offsets", "_displayed")
+
+    def __init__(self, schedule_date, source_table, user_table, same_zone=False):
+        self.schedule_date = schedule_date
+        self.same_zone = same_zone
+        self.signature = ("same_zone",) if same_zone else tuple(user_table)
+        # The day's midnight as if it were UTC; subtracting the source offset gives real UTC
+        self._day_start = calendar.timegm(schedule_date.timetuple())
+        self._minutes = [minute for minute, _ in source_table]
+        self._source_offsets = [offset for _, offset in source_table]
+        self._instants = [instant for instant, _ in user_table]
+        self._user_offsets = [offset for _, offset in user_table]
+        self._displayed = {}
+
+    def to_utc_timestamp(self, minute: int) -> int:
+        source_offset = self._source_offsets[bisect_right(self._minutes, minute) - 1]
+        return self._day_start + minute * 60 - source_offset
+
+    def to_local(self, minute: int) -> datetime:
+        """Naive local datetime in the user's zone for `minute` past the day's midnight."""
+        if self.same_zone:
+            return UTC_EPOCH + timedelta(seconds=self._day_start + minute * 60)
+        instant = self.to_utc_timestamp(minute)
+        user_offset = self._user_offsets[bisect_right(self._instants, instant) - 1]
+        return UTC_EPOCH + timedelta(seconds=instant + user_offset)
+
+    def display(self, minute: int) -> tuple:
+        """("%Y-%m-%d", "%I:%M %p") strings for `minute`; memoized, a day has at most 1440."""
+        displayed = self._displayed.get(minute)
+        if displayed is None:
+            local = self.to_local(minute)
+            displayed = (local.strftime("%Y-%m-%d"), local.strftime("%I:%M %p"))
+            self._displayed[minute] = displayed
+        return displayed
+
+
+class TimezoneService:
+    """
+    Shared timezone lookups: the valid zone names are read from tzdata once,
+    ZoneInfo objects are cached per name, and DayConverters are kept in a
+    bounded LRU keyed by (zone, schedule day).
+    """
+
+    def __init__(self, table_cache_size: int = TIMEZONE_TABLE_CACHE_SIZE,
+                 schedule_timezone: str = SCHEDULE_TIMEZONE):
+        self._lock = Lock()
+        self._valid_names = None
+        self._zones = {}
+        self._converters = OrderedDict()
+        self.table_cache_size = table_cache_size
+        self.schedule_zone = ZoneInfo(schedule_timezone)
+        self.hits = 0
+        self.misses = 0
+
+    def valid_names(self) -> frozenset:
+        # available_timezones() walks the whole tzdata tree; do it once
+        if self._valid_names is None:
+            names = frozenset(available_timezones())
+            with self._lock:
+                self._valid_names = names
+            logger.info(f"Loaded {len(names)} timezone names.")
+        return self._valid_names
+
+    def is_valid(self, name) -> bool:
+        return bool(name) and name in self.valid_names()
+
+    def get(self, name):
+        """Returns the cached ZoneInfo for `name`, or None if it is not a valid zone."""
+        zone = self._zones.get(name)
+        if zone is not None:
+            return zone
+        if not self.is_valid(name):
+            return None
+        try:
+            zone = ZoneInfo(name)
+        except (ZoneInfoNotFoundError, ValueError):
+            return None
+        with self._lock:
+            self._zones[name] = zone
+        return zone
+
+    def resolve(self, name) -> ZoneInfo:
+        """Like get(), falling back to DEFAULT_TIMEZONE."""
+        zone = self.get(name)
+        if zone is None:
+            logger.warning(f"Invalid or missing timezone '{name}'. Defaulting to {DEFAULT_TIMEZONE}.")
+            zone = self.get(DEFAULT_TIMEZONE)
+        return zone
+
+    def _build_converter(self, zone, schedule_date) -> DayConverter:
+        midnight = datetime.combine(schedule_date, datetime.min.time())
+
+        def source_offset(minute):
+            local = (midnight + timedelta(minutes=minute)).replace(tzinfo=self.schedule_zone)
+            return int(local.utcoffset().total_seconds())
+
+        source_table = find_transitions(source_offset, 0, MINUTES_PER_DAY, 60)
+
+        # Every instant the day's entries can map to, with an hour of margin
+        day_start = calendar.timegm(schedule_date.timetuple())
+        offsets = [offset for _, offset in source_table] + [source_offset(MINUTES_PER_DAY)]
+        window_start = day_start - max(offsets) - 3600
+        window_end = day_start + MINUTES_PER_DAY * 60 - min(offsets) + 3600
+
+        def user_offset(instant):
+            return int(datetime.fromtimestamp(instant, timezone.utc).astimezone(zone).utcoffset().total_seconds())
+
+        user_table = find_transitions(user_offset, window_start, window_end, 3600)
+        return DayConverter(schedule_date, source_table, user_table, same_zone=zone.key == self.schedule_zone.key)
+
+    def day_converter(self, zone, schedule_date) -> DayConverter:
+        """
+        Returns the DayConverter for `zone` on `schedule_date`, building its
+        offset tables on first use.
+        """
+        key = (zone.key, schedule_date)
+        with self._lock:
+            converter = self._converters.get(key)
+            if converter is not None:
+                self._converters.move_to_end(key)
+                self.hits += 1
+                return converter
+            self.misses += 1
+
+        converter = self._build_converter(zone, schedule_date)
+        with self._lock:
+            self._converters[key] = converter
+            self._converters.move_to_end(key)
+            while len(self._converters) > self.table_cache_size:
+                self._converters.popitem(last=False)
+        return converter
+
+    def day_signature(self, zone, schedule_date) -> tuple:
+        """Offset table of `zone` over `schedule_date`; equal for zones that render the day alike."""
+        return self.day_converter(zone, schedule_date).signature
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "zones": len(self._zones),
+                "day_tables": len(self._converters),
+                "hits": self.hits,
+                "misses": self.misses,
+            }
+
+
+# Shared instance used by the routes
+timezone_service = TimezoneService()
@@ -1,12 +1,16 @@
 # telegram_pipeline/script.py
 
-from telethon import TelegramClient, events
 from dotenv import load_dotenv
 import os
+import asyncio
 import httpx  # Use an async HTTP client
 import logging
 import base64  # For decoding Base64 session
 
+from routes.schedule import parse_header_dates
+from services.ingestion_jobs import ingest_raw_text
+from services.telegram_checkpoints import get_checkpoint, advance_checkpoint
+
 # Load environment variables
 load_dotenv()
 
@@ -18,6 +22,17 @@ BACKEND_DEV_URL = os.getenv("BACKEND_DEV_URL")
 BACKEND_PROD_URL = os.getenv("BACKEND_PROD_URL")
 TELEGRAM_SESSION_B64 = os.getenv("TELEGRAM_SESSION_B64")
 ENVIRONMENT = os.getenv("ENVIRONMENT", "development").lower()
+# "direct" runs ingestion inside this process; "http" posts to a separate backend
+TELEGRAM_INGEST_MODE = os.getenv("TELEGRAM_INGEST_MODE", "direct").lower()
+
+# Backlog catch-up on startup
+CATCHUP_BATCH_SIZE = int(os.getenv("TELEGRAM_CATCHUP_BATCH_SIZE", 20))
+CATCHUP_CONCURRENCY = int(os.getenv("TELEGRAM_CATCHUP_CONCURRENCY", 2))
+# Without a checkpoint (first start), only this many recent messages are scanned
+CATCHUP_FIRST_RUN_LIMIT = int(os.getenv("TELEGRAM_CATCHUP_FIRST_RUN_LIMIT", 20))
+
+# Only messages containing this marker are schedules
+SCHEDULE_MARKER = "برنامج إذاعة القرآن"
 
 # Determine the appropriate backend URL
 BACKEND_URL = BACKEND_PROD_URL if ENVIRONMENT == "production" else BACKEND_DEV_URL
@@ -26,9 +41,17 @@ BACKEND_URL = BACKEND_PROD_URL if ENVIRONMENT == "production" else BACKEND_DEV_U
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-# Decode Base64 session and save it as a file
 SESSION_FILE_NAME = 'telegram_session.session'
-if TELEGRAM_SESSION_B64:
+
+def write_session_file():
+    """
+    Decodes the Base64 session and saves it as a file. Done when the
+    listener starts rather than on import, so processes that only import
+    this module (workers, CLI commands) never touch the session.
+    """
+    if not TELEGRAM_SESSION_B64:
+        logger.warning("No Base64-encoded session provided. Ensure TELEGRAM_SESSION_B64 is set.")
+        return
     try:
         with open(SESSION_FILE_NAME, "wb") as session_file:
             session_file.write(base64.b64decode(TELEGRAM_SESSION_B64))
@@ -36,20 +59,108 @@ if TELEGRAM_SESSION_B64:
     except Exception as e:
         logger.error(f"Failed to decode and save the Telegram session: {e}")
         raise
-else:
-    logger.warning("No Base64-encoded session provided. Ensure TELEGRAM_SESSION_B64 is set.")
+
+def create_http_client(server_url):
+    """Pooled keep-alive client reused for every message in "http" mode."""
+    return httpx.AsyncClient(
+        base_url=server_url,
+        timeout=10,
+        limits=httpx.Limits(max_connections=4, max_keepalive_connections=2, keepalive_expiry=300),
+    )
+
+async def ingest_directly(app, raw_text, update=False):
+    """
+    Runs the ingestion pipeline in this process on a worker thread, so the
+    Telethon loop keeps receiving. The storage step emits the socket event.
+    """
+    job = await asyncio.get_running_loop().run_in_executor(None, ingest_raw_text, app, raw_text, update)
+    logger.info(f"Ingestion job {job['id']} finished: {job['status']} ({job['stage']}).")
+    if job["status"] == "failed":
+        logger.error(f"Failed to ingest schedule: {job['error']}")
+
+async def ingest_over_http(http_client, raw_text, update=False):
+    """Queues the message on a backend running in another process."""
+    try:
+        response = await http_client.post("/api/schedule/store", json={"raw_text": raw_text, "edit": update})
+        response.raise_for_status()
+        logger.info(f"Processed schedule: {response.status_code}, {response.text}")
+    except httpx.HTTPError as e:
+        logger.error(f"Failed to send schedule to the server: {e}")
+
+async def missed_messages(client, last_message_id):
+    """Yields channel messages newer than `last_message_id`, oldest first."""
+    if last_message_id is None:
+        recent = [message async for message in client.iter_messages(CHANNEL_USERNAME, limit=CATCHUP_FIRST_RUN_LIMIT)]
+        for message in reversed(recent):
+            yield message
+        return
+    async for message in client.iter_messages(CHANNEL_USERNAME, min_id=last_message_id, reverse=True):
+        yield message
+
+async def catch_up(client, app, ingest):
+    """
+    Feeds schedules posted since the stored checkpoint through `ingest`,
+    in batches of CATCHUP_BATCH_SIZE with at most CATCHUP_CONCURRENCY in flight.
+    The checkpoint advances after each batch, so an interrupted catch-up
+    resumes where it stopped.
+    """
+    last_message_id = get_checkpoint(app, CHANNEL_USERNAME)
+    logger.info(f"Catching up on {CHANNEL_USERNAME} after message id {last_message_id}.")
+    semaphore = asyncio.Semaphore(CATCHUP_CONCURRENCY)
+
+    async def bounded_ingest(message):
+        async with semaphore:
+            await ingest(message.raw_text)
+
+    async def flush(batch):
+        # Keep the newest message per schedule date, so concurrent ingestion
+        # can never store an older version of a day last
+        latest = {}
+        for message in batch:
+            if message.raw_text and SCHEDULE_MARKER in message.raw_text:
+                date_key = parse_header_dates(message.raw_text).get("التاريخ_الميلادي") or message.id
+                latest[date_key] = message
+        await asyncio.gather(*(bounded_ingest(message) for message in latest.values()))
+        advance_checkpoint(app, CHANNEL_USERNAME, max(message.id for message in batch))
+        return len(latest)
+
+    scanned = ingested = 0
+    batch = []
+    async for message in missed_messages(client, last_message_id):
+        batch.append(message)
+        if len(batch) >= CATCHUP_BATCH_SIZE:
+            ingested += await flush(batch)
+            scanned += len(batch)
+            batch = []
+    if batch:
+        ingested += await flush(batch)
+        scanned += len(batch)
+
+    logger.info(f"Catch-up done: scanned {scanned} messages, ingested {ingested} schedules.")
 
 async def start_telegram_client(socketio, app, server_url):
     """
     Starts the Telegram listener and processes incoming messages.
 
+    Schedules missed while the listener was down are caught up first;
+    messages arriving meanwhile wait for it to finish.
+    Messages are ingested in this process by default. With
+    TELEGRAM_INGEST_MODE=http they are posted to `server_url` instead.
+    Either way the storage step broadcasts 'new_schedule' once.
+
     Args:
         socketio (SocketIO): The SocketIO instance from the Flask app.
         app (Flask): The Flask application instance.
-        server_url (str): The backend server URL to send POST requests.
+        server_url (str): The backend server URL used in "http" mode.
     """
+    # Telethon is only imported by the process that runs the listener
+    from telethon import TelegramClient, events
+
     # Initialize the Telegram client with the persistent session
+    write_session_file()
     client = TelegramClient(SESSION_FILE_NAME, API_ID, API_HASH)
+    http_client = create_http_client(server_url) if TELEGRAM_INGEST_MODE == "http" else None
+    logger.info(f"Telegram ingestion mode: {TELEGRAM_INGEST_MODE}")
 
     try:
         # Connect to the Telegram servers
@@ -60,6 +171,24 @@ async def start_telegram_client(socketio, app, server_url):
         if not await client.is_user_authorized():
             raise RuntimeError("Session is invalid. Please provide a valid session file.")
 
+        async def ingest(raw_text, update=False):
+            if http_client is not None:
+                await ingest_over_http(http_client, raw_text, update)
+                return
+            try:
+                await ingest_directly(app, raw_text, update)
+            except Exception as e:
+                logger.error(f"Failed to ingest schedule: {e}", exc_info=True)
+
+        # Registered before catch-up so nothing posted meanwhile is missed, but
+        # they only ingest once catch-up has finished, so an older backlog
+        # message can never be stored after a newer live one for the same day.
+        # A message seen by both paths is stored once thanks to the content hash.
+        # Live events only move the checkpoint if catch-up succeeded, so an
+        # interrupted catch-up is not skipped on the next start.
+        catch_up_finished = asyncio.Event()
+        caught_up = False
+
         @client.on(events.NewMessage(chats=CHANNEL_USERNAME))
         async def new_message_handler(event):
             raw_text = event.raw_text
@@ -68,28 +197,29 @@ async def start_telegram_client(socketio, app, server_url):
             logger.info(f"Raw message received: {raw_text}")
 
             # Only process messages that contain the schedule marker
-            if "برنامج إذاعة القرآن" in raw_text:
+            if SCHEDULE_MARKER in raw_text:
                 logger.info("New schedule detected!")
-                try:
-                    # Use an asynchronous HTTP client to avoid blocking
-                    async with httpx.AsyncClient() as http_client:
-                        response = await http_client.post(
-                            f"{server_url}/api/schedule/store",
-                            json={"raw_text": raw_text},
-                            timeout=10
-                        )
-                        response.raise_for_status()
-                        logger.info(f"Processed schedule: {response.status_code}, {response.text}")
-
-                        # Emit WebSocket event to notify clients
-                        with app.app_context():
-                            socketio.emit(
-                                'new_schedule',
-                                {"message": "New schedule processed and stored."},
-                                namespace='/'
-                            )
-                except httpx.RequestError as e:
-                    logger.error(f"Failed to send schedule to the server: {e}")
+                await catch_up_finished.wait()
+                await ingest(raw_text)
+                if caught_up:
+                    advance_checkpoint(app, CHANNEL_USERNAME, event.message.id)
+
+        # Edits (typo fixes) update only the entries that changed
+        @client.on(events.MessageEdited(chats=CHANNEL_USERNAME))
+        async def edited_message_handler(event):
+            raw_text = event.raw_text
+            if raw_text and SCHEDULE_MARKER in raw_text:
+                logger.info(f"Schedule message {event.message.id} was edited.")
+                await catch_up_finished.wait()
+                await ingest(raw_text, update=True)
+
+        try:
+            await catch_up(client, app, ingest)
+            caught_up = True
+        except Exception as e:
+            logger.error(f"Telegram catch-up failed: {e}", exc_info=True)
+        finally:
+            catch_up_finished.set()
 
         logger.info("Telethon client started and listening for new messages...")
         await client.run_until_disconnected()
@@ -97,3 +227,5 @@ async def start_telegram_client(socketio, app, server_url):
         logger.error(f"An error occurred while running the Telegram client: {e}")
     finally:
         await client.disconnect()
+        if http_client is not None:
+            await http_client.aclose()
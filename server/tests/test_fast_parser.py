@@ -0,0 +1,60 @@
+import pytest
+
+from benchmarks.corpus import generate_corpus
+from schedule_parsing.fast_parser import (
+    diff_against_reference,
+    parse_schedule_detailed,
+    parse_schedule_fast,
+)
+from schedule_parsing.parse_logic import parse_schedule_final
+
+
+@pytest.mark.parametrize("seed", [1, 2, 3])
+def test_fast_parser_matches_reference_on_corpus(seed):
+    for message in generate_corpus(200, seed=seed):
+        assert diff_against_reference(message) == []
+
+
+def test_fast_parser_matches_reference_on_edge_cases():
+    messages = [
+        "",
+        "🌙 ⭐",
+        "الساعة 12:05 (م) تلاوة للقارئ الشيخ محمد رفعت من سورة البقرة",
+        "40 : 6 (ص) [إعادة] للقارئ أحمد نعينع\nما تيسر من سورتى يس - الملك 25 ق",
+        "للشيخ طه الفشني من الآية 5 من سورة هود حتى الآية 20 من سورة هود",
+        "1:30 (تسجيل نادر) للشيخ مصطفى إسماعيل من أول سورة الرحمن حتى ختام سورة الواقعة",
+        "الساعة 8:15 (مساء) للشيخ محمد صديق المنشاوي ما تيسر من سورة مريم",
+        "15 : 6 (صباحا) للقارئ محمود خليل الحصري من سورة الفاتحة ومدة التلاوة 12",
+        "الساعة 9:30 (مساءً) للشيخ محمود علي البنا ما تيسر من سورة الإنسان",
+    ]
+    for message in messages:
+        assert parse_schedule_fast(message) == parse_schedule_final(message)
+
+
+# Records of the original parse_schedule_final, frozen so that a change to
+# the reference itself cannot go unnoticed
+FULL_WORD_MARKERS = (
+    "الساعة 8:15 (مساء) للشيخ محمد صديق المنشاوي ما تيسر من سورة مريم\n"
+    "15 : 6 (صباحا) للقارئ محمود خليل الحصري من سورة الفاتحة ومدة التلاوة 12"
+)
+FULL_WORD_MARKERS_REFERENCE = [
+    {"الوقت": "08:15", "قارئ": "محمد صديق المنشاوي", "السورة": "سورة مريم"},
+    {"الوقت": "06:15", "قارئ": "محمود خليل الحصري", "السورة": "سورة الفاتحة"},
+]
+
+
+def test_reference_records_are_frozen():
+    assert parse_schedule_final(FULL_WORD_MARKERS) == FULL_WORD_MARKERS_REFERENCE
+    assert parse_schedule_fast(FULL_WORD_MARKERS) == FULL_WORD_MARKERS_REFERENCE
+
+
+def test_detailed_parser_reads_full_word_markers_and_missing_durations():
+    evening, morning = parse_schedule_detailed(FULL_WORD_MARKERS)
+
+    assert evening["الوقت"] == "20:15"
+    assert evening["المدة"] == ""
+    assert not evening["ambiguous_time"]
+
+    assert morning["الوقت"] == "06:15"
+    assert morning["المدة"] == "12"
+    assert not morning["ambiguous_time"]
@@ -0,0 +1,53 @@
+from schedule_parsing.fast_parser import parse_schedule_detailed
+from schedule_parsing.parse_logic import fix_time_format, parse_schedule_final
+from services.fast_path import FAST_PATH_MIN_CONFIDENCE, score_schedule, to_storage_entry
+
+PM_LINE = "الساعة 1:30 (م) للشيخ محمد رفعت ما تيسر من سورة يس 30 ق"
+
+
+def test_pm_marker_is_read_before_brackets_are_stripped():
+    [record] = parse_schedule_detailed(PM_LINE)
+    assert record["الوقت"] == "13:30"
+    assert record["المدة"] == "30"
+    assert not record["ambiguous_time"]
+    assert to_storage_entry(record)["الوقت"] == "13:30"
+
+
+def test_reference_output_is_unchanged():
+    assert parse_schedule_final(PM_LINE) == [{
+        "الوقت": "01:30",
+        "قارئ": "محمد رفعت",
+        "السورة": "سورة يس",
+    }]
+
+
+def test_am_marker_on_reversed_time():
+    [record] = parse_schedule_detailed("40 : 6 (ص) للقارئ أحمد نعينع ما تيسر من سورة الكهف 20 ق")
+    assert record["الوقت"] == "06:40"
+    assert not record["ambiguous_time"]
+
+
+def test_full_word_markers():
+    assert fix_time_format("1:30 (مساء)") == "13:30"
+    assert fix_time_format("40 : 6 (صباحا)") == "06:40"
+    assert fix_time_format("1:30 (ملاحظة)") == "01:30"
+
+    [record] = parse_schedule_detailed("الساعة 8:15 (مساءً) للشيخ محمد رفعت ما تيسر من سورة يس 30 ق")
+    assert record["الوقت"] == "20:15"
+    assert not record["ambiguous_time"]
+
+
+def test_bracketed_note_is_not_a_marker():
+    [record] = parse_schedule_detailed("1:30 (ملاحظة) للشيخ محمد رفعت ما تيسر من سورة يس 30 ق")
+    assert record["الوقت"] == "01:30"
+    assert record["ambiguous_time"]
+
+
+def test_ambiguous_times_and_missing_durations_lower_the_score():
+    marked = parse_schedule_detailed(PM_LINE)
+    unmarked = parse_schedule_detailed("الساعة 1:30 للشيخ محمد رفعت ما تيسر من سورة يس 30 ق")
+    no_duration = parse_schedule_detailed("الساعة 1:30 (م) للشيخ محمد رفعت ما تيسر من سورة يس")
+
+    assert score_schedule(marked) == 1.0
+    assert score_schedule(unmarked) < FAST_PATH_MIN_CONFIDENCE
+    assert score_schedule(no_duration) < FAST_PATH_MIN_CONFIDENCE
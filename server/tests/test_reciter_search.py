@@ -0,0 +1,55 @@
+from services.reciter_search import FuzzyReciterIndex, ReciterSearchIndex, highlight_matches
+
+
+def test_highlight_keeps_original_spelling():
+    assert highlight_matches("أحمد نعينع", "احمد") == "<mark>أحمد</mark> نعينع"
+
+
+def test_highlight_matches_after_article_and_inside_compounds():
+    assert highlight_matches("أحمد الرزيقي", "رزيق") == "أحمد <mark>الرزيق</mark>ي"
+    assert highlight_matches("عبدالباسط عبدالصمد", "باسط") == "عبد<mark>الباسط</mark> عبدالصمد"
+
+
+def test_highlight_escapes_html():
+    assert highlight_matches("<b>أحمد</b> & نعينع", "احمد") == "&lt;b&gt;<mark>أحمد</mark>&lt;/b&gt; &amp; نعينع"
+    assert highlight_matches("<script>", "محمد") == "&lt;script&gt;"
+
+
+def test_short_queries_match_word_prefixes():
+    index = ReciterSearchIndex()
+    index.build([
+        {"id": 1, "reciter": "محمود خليل الحصري", "link": ""},
+        {"id": 2, "reciter": "أحمد نعينع", "link": ""},
+        {"id": 3, "reciter": "محمد رفعت", "link": ""},
+    ])
+    assert [playlist["id"] for playlist in index.search("مح")] == [3, 1]
+    assert [playlist["id"] for playlist in index.search("ن")] == [2]
+    assert index.search("عي") == []
+
+
+def fuzzy_index():
+    index = FuzzyReciterIndex()
+    index.build([
+        {"id": 1, "reciter": "الشيخ محمود خليل الحصري", "link": "husary"},
+        {"id": 2, "reciter": "أحمد نعينع", "link": "naina"},
+        {"id": 3, "reciter": "محمد صديق المنشاوي", "link": "minshawi"},
+    ])
+    return index
+
+
+def test_fuzzy_lookup_tolerates_typos():
+    index = fuzzy_index()
+    assert index.best_match("محمود خليل الحصرى")["id"] == 1
+    assert index.best_match("محمد صديق المنشوي")["id"] == 3
+    assert index.best_match("نعنيع")["id"] == 2
+
+
+def test_fuzzy_lookup_ignores_diacritics_and_honorifics():
+    index = fuzzy_index()
+    assert index.best_match("أَحْمَد نُعَيْنِع")["id"] == 2
+    assert index.best_match("محمود خليل الحصري")["id"] == 1
+    assert index.best_match("الشيخ محمود خليل الحُصَري")["id"] == 1
+
+
+def test_fuzzy_lookup_rejects_distant_names():
+    assert fuzzy_index().best_match("عبد الباسط عبد الصمد") is None
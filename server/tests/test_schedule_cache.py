@@ -0,0 +1,30 @@
+from datetime import date
+
+from services.schedule_cache import ScheduleResponseCache
+
+SAME_ZONE = (("same_zone",),)
+
+
+def test_fallback_page_is_dropped_when_a_newer_day_is_stored():
+    cache = ScheduleResponseCache()
+    missing, latest, newer = date(2025, 1, 5), date(2025, 1, 9), date(2025, 1, 10)
+    key = (missing, SAME_ZONE, 1, 100)
+    cache.put(key, {"data": ["latest"]}, latest)
+
+    cache.invalidate_date(newer)
+
+    assert cache.get(key) is None
+
+
+def test_pages_of_other_days_survive():
+    cache = ScheduleResponseCache()
+    stored, latest, older = date(2025, 1, 5), date(2025, 1, 9), date(2025, 1, 1)
+    stored_key = (stored, SAME_ZONE, 1, 100)
+    fallback_key = (date(2025, 1, 3), SAME_ZONE, 1, 100)
+    cache.put(stored_key, {"data": ["stored"]}, stored)
+    cache.put(fallback_key, {"data": ["latest"]}, latest)
+
+    cache.invalidate_date(older)
+
+    assert cache.get(stored_key) == {"data": ["stored"]}
+    assert cache.get(fallback_key) == {"data": ["latest"]}